@@ -24,29 +24,42 @@
 """ Imports the core names of NEvoPy.
 """
 
-# Util submodules
-from nevopy import activations
-from nevopy import callbacks
+from nevopy.utils.lazy_import import lazy_loader
 
-# "Fixed topology" subpackage
-from nevopy import fixed_topology
+__getattr__, __dir__ = lazy_loader(__name__, {
+    # Util submodules
+    "activations": "nevopy.activations",
+    "callbacks": "nevopy.callbacks",
 
-# "Genetic algorithm" subpackage
-from nevopy import genetic_algorithm
+    # "Fixed topology" subpackage
+    "fixed_topology": "nevopy.fixed_topology",
 
-# "NEAT" subpackage
-from nevopy import neat
+    # "Genetic algorithm" subpackage
+    "genetic_algorithm": "nevopy.genetic_algorithm",
 
-# "Processing" subpackage
-from nevopy import processing
+    # "NEAT" subpackage
+    "neat": "nevopy.neat",
 
-# "Utils" subpackage
-from nevopy import utils
+    # "Processing" subpackage
+    "processing": "nevopy.processing",
 
-# Base genome
-from nevopy.base_genome import BaseGenome
-from nevopy.base_genome import IncompatibleGenomesError
-from nevopy.base_genome import InvalidInputError
+    # "Utils" subpackage
+    "utils": "nevopy.utils",
 
-# Base population
-from nevopy.base_population import BasePopulation
+    # Base genome
+    "BaseGenome": "nevopy.base_genome",
+    "IncompatibleGenomesError": "nevopy.base_genome",
+    "InvalidInputError": "nevopy.base_genome",
+
+    # Base population
+    "BasePopulation": "nevopy.base_population",
+
+    # Fitness cache
+    "FitnessCache": "nevopy.fitness_cache",
+
+    # Population-level fitness functions
+    "BatchFitnessFunction": "nevopy.fitness_function",
+    "PopulationFitnessFunction": "nevopy.fitness_function",
+    "RacingFitnessFunction": "nevopy.fitness_function",
+    "ThresholdedFitnessFunction": "nevopy.fitness_function",
+})
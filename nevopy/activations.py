@@ -41,7 +41,9 @@ def sigmoid(x: float,
 
     Estimated lower-bound precision with a clip value of 64: 10^(-28).
     """
-    x = np.clip(x, -clip_value, clip_value)
+    # `np.minimum(np.maximum(...))` is equivalent to `np.clip`, but it's much
+    # faster for scalars and small arrays (the common case in NEAT).
+    x = np.minimum(np.maximum(x, -clip_value), clip_value)
     return 1 / (1 + np.exp(-x))
 
 
@@ -59,3 +61,21 @@ def steepened_sigmoid(x: float,
     - :cite:`stanley:ec02`
     """
     return sigmoid(x * step)
+
+
+def tanh(x: float) -> float:
+    """ Hyperbolic tangent activation function. """
+    return np.tanh(x)
+
+
+def relu(x: float) -> float:
+    """ Rectified linear unit (ReLU) activation function. """
+    return np.maximum(x, 0)
+
+
+def softmax(x: np.ndarray) -> np.ndarray:
+    """ Numeric stable implementation of the softmax function, applied along
+    the last axis of the input.
+    """
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
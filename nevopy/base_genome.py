@@ -33,7 +33,9 @@ different classes of genomes used by the neuroevolutionary algorithms in
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Tuple, Union
+from typing import Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 from nevopy.utils.utils import pickle_load
 from nevopy.utils.utils import pickle_save
@@ -171,6 +173,34 @@ class BaseGenome(ABC):
                 ``other`` is incompatible with the current genome (`self`).
         """
 
+    def content_hash(self) -> Optional[bytes]:
+        """ Computes a digest of the genome's structure and weights.
+
+        Genomes with the same digest encode the same neural network. Used by
+        :class:`.FitnessCache` to identify genomes that have already been
+        evaluated.
+
+        Returns:
+            The digest of the genome, or `None` if the genome can't be reliably
+            identified by a digest (the fitness of such genomes is never
+            cached).
+
+        Raises:
+            NotImplementedError: If the genome doesn't implement this method.
+        """
+        raise NotImplementedError(f"{type(self).__name__} doesn't support "
+                                  "content hashing!")
+
+    def evaluation_view(self) -> "BaseGenome":
+        """ Returns the genome that is passed to the fitness function in place
+        of this genome.
+
+        Subclasses may return a lighter copy of the genome that encodes the
+        same neural network (see :meth:`.NeatGenome.evaluation_view`). The
+        default implementation returns the genome itself.
+        """
+        return self
+
     @abstractmethod
     def distance(self, other: Any) -> float:
         """ Calculates the distance between two genomes.
@@ -183,6 +213,53 @@ class BaseGenome(ABC):
             the distance, the more similar the two genomes are.
         """
 
+    @classmethod
+    def distance_matrix(cls,
+                        genomes: Sequence["BaseGenome"],
+                        others: Sequence["BaseGenome"]) -> np.ndarray:
+        """ Calculates the distance between each pair of genomes of the given
+        sequences.
+
+        Used to speciate populations in bulk. This default implementation simply
+        calls :meth:`.distance` for each pair of genomes. Subclasses may
+        override it with a vectorized version.
+
+        Args:
+            genomes (Sequence[BaseGenome]): The first sequence of genomes.
+            others (Sequence[BaseGenome]): The second sequence of genomes
+                (usually, the representatives of species).
+
+        Returns:
+            A numpy array with shape `(len(genomes), len(others))`. The element
+            `[i, j]` holds the value of ``genomes[i].distance(others[j])``.
+        """
+        return np.array([[g.distance(o) for o in others] for g in genomes],
+                        dtype=float).reshape(len(genomes), len(others))
+
+    @classmethod
+    def packed_phenotype(cls, genomes: Sequence["BaseGenome"]) -> Optional[Any]:
+        """ Packs the given genomes into an object that evaluates all of them at
+        once.
+
+        Used by :meth:`.BasePopulation.process_batch` and
+        :meth:`.BasePopulation.packed_phenotype`. The returned object must have
+        the methods ``process_batch(x)``, which feeds the same batch of samples
+        to all the genomes, and ``process(x)``, which feeds a separate batch to
+        each genome (see :meth:`.BasePopulation.packed_phenotype`).
+
+        This default implementation returns `None`, meaning that the genomes
+        can't be packed (they are evaluated one by one). Subclasses may override
+        it with a vectorized version.
+
+        Args:
+            genomes (Sequence[BaseGenome]): The genomes to be packed.
+
+        Returns:
+            The packed phenotype of the genomes or `None`, if the genomes can't
+            be packed.
+        """
+        return None
+
     @abstractmethod
     def visualize(self, **kwargs) -> None:
         """ Utility method for visualizing the genome's neural network. """
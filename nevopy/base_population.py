@@ -25,8 +25,11 @@
 genomes, each of which encodes a neural network.
 """
 
+import functools
+import os
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Generic, List, Optional, Type, TypeVar
+from typing import (Any, Callable, Dict, Generic, List, Optional, Sequence,
+                    Type, TypeVar, Union)
 
 import numpy as np
 
@@ -58,6 +61,18 @@ class BasePopulation(ABC, Generic[TGenome]):
             evolved) currently in the population.
         stop_evolving (bool): Flag that when set to `True` stops the
             evolutionary process being executed by the :meth:`.evolve` method.
+        fitness_cache (Optional[FitnessCache]): Cache of fitness values used by
+            :meth:`.compute_fitness` to skip the evaluation of genomes already
+            evaluated (see :class:`.FitnessCache`). Disabled (`None`) by
+            default.
+        fitness_threshold (Optional[float]): Fitness a genome must reach to
+            be competitive in the population. It's the fitness below which the
+            genomes of the last evaluated generation would be removed before
+            reproduction (the percentile given by the setting
+            ``weak_genomes_removal_pc`` of the population's config). Passed to
+            instances of :class:`.ThresholdedFitnessFunction`, which can use it
+            to stop evaluating poor genomes early. It's `None` before the
+            first evaluation.
     """
 
     #: Default processing scheduler to be used by the population.
@@ -70,6 +85,9 @@ class BasePopulation(ABC, Generic[TGenome]):
         self.scheduler = processing_scheduler
         self.genomes = []  # type: List[TGenome]
         self.stop_evolving = False
+        self.fitness_cache = None  # type: Optional[ne.FitnessCache]
+        self._cache_info = {}  # type: Dict[str, int]
+        self.fitness_threshold = None  # type: Optional[float]
 
     @property
     def size(self) -> int:
@@ -97,7 +115,9 @@ class BasePopulation(ABC, Generic[TGenome]):
             fitness_function (Callable[[TGenome], float]): Fitness function used
                 to compute the fitness of a genome. It must take an instance of
                 class:`.BaseGenome` as input and return the genome's fitness
-                (float).
+                (float). An instance of :class:`.PopulationFitnessFunction`,
+                which evaluates all the genomes at once, can also be used (see
+                :meth:`.compute_fitness`).
             callbacks (Optional[List["ne.callbacks.Callback"]]): List with
                 instances of :class:`.Callback`. The callbacks will be called
                 during different stages of an evolutionary generation. They can
@@ -108,6 +128,366 @@ class BasePopulation(ABC, Generic[TGenome]):
             information about the evolutionary session.
         """
 
+    def evolve_steady_state(
+            self,
+            generations: int,
+            fitness_function: Callable[[TGenome], float],
+            callbacks: Optional[List["ne.callbacks.Callback"]] = None,
+            verbose: int = 2,
+            max_pending: Optional[int] = None,
+    ) -> "ne.callbacks.History":
+        """ Evolves the population asynchronously (steady-state evolution).
+
+        Instead of waiting for the fitness of the whole population to be
+        computed before reproducing (generational evolution, see
+        :meth:`.evolve`), the population continuously replaces individuals: the
+        genomes are submitted, one at a time, to the processing scheduler (see
+        :meth:`.ProcessingScheduler.submit`) and, as soon as the fitness of a
+        new genome is known, it's inserted into the population, replacing one of
+        the weakest genomes, and a new offspring is submitted in its place. This
+        keeps the workers busy even when the evaluation time varies a lot
+        between genomes.
+
+        Every time a number of genomes equal to the population's size is
+        evaluated, a "virtual generation" ends. The callbacks are called at the
+        virtual generations as they would be at regular generations (except for
+        :meth:`.Callback.on_reproduction_start`, since reproduction happens
+        continuously). Mass extinctions don't happen in this mode, but the mass
+        extinction counter is still updated (it controls the adaptive mutation
+        rates).
+
+        Note:
+            The speedup depends on the scheduler's ability to process items
+            asynchronously. Schedulers that don't override
+            :meth:`.ProcessingScheduler.submit` process the submitted genomes in
+            batches.
+
+        Args:
+            generations (int): Number of virtual generations for the algorithm
+                to run.
+            fitness_function (Callable[[TGenome], float]): Fitness function
+                used to compute the fitness of a genome. It must take a genome
+                as input and return the genome's fitness (float).
+            callbacks (Optional[List[Callback]]): List with instances of
+                :class:`.Callback` that will be called at each virtual
+                generation. By default, a :class:`.History` callback is always
+                included in the list. A :class:`.CompleteStdOutLogger` or a
+                :class:`.SimpleStdOutLogger` might also be included, depending
+                on the value passed to the ``verbose`` param.
+            verbose (int): Verbose level (logging on stdout). Options: 0 (no
+                verbose), 1 (light verbose) and 2 (heavy verbose).
+            max_pending (Optional[int]): Maximum number of genomes being
+                evaluated at the same time. If `None`, the population's size is
+                used. It should be greater than the number of workers used by
+                the scheduler.
+
+        Returns:
+            A :class:`.History` object containing useful information recorded
+            during the evolutionary process.
+        """
+        if isinstance(fitness_function,
+                      ne.fitness_function.PopulationFitnessFunction):
+            raise ValueError("Steady-state evolution requires a fitness "
+                             "function that evaluates one genome at a time!")
+
+        # preparing callbacks
+        if callbacks is None:
+            callbacks = []
+
+        history_callback = ne.callbacks.History()
+        callbacks.append(history_callback)
+
+        if verbose >= 2:
+            callbacks.append(ne.callbacks.CompleteStdOutLogger())
+        elif verbose == 1:
+            callbacks.append(ne.callbacks.SimpleStdOutLogger())
+
+        for cb in callbacks:
+            cb.population = self
+
+        max_pending = max_pending if max_pending is not None else self._size
+        self._steady_state_start()
+        self.stop_evolving = False
+        self._cache_info = {}
+
+        # callback: on_generation_start
+        generation_num = 0
+        for cb in callbacks:
+            cb.on_generation_start(generation_num, generations)
+
+        # submitting the initial genomes
+        pending = {self.scheduler.submit(genome.evaluation_view(),
+                                         fitness_function): genome
+                   for genome in self.genomes}
+        num_initial = len(pending)
+        num_evaluated = 0
+        dispatching = True
+
+        while len(pending) > 0:
+            for ticket, fitness in self.scheduler.wait_completed():
+                genome = pending.pop(ticket)
+                if not dispatching:
+                    # the evolution is over: discarding late results
+                    continue
+
+                genome.fitness = fitness
+                if num_initial > 0:
+                    num_initial -= 1
+                else:
+                    self._steady_state_insert(genome, generation_num)
+
+                num_evaluated += 1
+                if num_evaluated < self._size:
+                    continue
+
+                # end of a virtual generation
+                num_evaluated = 0
+                self._virtual_generation_end(generation_num, generations,
+                                             callbacks)
+                if generation_num + 1 >= generations or self.stop_evolving:
+                    dispatching = False
+                else:
+                    generation_num += 1
+                    # callback: on_generation_start
+                    for cb in callbacks:
+                        cb.on_generation_start(generation_num, generations)
+
+            # submitting new offspring (after the initial genomes have been
+            # evaluated)
+            while dispatching and num_initial == 0 \
+                    and len(pending) < max_pending:
+                baby = self._steady_state_offspring()
+                pending[self.scheduler.submit(baby.evaluation_view(),
+                                              fitness_function)] = baby
+
+        # callback: on_evolution_end
+        for cb in callbacks:
+            cb.on_evolution_end(generation_num)
+
+        return history_callback
+
+    def _steady_state_start(self) -> None:
+        """ Prepares the population for a steady-state evolutionary session
+        (see :meth:`.evolve_steady_state`).
+        """
+        raise NotImplementedError("This population doesn't support "
+                                  "steady-state evolution!")
+
+    def _steady_state_offspring(self) -> TGenome:
+        """ Generates a new genome from the genomes in the population (used by
+        :meth:`.evolve_steady_state`).
+        """
+        raise NotImplementedError("This population doesn't support "
+                                  "steady-state evolution!")
+
+    def _steady_state_insert(self, genome: TGenome, generation: int) -> None:
+        """ Inserts a newly evaluated genome into the population, replacing one
+        of the weakest genomes (used by :meth:`.evolve_steady_state`).
+        """
+        raise NotImplementedError("This population doesn't support "
+                                  "steady-state evolution!")
+
+    def _virtual_generation_end(
+            self,
+            generation: int,
+            generations: int,
+            callbacks: List["ne.callbacks.Callback"],
+    ) -> None:
+        """ Handles the end of a virtual generation of steady-state evolution
+        (see :meth:`.evolve_steady_state`). Implementations update the
+        population's records and species and call the callbacks.
+        """
+        raise NotImplementedError("This population doesn't support "
+                                  "steady-state evolution!")
+
+    def process_batch(self, x: np.ndarray) -> np.ndarray:
+        """ Feeds a batch of samples to all the genomes of the population.
+
+        Each sample is processed as if the genomes had just been reset. If the
+        genomes can be packed (see :meth:`.BaseGenome.packed_phenotype`), they
+        are evaluated all at once. Otherwise, this default implementation simply
+        loops over the genomes and samples; subclasses may override it with a
+        vectorized version.
+
+        Args:
+            x (np.ndarray): Array with shape `(N, ...)`, in which each element
+                is an input to the genomes.
+
+        Returns:
+            A numpy array with shape `(pop_size, N, ...)`, with the output of
+            each genome for each sample.
+        """
+        packed = type(self.genomes[0]).packed_phenotype(self.genomes)
+        if packed is not None:
+            return packed.process_batch(x)
+
+        outputs = []
+        for genome in self.genomes:
+            genome_out = []
+            for sample in x:
+                genome.reset()
+                genome_out.append(genome.process(sample))
+            outputs.append(genome_out)
+        return np.array(outputs)
+
+    def packed_phenotype(self) -> Any:
+        """ Returns an object that feeds a separate batch of samples to each of
+        the population's genomes at once.
+
+        The returned object has a method ``process(x)``, which receives an
+        array with shape `(pop_size, N, ...)` (the element `[g, i]` is the
+        :math:`i^{th}` sample fed to the :math:`g^{th}` genome) and returns an
+        array with shape `(pop_size, N, ...)`. Each row of each genome's batch
+        keeps its own state between calls, so it can be used to run the genomes
+        on many environments in lockstep. If the genomes can be packed (see
+        :meth:`.BaseGenome.packed_phenotype`), the packed phenotype is returned.
+        Otherwise, this default implementation simply loops over the genomes,
+        feeding each of them its whole batch with :meth:`.BaseGenome.process`
+        (so the genomes must accept batches, like
+        :class:`.FixedTopologyGenome`); subclasses may override it with a
+        vectorized version. The object must be created again if the genomes
+        change.
+        """
+        packed = type(self.genomes[0]).packed_phenotype(self.genomes)
+        if packed is not None:
+            return packed
+        return _GenomeLoopPhenotype(self.genomes)
+
+    def compute_fitness(
+            self,
+            fitness_function: Union[Callable[[TGenome], float],
+                                    "ne.fitness_function."
+                                    "PopulationFitnessFunction"],
+    ) -> Sequence[float]:
+        """ Computes the fitness of the population's genomes.
+
+        If the given fitness function is an instance of
+        :class:`.PopulationFitnessFunction`, the whole population is handed to
+        it at once. Otherwise, the fitness function is called once for each
+        genome, through the population's processing scheduler.
+
+        If a :class:`.FitnessCache` has been assigned to :attr:`fitness_cache`,
+        only the genomes whose fitness isn't stored in it are evaluated (a
+        single evaluation is made for identical genomes).
+
+        If the fitness function is an instance of
+        :class:`.ThresholdedFitnessFunction` and the population has a fitness
+        threshold (see :attr:`fitness_threshold`), the threshold is passed to
+        the fitness function, so it can stop evaluating hopeless genomes early.
+        The threshold is then updated with the new fitness values.
+
+        Args:
+            fitness_function (Union[Callable[[TGenome], float],
+                PopulationFitnessFunction]): The fitness function.
+
+        Returns:
+            A sequence with the fitness of each of the population's genomes.
+        """
+        if isinstance(fitness_function,
+                      ne.fitness_function.PopulationFitnessFunction):
+            results = fitness_function.evaluate_population(self)
+        else:
+            if (isinstance(fitness_function,
+                           ne.fitness_function.ThresholdedFitnessFunction)
+                    and self.fitness_threshold is not None):
+                fitness_function = functools.partial(
+                    fitness_function, fitness_threshold=self.fitness_threshold,
+                )
+            results = self._evaluate_genomes(fitness_function)
+
+        # updating the fitness threshold
+        removal_pc = getattr(self.config, "weak_genomes_removal_pc", None)
+        if removal_pc is not None and len(results) > 0:
+            self.fitness_threshold = float(np.quantile(results, removal_pc))
+        return results
+
+    def _evaluate_genomes(
+            self, fitness_function: Callable[[TGenome], float],
+    ) -> Sequence[float]:
+        """ Calls the fitness function for each genome through the scheduler,
+        skipping the genomes whose fitness is in the fitness cache.
+        """
+        cache = self.fitness_cache
+        if cache is None:
+            return self.scheduler.run(
+                items=[genome.evaluation_view() for genome in self.genomes],
+                func=fitness_function,
+            )
+
+        # looking up each distinct genome once
+        keys = [genome.content_hash() for genome in self.genomes]
+        hits, misses = cache.hits, cache.misses
+        cached = {}  # type: Dict[bytes, Optional[float]]
+        to_evaluate = []  # type: List[TGenome]
+        new_keys = []  # type: List[bytes]
+        for key, genome in zip(keys, self.genomes):
+            if key is None:
+                continue
+            if key not in cached:
+                cached[key] = cache.lookup(key)
+                if cached[key] is None:
+                    to_evaluate.append(genome)
+                    new_keys.append(key)
+
+        # genomes without a digest are always evaluated
+        uncached = [i for i, key in enumerate(keys) if key is None]
+        to_evaluate += [self.genomes[i] for i in uncached]
+
+        # evaluating the remaining genomes
+        results = self.scheduler.run(
+            items=[genome.evaluation_view() for genome in to_evaluate],
+            func=fitness_function,
+        )
+        for key, fitness in zip(new_keys, results):
+            cached[key] = cache.store(key, fitness)
+
+        self._cache_info = {"cache_hits": cache.hits - hits,
+                            "cache_misses": cache.misses - misses}
+        fitness = [cached[key] if key is not None else None for key in keys]
+        for i, f in zip(uncached, results[len(new_keys):]):
+            fitness[i] = f
+        return fitness
+
+    def distance_matrix(self,
+                        genomes: Sequence[TGenome],
+                        others: Sequence[TGenome]) -> np.ndarray:
+        """ Calculates the distance between each pair of genomes of the given
+        sequences.
+
+        Used for speciation. The distances are computed in bulk by
+        :meth:`.BaseGenome.distance_matrix`. If the setting
+        ``parallel_speciation`` of the population's config is `True`, the
+        genomes are split into chunks, which are processed by the population's
+        processing scheduler.
+
+        Args:
+            genomes (Sequence[TGenome]): The first sequence of genomes.
+            others (Sequence[TGenome]): The second sequence of genomes (usually,
+                the representatives of species).
+
+        Returns:
+            A numpy array with shape `(len(genomes), len(others))`. The element
+            `[i, j]` holds the distance between ``genomes[i]`` and
+            ``others[j]``.
+        """
+        if len(genomes) == 0 or len(others) == 0:
+            return np.zeros((len(genomes), len(others)))
+
+        genome_cls = type(genomes[0])
+        num_chunks = min(len(genomes), os.cpu_count() or 1)
+        if not getattr(self.config, "parallel_speciation", False) \
+                or num_chunks < 2:
+            return genome_cls.distance_matrix(genomes, others)
+
+        bounds = np.linspace(0, len(genomes), num_chunks + 1).astype(int)
+        results = self.scheduler.run(
+            items=[list(genomes[a:b]) for a, b in zip(bounds[:-1], bounds[1:])],
+            func=functools.partial(_distance_matrix_chunk,
+                                   genome_cls=genome_cls,
+                                   others=others),
+        )
+        return np.concatenate(results, axis=0)
+
     def fittest(self) -> TGenome:
         """ Returns the most fit genome in the population. """
         return self.genomes[int(np.argmax([g.fitness for g in self.genomes]))]
@@ -152,7 +532,40 @@ class BasePopulation(ABC, Generic[TGenome]):
             The loaded population.
         """
         pop = ne.utils.pickle_load(abs_path)
-        # pylint: disable=not-callable
         pop.scheduler = (scheduler if scheduler is not None
-                         else cls.DEFAULT_SCHEDULER())
+                         else cls.default_scheduler())
         return pop
+
+    @classmethod
+    def default_scheduler(cls) -> ProcessingScheduler:
+        """ Creates a new instance of the population's default processing
+        scheduler (:attr:`DEFAULT_SCHEDULER`).
+
+        Returns:
+            A new instance of the default processing scheduler.
+        """
+        # pylint: disable=not-callable
+        return cls.DEFAULT_SCHEDULER()
+
+
+class _GenomeLoopPhenotype:
+    """ Default implementation of :meth:`.BasePopulation.packed_phenotype`. """
+
+    def __init__(self, genomes: Sequence["ne.base_genome.BaseGenome"]) -> None:
+        self._genomes = genomes
+        for genome in genomes:
+            genome.reset()
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        return np.array([np.asarray(genome.process(xg))
+                         for genome, xg in zip(self._genomes, x)])
+
+
+def _distance_matrix_chunk(genomes: Sequence["ne.base_genome.BaseGenome"],
+                           genome_cls: Type["ne.base_genome.BaseGenome"],
+                           others: Sequence["ne.base_genome.BaseGenome"],
+) -> np.ndarray:
+    """ Computes a chunk of the distance matrix (used by
+    :meth:`.BasePopulation.distance_matrix` with processing schedulers).
+    """
+    return genome_cls.distance_matrix(genomes, others)
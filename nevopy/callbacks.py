@@ -58,7 +58,6 @@ from timeit import default_timer as timer
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt
 from click import style
 from columnar import columnar
 
@@ -479,6 +478,9 @@ class History(Callback):
             log_scale (bool): Whether or not to use a logarithmic scale on the
                 y-axis.
         """
+        # pylint: disable=import-outside-toplevel
+        import matplotlib.pyplot as plt
+
         generations = range(len(self.history["best_fitness"]))
         if isinstance(attrs, str) and attrs == "all":
             attrs = tuple(self.history.keys())
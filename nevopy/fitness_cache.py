@@ -0,0 +1,200 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Implements a cache for the fitness values of genomes.
+
+Elite genomes are copied unchanged to the next generation, and some of the
+offspring (like the ones produced by binary fission that skipped mutation) are
+exact copies of their parents. By default, the fitness of these genomes is
+calculated again every generation. A :class:`FitnessCache` stores the fitness of
+the genomes already evaluated, indexed by a digest of their structure and
+weights (see :meth:`.BaseGenome.content_hash`), so these evaluations can be
+skipped.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class FitnessCache:
+    """ Least recently used (LRU) cache of fitness values.
+
+    The cache is opt-in. To use it, assign an instance of this class to the
+    attribute :attr:`.BasePopulation.fitness_cache` of a population before
+    calling :meth:`.BasePopulation.evolve`:
+
+        .. code-block:: python
+
+            population.fitness_cache = ne.FitnessCache(max_size=512)
+            population.evolve(generations=100,
+                              fitness_function=fitness_function)
+
+    The number of cache hits and misses of each generation are passed to the
+    callbacks, as the keyword arguments ``cache_hits`` and ``cache_misses`` of
+    :meth:`.Callback.on_fitness_calculated` (they are, thus, also recorded by
+    the :class:`.History` callback).
+
+    If the fitness function is stochastic (the same genome can be assigned
+    different fitness values in different evaluations), reusing a fitness value
+    might perpetuate a lucky evaluation. The policy of the cache defines how
+    stored values are reused:
+
+        | . ``"reuse"``: the stored value is always reused. Suitable for
+          deterministic fitness functions.
+        | . ``"average"``: the genome is evaluated again until its fitness has
+          been sampled ``max_samples`` times. The fitness assigned to the
+          genome is the average of the samples. After that, the average is
+          reused.
+        | . ``"max_age"``: the stored value is reused for at most ``max_age``
+          generations. After that, the genome is evaluated again and the new
+          value replaces the old one.
+
+    Note:
+        The cache can't be used with instances of
+        :class:`.PopulationFitnessFunction`, since they evaluate the whole
+        population at once.
+
+    Args:
+        max_size (int): Maximum number of fitness values stored. When the cache
+            is full, the least recently used value is discarded.
+        policy (str): How stored values are reused. Must be ``"reuse"``,
+            ``"average"`` or ``"max_age"``.
+        max_samples (int): Number of evaluations averaged before the fitness of
+            a genome is reused (only used with the ``"average"`` policy).
+        max_age (int): Maximum number of times a stored value is reused before
+            the genome is evaluated again (only used with the ``"max_age"``
+            policy).
+
+    Attributes:
+        hits (int): Number of lookups that returned a stored value.
+        misses (int): Number of lookups that required a new evaluation.
+        evictions (int): Number of values discarded because the cache was full.
+    """
+
+    #: The policies supported by the cache.
+    POLICIES = ("reuse", "average", "max_age")
+
+    def __init__(self,
+                 max_size: int = 1024,
+                 policy: str = "reuse",
+                 max_samples: int = 4,
+                 max_age: int = 8) -> None:
+        if max_size < 1:
+            raise ValueError("The maximum size of the cache must be positive!")
+        if policy not in FitnessCache.POLICIES:
+            raise ValueError(f"Invalid cache policy: \"{policy}\"! Expected "
+                             f"one of: {', '.join(FitnessCache.POLICIES)}.")
+
+        self.max_size = max_size
+        self.policy = policy
+        self.max_samples = max_samples
+        self.max_age = max_age
+
+        # key -> [fitness, number of samples, age]
+        self._entries = OrderedDict()  # type: OrderedDict[bytes, List]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._entries
+
+    @property
+    def hit_rate(self) -> float:
+        """ Fraction of the lookups that returned a stored value. """
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def lookup(self, key: bytes) -> Optional[float]:
+        """ Looks up the fitness value associated with the given key.
+
+        Args:
+            key (bytes): The content hash of a genome.
+
+        Returns:
+            The stored fitness value or `None` if the genome must be evaluated
+            (in which case the new value should be passed to :meth:`store`).
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if self.policy == "average" and entry[1] < self.max_samples:
+            self.misses += 1
+            return None
+
+        if self.policy == "max_age":
+            entry[2] += 1
+            if entry[2] > self.max_age:
+                self.misses += 1
+                return None
+
+        self.hits += 1
+        return entry[0]
+
+    def store(self, key: bytes, fitness: float) -> float:
+        """ Stores a newly computed fitness value.
+
+        Args:
+            key (bytes): The content hash of the evaluated genome.
+            fitness (float): The fitness value computed.
+
+        Returns:
+            The fitness value that should be assigned to the genome. With the
+            ``"average"`` policy, it's the average of all the values stored for
+            the key so far. Otherwise, it's the given value.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and self.policy == "average":
+            entry[1] += 1
+            entry[0] += (fitness - entry[0]) / entry[1]
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        self._entries[key] = [fitness, 1, 0]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return fitness
+
+    def stats(self) -> Dict[str, int]:
+        """ Returns a dictionary with the number of hits, misses and evictions
+        of the cache.
+        """
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions}
+
+    def reset_stats(self) -> None:
+        """ Resets the counters of hits, misses and evictions. """
+        self.hits = self.misses = self.evictions = 0
+
+    def clear(self) -> None:
+        """ Removes all the values stored in the cache. """
+        self._entries.clear()
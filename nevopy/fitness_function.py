@@ -0,0 +1,252 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Fitness functions that evaluate a whole population at once.
+
+By default, the populations of `NEvoPy` compute the fitness of their genomes by
+calling a fitness function once for each genome, through their processing
+scheduler. This module implements fitness functions that, instead, receive the
+whole population, which allows them to evaluate all the genomes in a single
+vectorized pass (see :meth:`.BasePopulation.process_batch`). It also declares
+the interface of fitness functions that receive the population's fitness
+threshold (:class:`ThresholdedFitnessFunction`).
+"""
+
+import functools
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+
+import nevopy as ne
+
+
+class PopulationFitnessFunction(ABC):
+    """ Abstract base class for fitness functions that evaluate populations.
+
+    When an instance of a subclass of this class is passed as the fitness
+    function to :meth:`.BasePopulation.evolve`, the population calls
+    :meth:`.evaluate_population` once per generation (see
+    :meth:`.BasePopulation.compute_fitness`), instead of calling the fitness
+    function once for each genome through the processing scheduler.
+    """
+
+    @abstractmethod
+    def evaluate_population(
+            self, population: "ne.base_population.BasePopulation",
+    ) -> Sequence[float]:
+        """ Computes the fitness of all the genomes of the population.
+
+        Args:
+            population (BasePopulation): The population being evolved.
+
+        Returns:
+            A sequence with the fitness of each genome in the population's
+            :attr:`.BasePopulation.genomes` list, in the same order.
+        """
+
+
+class ThresholdedFitnessFunction(ABC):
+    """ Abstract base class for fitness functions that can stop evaluating a
+    genome when it can't reach a fitness threshold.
+
+    When a population computes the fitness of its genomes with an instance of
+    a subclass of this class, it passes its current
+    :attr:`.BasePopulation.fitness_threshold` to the fitness function, as the
+    keyword argument ``fitness_threshold`` (see
+    :meth:`.BasePopulation.compute_fitness`). Since the threshold rises as the
+    population improves, the evaluation of poor genomes gets shorter over the
+    course of the evolution. :class:`.GymFitnessFunction` is an example.
+    """
+
+    @abstractmethod
+    def __call__(self,
+                 genome: "ne.base_genome.BaseGenome",
+                 fitness_threshold: Optional[float] = None,
+                 **kwargs: Any) -> float:
+        """ Computes the fitness of the genome.
+
+        Args:
+            genome (BaseGenome): The genome to be evaluated.
+            fitness_threshold (Optional[float]): If not `None`, the evaluation
+                may be stopped as soon as it's certain that the genome's fitness
+                will be lower than this value. In that case, the returned
+                fitness must not be greater than the threshold.
+
+        Returns:
+            The genome's fitness.
+        """
+
+
+class BatchFitnessFunction(PopulationFitnessFunction):
+    """ Evaluates all the genomes of a population on the same batch of inputs.
+
+    Every generation, the whole batch of inputs is fed to all the genomes of the
+    population at once, with :meth:`.BasePopulation.process_batch`. The outputs
+    are then handed to a user-defined function that computes the fitness of each
+    genome.
+
+    Example:
+
+        .. code-block:: python
+
+            def xor_fitness(outputs):
+                # `outputs` has shape (pop_size, 4, 1)
+                error = np.sum((outputs[:, :, 0] - xor_outputs) ** 2, axis=1)
+                return 1 / error
+
+            population.evolve(
+                generations=64,
+                fitness_function=ne.BatchFitnessFunction(xor_inputs,
+                                                         xor_fitness),
+            )
+
+    Args:
+        inputs (np.ndarray): Array with shape `(N, ...)` containing the samples
+            that will be fed to the genomes.
+        outputs_to_fitness (Callable[[np.ndarray], Sequence[float]]): Function
+            that receives an array with shape `(pop_size, N, ...)`, containing
+            the output of each genome for each sample, and returns the fitness
+            of each genome.
+
+    Attributes:
+        inputs (np.ndarray): The samples fed to the genomes.
+        outputs_to_fitness (Callable[[np.ndarray], Sequence[float]]): Function
+            that computes the fitness of the genomes from their outputs.
+    """
+
+    def __init__(self,
+                 inputs: np.ndarray,
+                 outputs_to_fitness: Callable[[np.ndarray], Sequence[float]]):
+        self.inputs = np.asarray(inputs)
+        self.outputs_to_fitness = outputs_to_fitness
+
+    def evaluate_population(
+            self, population: "ne.base_population.BasePopulation",
+    ) -> Sequence[float]:
+        outputs = population.process_batch(self.inputs)
+        return [float(f) for f in self.outputs_to_fitness(outputs)]
+
+
+class RacingFitnessFunction(PopulationFitnessFunction):
+    """ Evaluates a population with successive halving (episode racing).
+
+    When the fitness of a genome is the average reward obtained in a number of
+    noisy episodes (like in :class:`.GymFitnessFunction`), running the same
+    number of episodes for every genome wastes most of the evaluation budget on
+    genomes that are clearly bad. This fitness function races the genomes
+    instead:
+
+        | . All the genomes are evaluated on ``min_episodes`` episodes.
+        | . Only the best :math:`1 / \\eta` of the genomes survive. The
+          survivors are evaluated on more episodes, so the total number of
+          episodes run by each of them is multiplied by :math:`\\eta`.
+        | . This is repeated until the survivors have run ``max_episodes``
+          episodes or only one genome is left.
+
+    Each round is a single call to the population's processing scheduler (the
+    elimination decisions depend on the partial results of all the genomes).
+    The fitness of a survivor is its average reward over all of its episodes.
+    An eliminated genome is assigned its average reward over the episodes it
+    ran, capped at the lowest fitness among the genomes that outlived it, so
+    the final ranking of the population agrees with the elimination decisions.
+
+    Args:
+        fitness_function (Callable[..., float]): Callable that receives a genome
+            and the keyword argument ``num_eps`` and returns the genome's
+            average reward over that number of episodes. An instance of
+            :class:`.GymFitnessFunction`, for example.
+        max_episodes (int): Number of episodes run by the genomes that survive
+            all the rounds.
+        min_episodes (int): Number of episodes run by all the genomes in the
+            first round.
+        eta (int): Reduction factor. In each round, only the best
+            :math:`1 / \\eta` of the genomes survive.
+
+    Attributes:
+        fitness_function (Callable[..., float]): The wrapped fitness function.
+        episodes_used (int): Total number of episodes run in the last
+            evaluation of a population.
+    """
+
+    def __init__(self,
+                 fitness_function: Callable[..., float],
+                 max_episodes: int = 8,
+                 min_episodes: int = 1,
+                 eta: int = 2) -> None:
+        if eta < 2:
+            raise ValueError("The reduction factor (eta) must be at least 2!")
+        if not 1 <= min_episodes <= max_episodes:
+            raise ValueError("The minimum number of episodes must be positive "
+                             "and not greater than the maximum number of "
+                             "episodes!")
+
+        self.fitness_function = fitness_function
+        self.max_episodes = max_episodes
+        self.min_episodes = min_episodes
+        self.eta = eta
+        self.episodes_used = 0
+
+    def evaluate_population(
+            self, population: "ne.base_population.BasePopulation",
+    ) -> List[float]:
+        genomes = population.genomes
+        fitness = np.zeros(len(genomes))
+        # round in which each genome was eliminated (-1: never eliminated)
+        eliminated_in = np.full(len(genomes), -1)
+        alive = np.arange(len(genomes))
+
+        self.episodes_used = 0
+        done_eps, target_eps = 0, self.min_episodes
+        num_rounds = 0
+        while True:
+            # evaluating the survivors on the new episodes
+            new_eps = target_eps - done_eps
+            results = population.scheduler.run(
+                items=[genomes[i].evaluation_view() for i in alive],
+                func=functools.partial(self.fitness_function, num_eps=new_eps),
+            )
+            fitness[alive] = ((fitness[alive] * done_eps
+                               + np.asarray(results, dtype=float) * new_eps)
+                              / target_eps)
+            self.episodes_used += new_eps * len(alive)
+            done_eps = target_eps
+
+            if done_eps >= self.max_episodes or len(alive) <= 1:
+                break
+
+            # eliminating the worst genomes
+            num_survivors = -(-len(alive) // self.eta)
+            order = alive[np.argsort(-fitness[alive], kind="stable")]
+            eliminated_in[order[num_survivors:]] = num_rounds
+            alive = np.sort(order[:num_survivors])
+            target_eps = min(target_eps * self.eta, self.max_episodes)
+            num_rounds += 1
+
+        # capping the fitness of the eliminated genomes
+        for r in reversed(range(num_rounds)):
+            outlived = (eliminated_in == -1) | (eliminated_in > r)
+            eliminated = eliminated_in == r
+            fitness[eliminated] = np.minimum(fitness[eliminated],
+                                             fitness[outlived].min())
+        return fitness.tolist()
@@ -24,8 +24,15 @@
 """ Imports core names of :mod:`nevopy.fixed_topology`.
 """
 
-# Layers
-from nevopy.fixed_topology import layers
+from nevopy.utils.lazy_import import lazy_loader
 
-# Genomes
-from nevopy.fixed_topology.genomes import FixedTopologyGenome
+__getattr__, __dir__ = lazy_loader(__name__, {
+    # Layers
+    "layers": "nevopy.fixed_topology.layers",
+
+    # Genomes
+    "FixedTopologyGenome": "nevopy.fixed_topology.genomes",
+
+    # Phenotypes
+    "FixedTopologyPopulationPhenotype": "nevopy.fixed_topology.phenotype",
+})
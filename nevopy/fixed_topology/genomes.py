@@ -25,19 +25,24 @@
 networks with a fixed topology.
 """
 
+import hashlib
 import logging
-from typing import Any, List, Optional, Tuple
+from typing import Any, List, Optional, Sequence, Tuple, TYPE_CHECKING
 
 import numpy as np
-from PIL import Image
-from tensorflow.keras.models import Sequential as KerasSequential
-from tensorflow.keras.utils import plot_model as keras_plot_model
 
 from nevopy.base_genome import BaseGenome, IncompatibleGenomesError
+from nevopy.fixed_topology.layers import mating
+from nevopy.fixed_topology.layers import mutation
 from nevopy.fixed_topology.layers.base_layer import BaseLayer
-from nevopy.fixed_topology.layers.tf_layers import IncompatibleLayersError
-from nevopy.fixed_topology.layers.tf_layers import TensorFlowLayer
+from nevopy.fixed_topology.layers.base_layer import IncompatibleLayersError
+from nevopy.fixed_topology.phenotype import FixedTopologyPopulationPhenotype
 from nevopy.genetic_algorithm.config import GeneticAlgorithmConfig
+from nevopy.utils.utils import pairwise_distances
+
+# Necessary for forward-reference type-checking.
+if TYPE_CHECKING:
+    from PIL import Image
 
 _logger = logging.getLogger(__name__)
 
@@ -130,6 +135,23 @@ class FixedTopologyGenome(BaseGenome):
         for layer in self.layers:
             layer.mutate_weights()
 
+    @classmethod
+    def mutate_population_weights(
+            cls, genomes: Sequence["FixedTopologyGenome"],
+    ) -> None:
+        """ Randomly mutates the weights of all the given genomes at once.
+
+        The mutations of the weights of all the genomes' layers are sampled with
+        a single vectorized call (see :func:`.mutation.mutate_layers`), which is
+        much faster than calling :meth:`.mutate_weights` for each genome when
+        the population is large. The layers are changed in place.
+
+        Args:
+            genomes (Sequence[FixedTopologyGenome]): The genomes to be mutated.
+        """
+        mutation.mutate_layers([layer for genome in genomes
+                                for layer in genome.layers])
+
     def random_copy(self) -> "FixedTopologyGenome":
         return FixedTopologyGenome(layers=[layer.random_copy()
                                            for layer in self.layers],
@@ -199,6 +221,71 @@ class FixedTopologyGenome(BaseGenome):
         return FixedTopologyGenome(layers=new_layers,
                                    config=self.config)
 
+    @classmethod
+    def mate_batch(
+            cls,
+            pairs: Sequence[Tuple["FixedTopologyGenome",
+                                  "FixedTopologyGenome"]],
+    ) -> List["FixedTopologyGenome"]:
+        """ Mates many pairs of genomes at once.
+
+        Each pair is mated as if by ``genome1.mate(genome2)``. When the mating
+        mode is "weights_mating", the corresponding layers of all the pairs are
+        mated together with :func:`.mating.mate_batch`, so each weight matrix
+        of the offspring is computed with a single vectorized operation for the
+        whole batch. Otherwise, the pairs are mated one by one.
+
+        Args:
+            pairs (Sequence[Tuple[FixedTopologyGenome, FixedTopologyGenome]]):
+                The pairs of parent genomes.
+
+        Returns:
+            A list with the offspring of each pair.
+
+        Raises:
+            IncompatibleGenomesError: If the genomes of a pair aren't compatible
+                for mating.
+        """
+        if (len(pairs) == 0
+                or any(g1.config.mating_mode != "weights_mating"
+                       or len(g1.layers) != len(g2.layers)
+                       or len(g1.layers) != len(pairs[0][0].layers)
+                       for g1, g2 in pairs)):
+            return [g1.mate(g2) for g1, g2 in pairs]
+
+        try:
+            new_layers = [
+                mating.mate_batch([(g1.layers[i], g2.layers[i])
+                                   for g1, g2 in pairs])
+                for i in range(len(pairs[0][0].layers))
+            ]
+        except IncompatibleLayersError as e:
+            raise IncompatibleGenomesError(
+                "Attempt to mate a layer of a genome with an incompatible "
+                "layer of another genome!"
+            ) from e
+
+        return [FixedTopologyGenome(layers=[layers[k] for layers in new_layers],
+                                    config=g1.config)
+                for k, (g1, _) in enumerate(pairs)]
+
+    def content_hash(self) -> bytes:
+        """ Computes a digest of the shapes and values of the weights of the
+        genome's layers.
+
+        The types of the layers aren't taken into account, since genomes
+        compared by their digests usually share the same topology.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for layer in self.layers:
+            weights = layer.weights
+            digest.update(str(len(weights)).encode())
+            for w in weights:
+                w = np.ascontiguousarray(w)
+                digest.update(str(w.shape).encode())
+                digest.update(w.tobytes())
+        return digest.digest()
+
     def distance(self, other: "FixedTopologyGenome") -> float:
         """ Calculates the distance between the two genomes.
 
@@ -229,10 +316,82 @@ class FixedTopologyGenome(BaseGenome):
 
         return total_dist / len(self.layers)
 
+    @classmethod
+    def distance_matrix(cls,
+                        genomes: Sequence["FixedTopologyGenome"],
+                        others: Sequence["FixedTopologyGenome"]) -> np.ndarray:
+        """ Calculates the distance between each pair of genomes of the given
+        sequences.
+
+        The weight matrices of the genomes are flattened and stacked, so the
+        distances (see :meth:`.distance`) between all the pairs of genomes are
+        computed with a few vectorized operations per weight matrix. If any of
+        the genomes overrides :meth:`.distance` or if the genomes don't share
+        the same architecture, the distances are computed pair by pair.
+
+        Args:
+            genomes (Sequence[FixedTopologyGenome]): The first sequence of
+                genomes.
+            others (Sequence[FixedTopologyGenome]): The second sequence of
+                genomes (usually, the representatives of species).
+
+        Returns:
+            A numpy array with shape `(len(genomes), len(others))`. The element
+            `[i, j]` holds the value of ``genomes[i].distance(others[j])``.
+        """
+        all_genomes = list(genomes) + list(others)
+        if (len(genomes) == 0 or len(others) == 0
+                or any(type(g).distance is not FixedTopologyGenome.distance
+                       for g in all_genomes)):
+            return super().distance_matrix(genomes, others)
+
+        weights = [[l.weights for l in g.layers] for g in all_genomes]
+        shapes = [[w.shape for w in lw] for lw in weights[0]]
+        for gw in weights[1:]:
+            if [[w.shape for w in lw] for lw in gw] != shapes:
+                return super().distance_matrix(genomes, others)
+
+        num_genomes = len(genomes)
+        total_dist = np.zeros((num_genomes, len(others)))
+        for i, layer_shapes in enumerate(shapes):
+            layers_dist = np.zeros_like(total_dist)
+            for j in range(len(layer_shapes)):
+                w = np.stack([np.reshape(gw[i][j], -1) for gw in weights])
+                layers_dist += pairwise_distances(
+                    w[:num_genomes], w[num_genomes:]
+                ) / np.sqrt(w.shape[1])
+
+            if len(layer_shapes) > 1:
+                layers_dist /= len(layer_shapes) - 1
+
+            total_dist += layers_dist
+
+        return total_dist / len(shapes)
+
+    @classmethod
+    def packed_phenotype(
+            cls, genomes: Sequence["FixedTopologyGenome"],
+    ) -> Optional[FixedTopologyPopulationPhenotype]:
+        """ Stacks the weights of the given genomes into a
+        :class:`.FixedTopologyPopulationPhenotype`, which evaluates all of them
+        with a single batched operation per layer.
+
+        Returns:
+            The packed phenotype of the genomes or `None`, if the genomes don't
+            share the same architecture or aren't made of layers implemented
+            with `NumPy` (see :meth:`is_packable()
+            <.FixedTopologyPopulationPhenotype.is_packable>`).
+        """
+        if (any(type(g).process is not FixedTopologyGenome.process
+                for g in genomes)
+                or not FixedTopologyPopulationPhenotype.is_packable(genomes)):
+            return None
+        return FixedTopologyPopulationPhenotype(genomes)
+
     def visualize(self,
                   show: bool = True,
                   to_file: str = "genome.png",
-                  **kwargs) -> Image.Image:
+                  **kwargs) -> "Image.Image":
         """ Utility method for visualizing the genome's neural network.
 
         This currently only works with genomes that use TensorFlow layers.
@@ -249,6 +408,13 @@ class FixedTopologyGenome(BaseGenome):
         Returns:
             The generated ``PIL.Image.Image`` object.
         """
+        # pylint: disable=import-outside-toplevel
+        from PIL import Image
+        from tensorflow.keras.models import Sequential as KerasSequential
+        from tensorflow.keras.utils import plot_model as keras_plot_model
+
+        from nevopy.fixed_topology.layers.tf_layers import TensorFlowLayer
+
         # Checking compatibility:
         for layer in self.layers:
             if not isinstance(layer, TensorFlowLayer):
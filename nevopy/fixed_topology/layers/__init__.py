@@ -25,16 +25,28 @@
 neuroevolutionary algorithms.
 """
 
-# Mating util functions
-from nevopy.fixed_topology.layers import mating
+from nevopy.utils.lazy_import import lazy_loader
 
-# Base abstract layer
-from nevopy.fixed_topology.layers.base_layer import BaseLayer
-from nevopy.fixed_topology.layers.base_layer import IncompatibleLayersError
+__getattr__, __dir__ = lazy_loader(__name__, {
+    # Mating and mutation util functions
+    "mating": "nevopy.fixed_topology.layers.mating",
+    "mutation": "nevopy.fixed_topology.layers.mutation",
 
-# TensorFlow's layers
-from nevopy.fixed_topology.layers.tf_layers import TensorFlowLayer
-from nevopy.fixed_topology.layers.tf_layers import TFConv2DLayer
-from nevopy.fixed_topology.layers.tf_layers import TFDenseLayer
-from nevopy.fixed_topology.layers.tf_layers import TFFlattenLayer
-from nevopy.fixed_topology.layers.tf_layers import TFMaxPool2DLayer
+    # Base abstract layer
+    "BaseLayer": "nevopy.fixed_topology.layers.base_layer",
+    "IncompatibleLayersError": "nevopy.fixed_topology.layers.base_layer",
+
+    # TensorFlow's layers
+    "TensorFlowLayer": "nevopy.fixed_topology.layers.tf_layers",
+    "TFConv2DLayer": "nevopy.fixed_topology.layers.tf_layers",
+    "TFDenseLayer": "nevopy.fixed_topology.layers.tf_layers",
+    "TFFlattenLayer": "nevopy.fixed_topology.layers.tf_layers",
+    "TFMaxPool2DLayer": "nevopy.fixed_topology.layers.tf_layers",
+
+    # NumPy layers
+    "NumpyLayer": "nevopy.fixed_topology.layers.numpy_layers",
+    "NPConv2DLayer": "nevopy.fixed_topology.layers.numpy_layers",
+    "NPDenseLayer": "nevopy.fixed_topology.layers.numpy_layers",
+    "NPFlattenLayer": "nevopy.fixed_topology.layers.numpy_layers",
+    "NPMaxPool2DLayer": "nevopy.fixed_topology.layers.numpy_layers",
+})
@@ -30,6 +30,7 @@ from typing import Any, List, Optional, Tuple
 
 from numpy import ndarray
 
+from nevopy.fixed_topology.layers import mutation
 from nevopy.genetic_algorithm.config import GeneticAlgorithmConfig
 from nevopy.utils import pickle_load
 from nevopy.utils import pickle_save
@@ -143,6 +144,25 @@ class BaseLayer(ABC):
             instead.
         """
 
+    def copy_with_weights(self, weights: List[ndarray]) -> "BaseLayer":
+        """ Makes a copy of the layer with the given weights.
+
+        Used by the mating functions (see :mod:`.fixed_topology.layers.mating`)
+        to build the offspring. This default implementation makes a random copy
+        of the layer and then sets its weights. Subclasses may override it in
+        order to avoid the initialization of weights that will be discarded.
+
+        Args:
+            weights (List[ndarray]): The weights of the new layer. The arrays
+                may be used by the new layer without being copied.
+
+        Returns:
+            A copy of the layer with the given weights.
+        """
+        new_layer = self.random_copy()
+        new_layer.weights = weights
+        return new_layer
+
     @abstractmethod
     def deep_copy(self) -> "BaseLayer":
         """ Makes an exact/deep copy of the layer.
@@ -158,6 +178,28 @@ class BaseLayer(ABC):
         If the layer is immutable, this method doesn't do anything.
         """
 
+    def _weights_sizes(self) -> List[int]:
+        """ Returns the number of elements in each of the layer's weight arrays.
+
+        Used by :func:`.mutation.mutate_layers`.
+        """
+        return [w.size for w in self.weights]
+
+    def _apply_weights_mutations(
+            self, mutations: List["mutation.WeightsMutation"],
+    ) -> None:
+        """ Applies the given mutations (one for each weight array) to the
+        layer's weights.
+
+        Used by :func:`.mutation.mutate_layers`. This default implementation
+        gets the layer's weights, changes them and sets them back. Subclasses
+        may override it in order to change the weights in place.
+        """
+        weights = self.weights
+        for w, m in zip(weights, mutations):
+            mutation.apply_weights_mutation(w, m)
+        self.weights = weights
+
     @abstractmethod
     def mate(self, other: Any) -> "BaseLayer":
         """ Mates two layers to produce a new layer (offspring).
@@ -25,8 +25,7 @@
 generate a new neural network layer from two parent layers.
 """
 
-import random
-from typing import List
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
@@ -58,6 +57,55 @@ def check_weights_compatibility(weight_list1: List[np.ndarray],
             )
 
 
+def _mate(layer1: BaseLayer,
+          layer2: BaseLayer,
+          weights_func: Callable[[np.ndarray, np.ndarray, bool], np.ndarray],
+) -> BaseLayer:
+    """ Builds a new layer whose weights are computed by `weights_func` from the
+    weights of the parent layers.
+    """
+    # Retrieving weights as numpy arrays:
+    weights1 = layer1.weights
+    weights2 = layer2.weights
+
+    # Checking compatibility:
+    check_weights_compatibility(weights1, weights2)
+
+    # Building the new layer:
+    return layer1.copy_with_weights([weights_func(w1, w2, False)
+                                     for w1, w2 in zip(weights1, weights2)])
+
+
+def _exchange_weights(w1: np.ndarray,
+                      w2: np.ndarray,
+                      batched: bool) -> np.ndarray:
+    """ Randomly picks each weight from one of the arrays. """
+    # pylint: disable=unused-argument
+    return np.where(np.random.random(w1.shape) < 0.5, w1, w2)
+
+
+def _exchange_units(w1: np.ndarray,
+                    w2: np.ndarray,
+                    batched: bool) -> np.ndarray:
+    """ Randomly picks each unit (last axis) from one of the arrays. If the
+    arrays are `batched`, the units of each item of the batch (first axis) are
+    picked independently.
+    """
+    mask_shape = [1] * w1.ndim
+    mask_shape[-1] = w1.shape[-1]
+    if batched:
+        mask_shape[0] = w1.shape[0]
+    return np.where(np.random.random(mask_shape) < 0.5, w1, w2)
+
+
+def _average_weights(w1: np.ndarray,
+                     w2: np.ndarray,
+                     batched: bool) -> np.ndarray:
+    """ Averages the arrays. """
+    # pylint: disable=unused-argument
+    return (w1 + w2) / 2
+
+
 def exchange_weights_mating(layer1: BaseLayer,
                             layer2: BaseLayer) -> BaseLayer:
     """ Mates (sexual reproduction) two neural layers by exchanging weights.
@@ -78,24 +126,7 @@ def exchange_weights_mating(layer1: BaseLayer,
             are not of the same shape (i.e., the layers are not compatible for
             mating).
     """
-    # Retrieving weights as numpy arrays:
-    weights1 = layer1.weights
-    weights2 = layer2.weights
-
-    # Checking compatibility:
-    check_weights_compatibility(weights1, weights2)
-
-    # Selecting weights for the new layer:
-    new_weights = []
-    for w1, w2 in zip(weights1, weights2):
-        c = np.random.choice([0, 1], size=w1.shape)
-        new_w = np.multiply(c, w1) + np.multiply(1 - c, w2)
-        new_weights.append(new_w)
-
-    # Building the new layer:
-    new_layer = layer1.random_copy()
-    new_layer.weights = new_weights
-    return new_layer
+    return _mate(layer1, layer2, _exchange_weights)
 
 
 def exchange_units_mating(layer1: BaseLayer,
@@ -124,27 +155,7 @@ def exchange_units_mating(layer1: BaseLayer,
             are not of the same shape (i.e., the layers are not compatible for
             mating).
     """
-    # Retrieving weights as numpy arrays:
-    weights1 = layer1.weights
-    weights2 = layer2.weights
-
-    # Checking compatibility:
-    check_weights_compatibility(weights1, weights2)
-
-    # Selecting units for the new layer:
-    new_weights = []
-    for w1, w2 in zip(weights1, weights2):
-        new_units = []
-        for i in range(w1.shape[-1]):
-            w = random.choice((w1, w2))
-            new_units.append(w[..., i])
-        new_weights.append(np.stack(new_units, axis=-1))
-
-    # Building the new layer:
-    new_layer = layer1.random_copy()
-    new_layer.weights = new_weights
-
-    return new_layer
+    return _mate(layer1, layer2, _exchange_units)
 
 
 def weights_avg_mating(layer1: BaseLayer,
@@ -168,20 +179,63 @@ def weights_avg_mating(layer1: BaseLayer,
             mating).
 
     """
-    # Retrieving weights as numpy arrays:
-    weights1 = layer1.weights
-    weights2 = layer2.weights
+    return _mate(layer1, layer2, _average_weights)
 
-    # Checking compatibility:
-    check_weights_compatibility(weights1, weights2)
 
-    # Calculating new weights:
-    new_weights = []
-    for w1, w2 in zip(weights1, weights2):
-        new_weights.append((w1 + w2) / 2)
+#: Functions that compute the weights of the offspring generated by each of the
+#: pre-built mating functions.
+_WEIGHTS_FUNCS = {
+    exchange_weights_mating: _exchange_weights,
+    exchange_units_mating: _exchange_units,
+    weights_avg_mating: _average_weights,
+}
 
-    # Building the new layer:
-    new_layer = layer1.random_copy()
-    new_layer.weights = new_weights
 
-    return new_layer
+def mate_batch(pairs: Sequence[Tuple[BaseLayer, BaseLayer]]) -> List[BaseLayer]:
+    """ Mates many pairs of layers at once.
+
+    Each pair is mated as if by ``layer1.mate(layer2)``. The pairs whose first
+    layer uses one of the pre-built mating functions of this module are
+    vectorized: the weights of all the pairs that share the same mating function
+    and weights shapes are stacked, so each weight matrix of the offspring is
+    computed with a single operation for the whole batch. The other pairs are
+    mated one by one.
+
+    Args:
+        pairs (Sequence[Tuple[BaseLayer, BaseLayer]]): The pairs of parent
+            layers.
+
+    Returns:
+        A list with the offspring of each pair.
+
+    Raises:
+        IncompatibleLayersError: If the layers of a pair aren't compatible for
+            mating.
+    """
+    children = [None] * len(pairs)  # type: List[Optional[BaseLayer]]
+    groups = {}  # type: Dict[Tuple[Callable, Tuple], List[int]]
+    weights = {}  # type: Dict[int, Tuple[List[np.ndarray], List[np.ndarray]]]
+    for i, (layer1, layer2) in enumerate(pairs):
+        weights_func = _WEIGHTS_FUNCS.get(getattr(layer1, "mating_func", None))
+        if (weights_func is None or layer1 is layer2
+                or not (layer1.mutable and layer2.mutable)):
+            children[i] = layer1.mate(layer2)
+            continue
+
+        weights1, weights2 = layer1.weights, layer2.weights
+        check_weights_compatibility(weights1, weights2)
+        weights[i] = (weights1, weights2)
+        key = (weights_func, tuple(w.shape for w in weights1))
+        groups.setdefault(key, []).append(i)
+
+    for (weights_func, shapes), idx in groups.items():
+        new_weights = [
+            weights_func(np.stack([weights[i][0][j] for i in idx]),
+                         np.stack([weights[i][1][j] for i in idx]),
+                         True)
+            for j in range(len(shapes))
+        ]
+        for k, i in enumerate(idx):
+            children[i] = pairs[i][0].copy_with_weights([w[k]
+                                                         for w in new_weights])
+    return children  # type: ignore
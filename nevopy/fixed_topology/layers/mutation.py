@@ -0,0 +1,190 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Implements the sampling of the random changes made to the weights of the
+layers by mutation.
+
+The mutations of many weight arrays are sampled at once, as if the arrays were
+concatenated into a single flat buffer: a single vectorized call samples the
+mutations of all the weights of a layer or, with :func:`mutate_layers`, of all
+the layers of a whole population.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, TYPE_CHECKING
+
+import numpy as np
+
+from nevopy.genetic_algorithm.config import GeneticAlgorithmConfig
+
+if TYPE_CHECKING:
+    from nevopy.fixed_topology.layers.base_layer import BaseLayer
+
+#: Probability above which the indices of the changed weights are sampled with a
+#: boolean mask, instead of being drawn without replacement.
+DENSE_SAMPLING_THRESHOLD = 0.02
+
+
+class WeightsMutation(NamedTuple):
+    """ Random changes made to a weight array by mutation.
+
+    The indices refer to the flattened array and are sorted. The weights at
+    ``mutate_idx`` are multiplied by ``perturbation`` and, after that, the
+    weights at ``reset_idx`` are replaced by ``new_values``.
+    """
+    mutate_idx: np.ndarray
+    perturbation: np.ndarray
+    reset_idx: np.ndarray
+    new_values: np.ndarray
+
+    @property
+    def num_changes(self) -> int:
+        """ Number of weights changed by the mutation. """
+        return len(self.mutate_idx) + len(self.reset_idx)
+
+
+def default_rng() -> np.random.Generator:
+    """ Returns a new :class:`numpy.random.Generator` seeded by NumPy's global
+    random state, so :func:`numpy.random.seed` keeps the mutations reproducible.
+    """
+    return np.random.default_rng(np.random.randint(2 ** 32, dtype=np.uint64))
+
+
+def sample_indices(size: int,
+                   p: float,
+                   rng: np.random.Generator) -> np.ndarray:
+    """ Independently selects each of the indices in `[0, size)` with
+    probability `p`.
+
+    For small probabilities, the number of selected indices is drawn from a
+    binomial distribution and the indices are sampled without replacement
+    (which, for large arrays, is proportional to the number of selected indices,
+    not to `size`). Otherwise, a boolean mask is used.
+
+    Returns:
+        A sorted numpy array with the selected indices.
+    """
+    if p >= DENSE_SAMPLING_THRESHOLD:
+        return np.flatnonzero(rng.random(size) < p)
+
+    num_selected = rng.binomial(size, p)
+    idx = rng.choice(size, size=num_selected, replace=False)
+    idx.sort()
+    return idx
+
+
+def sample_weights_mutations(
+        sizes: Sequence[int],
+        config: GeneticAlgorithmConfig,
+        rng: Optional[np.random.Generator] = None,
+) -> List[WeightsMutation]:
+    """ Samples the mutations of a group of weight arrays with a single
+    vectorized call.
+
+    Each weight has a chance to be perturbed by a predefined amount and a chance
+    to be reset. The probabilities are obtained from the settings of the current
+    evolutionary session.
+
+    Args:
+        sizes (Sequence[int]): Number of elements in each weight array.
+        config (GeneticAlgorithmConfig): Settings of the current evolutionary
+            session.
+        rng (Optional[np.random.Generator]): Random number generator to be used.
+            If `None`, a new generator is created with :func:`default_rng`.
+
+    Returns:
+        A list with the mutation of each weight array.
+    """
+    if rng is None:
+        rng = default_rng()
+
+    bounds = np.cumsum([0] + list(sizes))
+    total_size = int(bounds[-1])
+    pc = config.weight_perturbation_pc
+
+    mutate_idx = sample_indices(total_size, config.weight_mutation_chance, rng)
+    perturbation = rng.uniform(1 - pc, 1 + pc, size=len(mutate_idx))
+    reset_idx = sample_indices(total_size, config.weight_reset_chance, rng)
+    new_values = rng.uniform(config.new_weight_interval[0],
+                             config.new_weight_interval[1],
+                             size=len(reset_idx))
+
+    mutate_splits = np.searchsorted(mutate_idx, bounds)
+    reset_splits = np.searchsorted(reset_idx, bounds)
+    mutations = []
+    for i in range(len(sizes)):
+        m0, m1 = mutate_splits[i], mutate_splits[i + 1]
+        r0, r1 = reset_splits[i], reset_splits[i + 1]
+        mutations.append(WeightsMutation(
+            mutate_idx=mutate_idx[m0:m1] - bounds[i],
+            perturbation=perturbation[m0:m1],
+            reset_idx=reset_idx[r0:r1] - bounds[i],
+            new_values=new_values[r0:r1],
+        ))
+    return mutations
+
+
+def apply_weights_mutation(w: np.ndarray, mutation: WeightsMutation) -> None:
+    """ Applies a mutation to a weight array, in place. """
+    flat = w.reshape(-1)
+    if not np.shares_memory(flat, w):
+        raise ValueError("The weight array must be contiguous!")
+    flat[mutation.mutate_idx] *= mutation.perturbation
+    flat[mutation.reset_idx] = mutation.new_values
+
+
+def mutate_layers(layers: Sequence["BaseLayer"],
+                  rng: Optional[np.random.Generator] = None) -> None:
+    """ Mutates the weights of many layers with a single vectorized call.
+
+    The layers can belong to different genomes (this is how the weights of a
+    whole population are mutated at once). Immutable layers are ignored. The
+    mutations of the layers that share the same config object are sampled
+    together.
+
+    Args:
+        layers (Sequence[BaseLayer]): The layers to be mutated.
+        rng (Optional[np.random.Generator]): Random number generator to be used.
+            If `None`, a new generator is created with :func:`default_rng`.
+    """
+    if rng is None:
+        rng = default_rng()
+
+    groups = {}  # type: Dict[int, List[BaseLayer]]
+    for layer in layers:
+        if layer.mutable:
+            if layer.input_shape is None:
+                raise RuntimeError("Attempt to mutate the weights of a layer "
+                                   "that didn't have its weight and bias "
+                                   "matrices initialized!")
+            groups.setdefault(id(layer.config), []).append(layer)
+
+    for group in groups.values():
+        assert group[0].config is not None
+        layers_sizes = [layer._weights_sizes() for layer in group]
+        mutations = sample_weights_mutations(
+            [s for sizes in layers_sizes for s in sizes], group[0].config, rng
+        )
+        start = 0
+        for layer, sizes in zip(group, layers_sizes):
+            layer._apply_weights_mutations(mutations[start:start + len(sizes)])
+            start += len(sizes)
@@ -0,0 +1,514 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Implements subclasses of :class:`.BaseLayer` whose weights are stored as
+plain `NumPy` arrays.
+
+Unlike the layers in :mod:`.tf_layers`, these layers don't depend on
+`TensorFlow`: copying, mutating and mating them are just operations on arrays,
+which makes them much cheaper to evolve. They are well suited for small and
+medium-sized networks, like the ones used to play most :mod:`gym` games.
+"""
+
+import copy
+from abc import abstractmethod
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from nevopy import activations
+from nevopy.base_genome import InvalidInputError
+from nevopy.genetic_algorithm.config import GeneticAlgorithmConfig
+from nevopy.fixed_topology.layers import mating
+from nevopy.fixed_topology.layers import mutation
+from nevopy.fixed_topology.layers.base_layer import BaseLayer
+from nevopy.fixed_topology.layers.base_layer import IncompatibleLayersError
+
+#: Type of an activation function (or of its name).
+TActivation = Optional[Union[str, Callable[[np.ndarray], np.ndarray]]]
+
+
+class NumpyLayer(BaseLayer):
+    """ Base class of the layers whose weights are stored as `NumPy` arrays.
+
+    Subclasses must implement :meth:`_weights_shapes`, which returns the shapes
+    of the layer's weight arrays for a given input shape, and :meth:`_forward`,
+    which computes the layer's output.
+
+    The input shapes follow the `TensorFlow` convention: the first dimension is
+    the batch dimension (its size is ignored when checking inputs) and images
+    are in the "channels last" format.
+
+    Args:
+        mating_func (Optional[Callable[[BaseLayer, BaseLayer], BaseLayer]]):
+            Function that mates (sexual reproduction) two layers. It should
+            receive two layers as input and return a new layer (the offspring).
+            If the layer is immutable, this parameter should receive `None` as
+            argument.
+        config (Optional[FixedTopologyConfig]): Settings being used in the
+            current evolutionary session. If `None`, a config object must be
+            assigned to the layer later on, before calling the methods that
+            require it.
+        input_shape (Optional[Tuple[int, ...]]): Shape of the data that will be
+            processed by the layer. If `None`, an input shape for the layer must
+            be manually specified later or be inferred from an input sample.
+        mutable (Optional[bool]): Whether or not the layer can have its weights
+            changed (mutation).
+        dtype (np.dtype): Data type of the layer's weights.
+    """
+
+    def __init__(self,
+                 mating_func: Optional[
+                     Callable[[BaseLayer, BaseLayer], BaseLayer]
+                 ] = mating.exchange_units_mating,
+                 config: Optional[GeneticAlgorithmConfig] = None,
+                 input_shape: Optional[Tuple[int, ...]] = None,
+                 mutable: Optional[bool] = True,
+                 dtype: np.dtype = np.float32) -> None:
+        super().__init__(config, input_shape, mutable)
+        self.mating_func = mating_func
+        self.dtype = dtype
+        self._weights = []  # type: List[np.ndarray]
+        if input_shape is not None:
+            self.build(input_shape)
+
+    @property
+    def weights(self) -> List[np.ndarray]:
+        """ Copies of the current weight arrays of the layer.
+
+        Like :attr:`.TensorFlowLayer.weights`, the returned arrays are copies,
+        so changing them doesn't change the layer. The arrays used by the layer
+        are kept in ``_weights`` and are only changed in place by mutation (see
+        :meth:`_apply_weights_mutations`).
+        """
+        return [w.copy() for w in self._weights]
+
+    @weights.setter
+    def weights(self, new_weights: List[np.ndarray]) -> None:
+        """ Sets the layer's weights (the given arrays are copied). """
+        self._check_weights_shapes(new_weights)
+        self._weights = [np.array(w, dtype=self.dtype) for w in new_weights]
+
+    def _check_weights_shapes(self, new_weights: List[np.ndarray]) -> None:
+        """ Raises a `ValueError` if the shapes of the given weights don't match
+        the shapes of the layer's weights.
+        """
+        if self._input_shape is not None:
+            shapes = self._weights_shapes(self._input_shape)
+            new_shapes = [np.shape(w) for w in new_weights]
+            if new_shapes != shapes:
+                raise ValueError(f"Invalid weights shapes {new_shapes}! "
+                                 f"Expected: {shapes}.")
+
+    def _weights_shapes(self,
+                        input_shape: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """ Returns the shapes of the layer's weight arrays. """
+        return []
+
+    def _init_weights(self,
+                      shapes: List[Tuple[int, ...]]) -> List[np.ndarray]:
+        """ Initializes the weight arrays with the given shapes.
+
+        Kernels are initialized with the Glorot uniform initializer (the default
+        of `TensorFlow`) and biases (1D arrays) are initialized with zeros.
+        """
+        weights = []
+        for shape in shapes:
+            if len(shape) == 1:
+                weights.append(np.zeros(shape, dtype=self.dtype))
+            else:
+                receptive_field = int(np.prod(shape[:-2]))
+                fan_in = shape[-2] * receptive_field
+                fan_out = shape[-1] * receptive_field
+                limit = np.sqrt(6 / (fan_in + fan_out))
+                weights.append(np.random.uniform(-limit, limit, size=shape)
+                               .astype(self.dtype))
+        return weights
+
+    def build(self, input_shape: Tuple[int, ...]) -> None:
+        input_shape = tuple(input_shape)
+        self._weights = self._init_weights(self._weights_shapes(input_shape))
+        self._input_shape = input_shape
+
+    @abstractmethod
+    def _forward(self, x: np.ndarray) -> np.ndarray:
+        """ Computes the layer's output. """
+
+    def _forward_stacked(self,
+                         x: np.ndarray,
+                         weights: List[np.ndarray]) -> np.ndarray:
+        """ Computes the outputs of a group of layers like this one at once.
+
+        Used by :class:`.FixedTopologyPopulationPhenotype` to evaluate a whole
+        population in a single pass. The layers differ only in their weights.
+        This default implementation is used by layers without weights: the
+        group and batch dimensions are merged and :meth:`_forward` is called
+        once.
+
+        Args:
+            x (np.ndarray): Array with shape `(num_layers, N, ...)`. The element
+                `[g]` is the batch fed to the :math:`g^{th}` layer.
+            weights (List[np.ndarray]): The weight arrays of the layers,
+                stacked along a new first axis (one item per weight array).
+
+        Returns:
+            A numpy array with shape `(num_layers, N, ...)`.
+        """
+        out = self._forward(np.reshape(x, (-1,) + x.shape[2:]))
+        return np.reshape(out, x.shape[:2] + out.shape[1:])
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=self.dtype)
+        if self._input_shape is None:
+            self.build(x.shape)
+        elif x.shape[1:] != self._input_shape[1:]:
+            raise InvalidInputError(
+                "The given input's shape doesn't match the shape expected by "
+                f"the layer! Expected: {(None,) + self._input_shape[1:]}. "
+                f"Received: {x.shape}."
+            )
+        return self._forward(x)
+
+    def _new_instance(self) -> "NumpyLayer":
+        """ Returns a new instance of the layer, with newly initialized weights.
+        """
+        new_layer = copy.copy(self)
+        if self._input_shape is not None:
+            new_layer.build(self._input_shape)
+        return new_layer
+
+    def random_copy(self) -> "NumpyLayer":
+        if not self.mutable:
+            return self.deep_copy()
+        return self._new_instance()
+
+    def deep_copy(self) -> "NumpyLayer":
+        new_layer = copy.copy(self)
+        new_layer._weights = [w.copy() for w in self._weights]
+        return new_layer
+
+    def copy_with_weights(self, weights: List[np.ndarray]) -> "NumpyLayer":
+        self._check_weights_shapes(weights)
+        new_layer = copy.copy(self)
+        new_layer._weights = [np.ascontiguousarray(w, dtype=self.dtype)
+                              for w in weights]
+        return new_layer
+
+    def mutate_weights(self) -> None:
+        """ Randomly mutates the weights of the layer's connections.
+
+        Each weight has a chance to be perturbed by a predefined amount or to be
+        reset. The probabilities are obtained from the settings of the current
+        evolutionary session. The mutations of all the weight arrays are
+        sampled at once (see :func:`.mutation.sample_weights_mutations`) and the
+        arrays are changed in place.
+
+        If the layer is immutable, nothing happens (the layer's weights remain
+        unchanged).
+        """
+        if not self.mutable:
+            return
+
+        assert self.config is not None
+        if self.input_shape is None:
+            raise RuntimeError("Attempt to mutate the weights of a layer that "
+                               "didn't have its weight and bias matrices "
+                               "initialized!")
+
+        self._apply_weights_mutations(
+            mutation.sample_weights_mutations(self._weights_sizes(),
+                                              self.config)
+        )
+
+    def _weights_sizes(self) -> List[int]:
+        return [w.size for w in self._weights]
+
+    def _apply_weights_mutations(
+            self, mutations: List[mutation.WeightsMutation],
+    ) -> None:
+        for w, m in zip(self._weights, mutations):
+            mutation.apply_weights_mutation(w, m)
+
+    def mate(self, other: "NumpyLayer") -> "NumpyLayer":
+        if self.mutable != other.mutable:
+            raise IncompatibleLayersError("Attempt to mate an immutable "
+                                          "layer with a mutable layer!")
+
+        if other == self or not self.mutable:
+            return self.deep_copy()
+
+        return self.mating_func(self, other)  # type: ignore
+
+
+def _get_activation(
+        activation: TActivation,
+) -> Callable[[np.ndarray], np.ndarray]:
+    """ Returns the activation function with the given name. """
+    if activation is None:
+        return activations.linear
+    if isinstance(activation, str):
+        try:
+            return getattr(activations, activation)
+        except AttributeError as e:
+            raise ValueError(f"Unknown activation function: "
+                             f"\"{activation}\"!") from e
+    return activation
+
+
+def _padding(size: int,
+             window: int,
+             stride: int,
+             padding: str) -> Tuple[int, int, int]:
+    """ Computes the padding (before and after) and the output size of a
+    dimension of a sliding window operation, following `TensorFlow's`
+    conventions.
+    """
+    if padding == "valid":
+        return 0, 0, (size - window) // stride + 1
+    if padding == "same":
+        out = -(-size // stride)
+        total = max((out - 1) * stride + window - size, 0)
+        return total // 2, total - total // 2, out
+    raise ValueError(f"Invalid padding: \"{padding}\"! Expected \"valid\" or "
+                     "\"same\".")
+
+
+def _windows(x: np.ndarray,
+             window: Tuple[int, int],
+             strides: Tuple[int, int],
+             padding: str,
+             pad_value: float = 0) -> np.ndarray:
+    """ Returns a strided view of the sliding windows of a batch of images, with
+    shape `(batch, out_h, out_w, channels, window_h, window_w)`.
+    """
+    top, bottom, _ = _padding(x.shape[1], window[0], strides[0], padding)
+    left, right, _ = _padding(x.shape[2], window[1], strides[1], padding)
+    if top or bottom or left or right:
+        x = np.pad(x, ((0, 0), (top, bottom), (left, right), (0, 0)),
+                   constant_values=pad_value)
+    windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=(1, 2))
+    return windows[:, ::strides[0], ::strides[1]]
+
+
+class NPDenseLayer(NumpyLayer):
+    """ Densely-connected layer implemented with `NumPy`.
+
+    Equivalent to `tf.keras.layers.Dense`: computes
+    ``activation(x @ kernel + bias)``. The weights are a kernel with shape
+    `(input_dim, units)` and a bias vector with shape `(units,)`.
+
+    Args:
+        units (int): Number of neurons of the layer.
+        activation (TActivation): Activation function or the name of a function
+            of :mod:`nevopy.activations` (like "relu", "sigmoid", "tanh" or
+            "softmax"). If `None`, the linear activation is used.
+        mating_func (Optional[Callable[[BaseLayer, BaseLayer], BaseLayer]]):
+            Function that mates two layers (see :class:`.NumpyLayer`).
+        config (Optional[FixedTopologyConfig]): Settings being used in the
+            current evolutionary session.
+        input_shape (Optional[Tuple[int, ...]]): Shape of the data that will be
+            processed by the layer.
+        mutable (Optional[bool]): Whether or not the layer can have its weights
+            changed (mutation).
+        dtype (np.dtype): Data type of the layer's weights.
+    """
+
+    def __init__(self,
+                 units: int,
+                 activation: TActivation = None,
+                 mating_func: Optional[
+                     Callable[[BaseLayer, BaseLayer], BaseLayer]
+                 ] = mating.exchange_weights_mating,
+                 config: Optional[GeneticAlgorithmConfig] = None,
+                 input_shape: Optional[Tuple[int, ...]] = None,
+                 mutable: Optional[bool] = True,
+                 dtype: np.dtype = np.float32) -> None:
+        self.units = units
+        self.activation = _get_activation(activation)
+        super().__init__(mating_func=mating_func,
+                         config=config,
+                         input_shape=input_shape,
+                         mutable=mutable,
+                         dtype=dtype)
+
+    def _weights_shapes(self,
+                        input_shape: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        return [(input_shape[-1], self.units), (self.units,)]
+
+    def _forward(self, x: np.ndarray) -> np.ndarray:
+        kernel, bias = self._weights
+        return self.activation(x @ kernel + bias)
+
+    def _forward_stacked(self,
+                         x: np.ndarray,
+                         weights: List[np.ndarray]) -> np.ndarray:
+        kernel, bias = weights
+        if x.strides[0] == 0:
+            # all the layers receive the same batch: a single matrix is
+            # multiplied by each of the kernels
+            z = np.matmul(np.reshape(x[0], (-1, x.shape[-1])), kernel)
+        else:
+            z = np.matmul(np.reshape(x, (len(x), -1, x.shape[-1])), kernel)
+        z += bias[:, np.newaxis]
+        return self.activation(np.reshape(z, x.shape[:-1] + (self.units,)))
+
+
+class NPConv2DLayer(NumpyLayer):
+    """ 2D convolution layer implemented with `NumPy`.
+
+    Equivalent to `tf.keras.layers.Conv2D` (with the "channels last" data
+    format). The weights are a kernel with shape
+    `(kernel_h, kernel_w, in_channels, filters)` and a bias vector with shape
+    `(filters,)`.
+
+    Args:
+        filters (int): Number of filters of the layer.
+        kernel_size (Tuple[int, int]): Height and width of the filters.
+        strides (Tuple[int, int]): Strides of the convolution along the height
+            and the width.
+        padding (str): Either "valid" (no padding) or "same" (the input is
+            padded so the output has the same size of the input, when the
+            strides are 1).
+        activation (TActivation): Activation function or the name of a function
+            of :mod:`nevopy.activations`.
+        mating_func (Optional[Callable[[BaseLayer, BaseLayer], BaseLayer]]):
+            Function that mates two layers (see :class:`.NumpyLayer`).
+        config (Optional[FixedTopologyConfig]): Settings being used in the
+            current evolutionary session.
+        input_shape (Optional[Tuple[int, ...]]): Shape of the data that will be
+            processed by the layer.
+        mutable (Optional[bool]): Whether or not the layer can have its weights
+            changed (mutation).
+        dtype (np.dtype): Data type of the layer's weights.
+    """
+
+    def __init__(self,
+                 filters: int,
+                 kernel_size: Tuple[int, int],
+                 strides: Tuple[int, int] = (1, 1),
+                 padding: str = "valid",
+                 activation: TActivation = "relu",
+                 mating_func: Optional[
+                     Callable[[BaseLayer, BaseLayer], BaseLayer]
+                 ] = mating.exchange_units_mating,
+                 config: Optional[GeneticAlgorithmConfig] = None,
+                 input_shape: Optional[Tuple[int, ...]] = None,
+                 mutable: Optional[bool] = True,
+                 dtype: np.dtype = np.float32) -> None:
+        self.filters = filters
+        self.kernel_size = tuple(kernel_size)
+        self.strides = tuple(strides)
+        self.padding = padding
+        self.activation = _get_activation(activation)
+        super().__init__(mating_func=mating_func,
+                         config=config,
+                         input_shape=input_shape,
+                         mutable=mutable,
+                         dtype=dtype)
+
+    def _weights_shapes(self,
+                        input_shape: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        if len(input_shape) != 4:
+            raise ValueError("The input of a 2D convolution layer must have "
+                             "4 dimensions (batch, height, width, channels)! "
+                             f"Received: {input_shape}.")
+        return [self.kernel_size + (input_shape[-1], self.filters),
+                (self.filters,)]
+
+    def _forward(self, x: np.ndarray) -> np.ndarray:
+        kernel, bias = self._weights
+        windows = _windows(x, self.kernel_size, self.strides, self.padding)
+        z = np.tensordot(windows, kernel, axes=([3, 4, 5], [2, 0, 1]))
+        return self.activation(z + bias)
+
+    def _forward_stacked(self,
+                         x: np.ndarray,
+                         weights: List[np.ndarray]) -> np.ndarray:
+        kernel, bias = weights
+        windows = _windows(np.reshape(x, (-1,) + x.shape[2:]),
+                           self.kernel_size, self.strides, self.padding)
+        windows = np.reshape(windows, x.shape[:2] + windows.shape[1:])
+        z = np.einsum("gnhwcij,gijcf->gnhwf", windows, kernel, optimize=True)
+        return self.activation(z + bias[:, np.newaxis, np.newaxis, np.newaxis])
+
+
+class NPMaxPool2DLayer(NumpyLayer):
+    """ 2D max pooling layer implemented with `NumPy`.
+
+    Equivalent to `tf.keras.layers.MaxPool2D` (with the "channels last" data
+    format). This layer has no weights.
+
+    Args:
+        pool_size (Tuple[int, int]): Height and width of the pooling window.
+        strides (Optional[Tuple[int, int]]): Strides of the pooling window. If
+            `None`, it's equal to the pool size.
+        padding (str): Either "valid" or "same".
+        config (Optional[FixedTopologyConfig]): Settings being used in the
+            current evolutionary session.
+        input_shape (Optional[Tuple[int, ...]]): Shape of the data that will be
+            processed by the layer.
+    """
+
+    def __init__(self,
+                 pool_size: Tuple[int, int] = (2, 2),
+                 strides: Optional[Tuple[int, int]] = None,
+                 padding: str = "valid",
+                 config: Optional[GeneticAlgorithmConfig] = None,
+                 input_shape: Optional[Tuple[int, ...]] = None) -> None:
+        self.pool_size = tuple(pool_size)
+        self.strides = tuple(strides) if strides is not None else self.pool_size
+        self.padding = padding
+        super().__init__(mating_func=None,
+                         config=config,
+                         input_shape=input_shape,
+                         mutable=False)
+
+    def _forward(self, x: np.ndarray) -> np.ndarray:
+        windows = _windows(x, self.pool_size, self.strides, self.padding,
+                           pad_value=-np.inf)
+        return windows.max(axis=(4, 5))
+
+
+class NPFlattenLayer(NumpyLayer):
+    """ Flattens the input (keeping the batch dimension). This layer has no
+    weights.
+
+    Equivalent to `tf.keras.layers.Flatten`.
+
+    Args:
+        config (Optional[FixedTopologyConfig]): Settings being used in the
+            current evolutionary session.
+        input_shape (Optional[Tuple[int, ...]]): Shape of the data that will be
+            processed by the layer.
+    """
+
+    def __init__(self,
+                 config: Optional[GeneticAlgorithmConfig] = None,
+                 input_shape: Optional[Tuple[int, ...]] = None) -> None:
+        super().__init__(mating_func=None,
+                         config=config,
+                         input_shape=input_shape,
+                         mutable=False)
+
+    def _forward(self, x: np.ndarray) -> np.ndarray:
+        return np.reshape(x, (x.shape[0], -1))
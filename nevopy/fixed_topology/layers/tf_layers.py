@@ -36,9 +36,14 @@ import tensorflow as tf
 from nevopy.base_genome import InvalidInputError
 from nevopy.genetic_algorithm.config import GeneticAlgorithmConfig
 from nevopy.fixed_topology.layers import mating
+from nevopy.fixed_topology.layers import mutation
 from nevopy.fixed_topology.layers.base_layer import BaseLayer
 from nevopy.fixed_topology.layers.base_layer import IncompatibleLayersError
 
+#: Maximum fraction of the weights of a variable changed by a mutation for the
+#: changes to be scattered into the variable (instead of reassigning it).
+_SPARSE_UPDATE_MAX_PC = 0.1
+
 
 class TensorFlowLayer(BaseLayer):
     """ Wraps a `TensorFlow` layer.
@@ -190,8 +195,31 @@ class TensorFlowLayer(BaseLayer):
         return self._new_instance()
 
     def deep_copy(self) -> "TensorFlowLayer":
-        new_layer = self._new_instance()
-        new_layer.weights = self.weights
+        return self.copy_with_weights(self.weights)
+
+    def copy_with_weights(self,
+                          weights: List[np.ndarray]) -> "TensorFlowLayer":
+        """ Makes a copy of the layer with the given weights.
+
+        The `TensorFlow` layer of the copy is built with its initializers
+        temporarily replaced by zeros, so no random weights are generated only
+        to be overwritten.
+        """
+        new_layer = TensorFlowLayer(layer_type=self._layer_type,
+                                    mating_func=self.mating_func,
+                                    config=self.config,
+                                    mutable=self.mutable,
+                                    **self._tf_layer_kwargs)
+        if self._input_shape is not None:
+            tf_layer = new_layer.tf_layer
+            initializers = {k: v for k, v in vars(tf_layer).items()
+                            if k.endswith("_initializer") and v is not None}
+            for k in initializers:
+                setattr(tf_layer, k, tf.keras.initializers.Zeros())
+            new_layer.build(self._input_shape)
+            for k, v in initializers.items():
+                setattr(tf_layer, k, v)
+        new_layer.weights = weights
         return new_layer
 
     def mutate_weights(self,
@@ -204,6 +232,10 @@ class TensorFlowLayer(BaseLayer):
         reset. The probabilities are obtained from the settings of the current
         evolutionary session.
 
+        The mutations of all the layer's weight matrices are sampled at once
+        (see :func:`.mutation.sample_weights_mutations`) and the changes are
+        written directly to the `TensorFlow` variables of the layer.
+
         If the layer is immutable, nothing happens (the layer's weights remain
         unchanged).
         """
@@ -216,57 +248,55 @@ class TensorFlowLayer(BaseLayer):
                                "didn't have its weight and bias matrices "
                                "initialized!")
 
-        new_weights = []
-        for i, w in enumerate(self.weights):
-            old_shape = w.shape
-
-            # Mutating weights:
-            num_mutate = np.random.binomial(w.size,
-                                            self.config.weight_mutation_chance)
-            if num_mutate > 0:
-                w_perturbation = np.random.uniform(
-                    low=1 - self.config.weight_perturbation_pc,
-                    high=1 + self.config.weight_perturbation_pc,
-                    size=num_mutate,
-                )
-                mutate_idx = np.random.choice(range(w.size),
-                                              size=num_mutate,
-                                              replace=False)
-                w.flat[mutate_idx] = np.multiply(w.flat[mutate_idx],
-                                                 w_perturbation)
-
-            # Resetting weights:
-            num_reset = np.random.binomial(w.size,
-                                           self.config.weight_reset_chance)
-            if num_reset > 0:
-                reset_idx = np.random.choice(range(w.size),
-                                             size=num_reset,
-                                             replace=False)
-                w.flat[reset_idx] = np.random.uniform(
-                    low=self.config.new_weight_interval[0],
-                    high=self.config.new_weight_interval[1],
-                    size=num_reset,
-                )
+        mutations = mutation.sample_weights_mutations(self._weights_sizes(),
+                                                      self.config)
+        self._apply_weights_mutations(mutations)
 
-            # Saving weight matrix:
-            assert w.shape == old_shape
-            new_weights.append(w)
-
-            # Test/debug info:
-            if _test_info is not None:
-                # noinspection PyUnboundLocalVariable
-                _test_info[f"w{i}_perturbation"] = (w_perturbation
-                                                    if num_mutate > 0
-                                                    else np.array([]))
-                # noinspection PyUnboundLocalVariable
-                _test_info[f"w{i}_mutate_idx"] = (mutate_idx if num_mutate > 0
-                                                  else np.array([]))
-                # noinspection PyUnboundLocalVariable
-                _test_info[f"w{i}_reset_idx"] = (reset_idx if num_reset > 0
-                                                 else np.array([]))
-
-        # setting new weights and biases
-        self.weights = new_weights
+        # Test/debug info:
+        if _test_info is not None:
+            for i, m in enumerate(mutations):
+                _test_info[f"w{i}_perturbation"] = m.perturbation
+                _test_info[f"w{i}_mutate_idx"] = m.mutate_idx
+                _test_info[f"w{i}_reset_idx"] = m.reset_idx
+
+    def _weights_sizes(self) -> List[int]:
+        return [int(np.prod(v.shape)) for v in self.tf_layer.weights]
+
+    def _apply_weights_mutations(
+            self, mutations: List[mutation.WeightsMutation],
+    ) -> None:
+        """ Applies the given mutations to the layer's `TensorFlow` variables.
+
+        When only a small fraction of a variable's weights is changed, the
+        changed weights are gathered and scattered back in place. Otherwise,
+        the variable is read, changed and assigned at once.
+        """
+        for var, m in zip(self.tf_layer.weights, mutations):
+            size = int(np.prod(var.shape))
+            if m.num_changes == 0:
+                continue
+
+            if m.num_changes > size * _SPARSE_UPDATE_MAX_PC:
+                w = var.numpy()
+                mutation.apply_weights_mutation(w, m)
+                var.assign(w)
+                continue
+
+            # Keras 3 wraps the backing `tf.Variable` in its own variable type
+            if not isinstance(var, tf.Variable):
+                var = var.value
+
+            dtype = tf.as_dtype(var.dtype).as_numpy_dtype
+            if len(m.mutate_idx) > 0:
+                idx = np.stack(np.unravel_index(m.mutate_idx, var.shape),
+                               axis=-1)
+                var.scatter_nd_update(
+                    idx, tf.gather_nd(var, idx) * m.perturbation.astype(dtype)
+                )
+            if len(m.reset_idx) > 0:
+                idx = np.stack(np.unravel_index(m.reset_idx, var.shape),
+                               axis=-1)
+                var.scatter_nd_update(idx, m.new_values.astype(dtype))
 
     def mate(self, other: "TensorFlowLayer") -> "TensorFlowLayer":
         if self.mutable != other.mutable:
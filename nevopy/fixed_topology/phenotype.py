@@ -0,0 +1,157 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Implements the evaluation of whole populations of fixed-topology networks
+with stacked weights.
+"""
+
+from typing import List, Sequence, TYPE_CHECKING
+
+import numpy as np
+
+from nevopy.base_genome import IncompatibleGenomesError, InvalidInputError
+from nevopy.fixed_topology.layers.numpy_layers import NumpyLayer
+
+if TYPE_CHECKING:
+    from nevopy.fixed_topology.genomes import FixedTopologyGenome
+
+
+class FixedTopologyPopulationPhenotype:
+    """ Packed phenotype of a group of fixed-topology genomes, evaluated all at
+    once.
+
+    All the genomes of a population of :class:`.FixedTopologyGenome` usually
+    share the same architecture and differ only in their weights. The weight
+    arrays of the corresponding layers of the genomes are stacked into arrays
+    with shape `(num_genomes, ...)`, so the whole group is evaluated with a
+    single batched matrix multiplication (or convolution) per layer, instead
+    of one per genome.
+
+    Only genomes made of layers implemented with `NumPy` (subclasses of
+    :class:`.NumpyLayer`) can be packed. The hyperparameters of the layers
+    (activation functions, strides, etc.) are taken from the first genome.
+
+    The packed phenotype is built from snapshots of the genomes' weights, so it
+    must be rebuilt if any of the genomes change.
+
+    Args:
+        genomes (Sequence[FixedTopologyGenome]): The genomes to be packed. They
+            must have the same architecture (see :meth:`is_packable`).
+
+    Raises:
+        IncompatibleGenomesError: If the genomes can't be packed.
+    """
+
+    def __init__(self, genomes: Sequence["FixedTopologyGenome"]) -> None:
+        if not self.is_packable(genomes):
+            raise IncompatibleGenomesError(
+                "Only genomes that share the same architecture and that are "
+                "made of built NumPy layers can be packed!"
+            )
+
+        self._num_genomes = len(genomes)
+        self._input_shape = genomes[0].input_shape
+        self._layers = genomes[0].layers  # type: List[NumpyLayer]
+        self._weights = [
+            [np.stack([g.layers[i]._weights[j] for g in genomes])
+             for j in range(len(layer._weights))]
+            for i, layer in enumerate(self._layers)
+        ]  # type: List[List[np.ndarray]]
+
+    @staticmethod
+    def is_packable(genomes: Sequence["FixedTopologyGenome"]) -> bool:
+        """ Checks whether the given genomes can be packed.
+
+        The genomes can be packed if all of their layers are built instances of
+        :class:`.NumpyLayer` and if the corresponding layers of the genomes
+        have the same type and weights shapes.
+        """
+        if len(genomes) == 0:
+            return False
+
+        layers = genomes[0].layers
+        if any(not isinstance(layer, NumpyLayer) or layer.input_shape is None
+               for layer in layers):
+            return False
+
+        shapes = [[w.shape for w in layer._weights] for layer in layers]
+        for genome in genomes[1:]:
+            if (len(genome.layers) != len(layers)
+                    or any(type(l1) is not type(l2)
+                           for l1, l2 in zip(genome.layers, layers))
+                    or [[w.shape for w in layer._weights]
+                        for layer in genome.layers] != shapes):
+                return False
+        return True
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """ Feeds a separate batch of samples to each of the packed networks.
+
+        Args:
+            x (np.ndarray): Array with shape `(num_genomes, N, ...)`. The
+                element `[g]` is the batch fed to the :math:`g^{th}` genome.
+
+        Returns:
+            A numpy array with shape `(num_genomes, N, ...)`, with the output of
+            each genome for each sample.
+
+        Raises:
+            InvalidInputError: If the shape of the samples doesn't match the
+                input shape of the genomes.
+        """
+        x = np.asarray(x, dtype=self._layers[0].dtype)
+        if (x.ndim != len(self._input_shape) + 1
+                or x.shape[0] != self._num_genomes
+                or x.shape[2:] != self._input_shape[1:]):
+            raise InvalidInputError(
+                "The input must have shape (num_genomes, N, "
+                f"{str(self._input_shape[1:])[1:-1]}), with num_genomes = "
+                f"{self._num_genomes}. Received: {x.shape}."
+            )
+
+        for layer, weights in zip(self._layers, self._weights):
+            x = layer._forward_stacked(x, weights)
+        return x
+
+    def process_batch(self, x: np.ndarray) -> np.ndarray:
+        """ Feeds the same batch of samples to all the packed networks.
+
+        Args:
+            x (np.ndarray): Array with shape `(N, ...)`, in which each element
+                is a sample.
+
+        Returns:
+            A numpy array with shape `(num_genomes, N, ...)`. The element
+            `[g, i]` holds the output of the :math:`g^{th}` genome for the
+            :math:`i^{th}` sample.
+        """
+        x = np.asarray(x, dtype=self._layers[0].dtype)
+        return self.process(np.broadcast_to(x, (self._num_genomes,) + x.shape))
+
+    def reset_state(self, batch_size: int = 1) -> None:
+        """ This method doesn't do anything.
+
+        Fixed-topology networks have no internal state. It exists for
+        compatibility with the other packed phenotypes.
+        """
+        pass
@@ -24,6 +24,10 @@
 """ Imports core names of :mod:`nevopy.genetic_algorithms`.
 """
 
-from nevopy.genetic_algorithm.config import GeneticAlgorithmConfig
-from nevopy.genetic_algorithm.population import DefaultSpecies
-from nevopy.genetic_algorithm.population import GeneticPopulation
+from nevopy.utils.lazy_import import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    "GeneticAlgorithmConfig": "nevopy.genetic_algorithm.config",
+    "DefaultSpecies": "nevopy.genetic_algorithm.population",
+    "GeneticPopulation": "nevopy.genetic_algorithm.population",
+})
@@ -110,6 +110,10 @@ class GeneticAlgorithmConfig:
         species_no_improvement_limit (int): If a species doesn't show
             improvement in its best fitness for this amount of generations, it
             will be removed from the species' list of the population.
+        parallel_speciation (bool): If `True`, the distances between the
+            genomes and the representatives of the species are computed in
+            chunks by the population's processing scheduler. Useful for large
+            populations with many species.
 
         mass_extinction_threshold (int): If the population's fitness doesn't
             improve for this amount of generations, the whole population, with
@@ -153,6 +157,7 @@ class GeneticAlgorithmConfig:
         species_elitism_threshold=5,
         elitism_pc=0.03,
         species_no_improvement_limit=15,
+        parallel_speciation=False,
         # mass extinction
         mass_extinction_threshold=15,
         maex_improvement_threshold_pc=0.03,
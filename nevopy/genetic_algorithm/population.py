@@ -116,9 +116,6 @@ class GeneticPopulation(BasePopulation):
             genomes should use speciation or not.
     """
 
-    #: Default processing scheduler used by instances of this class.
-    DEFAULT_SCHEDULER = processing.RayProcessingScheduler
-
     def __init__(self,
                  size: int,
                  base_genome: BaseGenome,
@@ -131,7 +128,7 @@ class GeneticPopulation(BasePopulation):
                          processing_scheduler=(
                              processing_scheduler
                              if processing_scheduler is not None
-                             else GeneticPopulation.DEFAULT_SCHEDULER())
+                             else GeneticPopulation.default_scheduler())
                          )
 
         # Base genome:
@@ -157,6 +154,7 @@ class GeneticPopulation(BasePopulation):
         self._mass_extinction_counter = 0
         self._past_best_fitness = None  # type: Optional[float]
         self._last_improvement = 0
+        self._preys = 0
 
         self._cached_rank_prob_dist = utils.rank_prob_dist(
             size=self._size,
@@ -173,6 +171,18 @@ class GeneticPopulation(BasePopulation):
                                        members=self.genomes[:])]
         self.species[0].update_representative()
 
+    @classmethod
+    def default_scheduler(cls) -> processing.ProcessingScheduler:
+        """ Creates a new :class:`.RayProcessingScheduler`, unless another
+        default scheduler was assigned to :attr:`DEFAULT_SCHEDULER`.
+
+        The scheduler is only resolved here, so :mod:`ray` isn't imported by
+        populations that are given a processing scheduler.
+        """
+        if cls.DEFAULT_SCHEDULER is not None:
+            return super().default_scheduler()
+        return processing.RayProcessingScheduler()
+
     @property
     def config(self):
         return self._config
@@ -196,7 +206,9 @@ class GeneticPopulation(BasePopulation):
             fitness_function (Callable[[BaseGenome], float]): Fitness function
                 to be used to evaluate the fitness of individual genomes. It
                 must receive a genome as input and produce a float (the genome's
-                fitness) as output.
+                fitness) as output. Alternatively, an instance of
+                :class:`.PopulationFitnessFunction` can be used to evaluate the
+                whole population at once.
             callbacks (Optional[List[Callback]]): List with instances of
                 :class:`.Callback` that will be called during the evolutionary
                 session. By default, a :class:`.History` callback is always
@@ -242,39 +254,14 @@ class GeneticPopulation(BasePopulation):
                 cb.on_generation_start(generation_num, generations)
 
             # Calculating and assigning FITNESS:
-            fitness_results = self.scheduler.run(
-                items=self.genomes,
-                func=fitness_function
+            fitness_results = self.compute_fitness(
+                fitness_function
             )  # type: Sequence[float]
 
             for genome, fitness in zip(self.genomes, fitness_results):
                 genome.fitness = fitness
 
-            best = self.fittest()
-
-            # CALLBACK: on_fitness_calculated
-            avg_fitness = self.average_fitness()
-            for cb in callbacks:
-                cb.on_fitness_calculated(best_fitness=best.fitness,
-                                         avg_fitness=avg_fitness)
-
-            # Checking if fitness improved:
-            improv_diff = best.fitness - self._past_best_fitness
-            improv_min_pc = self._config.maex_improvement_threshold_pc
-
-            if improv_diff >= abs(self._past_best_fitness * improv_min_pc):
-                self._mass_extinction_counter = 0
-                self._past_best_fitness = best.fitness
-            else:
-                self._mass_extinction_counter += 1
-
-            self._config.update_mass_extinction(self._mass_extinction_counter)
-
-            # CALLBACK: on_mass_extinction_counter_updated
-            for cb in callbacks:
-                cb.on_mass_extinction_counter_updated(
-                    self._mass_extinction_counter
-                )
+            best = self._update_records(callbacks)
 
             preys = 0
 
@@ -328,6 +315,127 @@ class GeneticPopulation(BasePopulation):
 
         return history_callback
 
+    def _update_records(self, callbacks: List[Callback]) -> BaseGenome:
+        """ Updates the improvement records and the mass extinction counter
+        after the fitness of the population's genomes has been calculated,
+        notifying the callbacks.
+
+        Returns:
+            The fittest genome in the population.
+        """
+        best = self.fittest()
+
+        # CALLBACK: on_fitness_calculated
+        avg_fitness = self.average_fitness()
+        for cb in callbacks:
+            cb.on_fitness_calculated(best_fitness=best.fitness,
+                                     avg_fitness=avg_fitness,
+                                     **self._cache_info)
+
+        # Checking if fitness improved:
+        improv_diff = best.fitness - self._past_best_fitness
+        improv_min_pc = self._config.maex_improvement_threshold_pc
+
+        if improv_diff >= abs(self._past_best_fitness * improv_min_pc):
+            self._mass_extinction_counter = 0
+            self._past_best_fitness = best.fitness
+        else:
+            self._mass_extinction_counter += 1
+
+        self._config.update_mass_extinction(self._mass_extinction_counter)
+
+        # CALLBACK: on_mass_extinction_counter_updated
+        for cb in callbacks:
+            cb.on_mass_extinction_counter_updated(
+                self._mass_extinction_counter
+            )
+        return best
+
+    def _steady_state_start(self) -> None:
+        """ Resets the improvement records (see :meth:`.evolve_steady_state`).
+        """
+        self._last_improvement = 0
+        self._past_best_fitness = float("-inf")
+        self._mass_extinction_counter = 0
+        self._config.update_mass_extinction(0)
+        self._preys = 0
+
+    def _steady_state_offspring(self) -> BaseGenome:
+        """ Generates a new genome for steady-state evolution.
+
+        The parents are chosen as in :meth:`.reproduction` and the new genome
+        has a chance of being replaced by a random genome (predatism).
+        """
+        for sp in self.species:
+            sp.members.sort(key=lambda genome: genome.fitness, reverse=True)
+
+        parents1, parents2 = self._select_mating_partners(offspring_count=1)
+        predate = bool(self._select_prey(offspring_count=1)[0])
+        self._preys += predate
+        return GeneticPopulation.generate_offspring(
+            (parents1[0], parents2[0], predate)
+        )
+
+    def _steady_state_insert(self, genome: BaseGenome, generation: int) -> None:
+        """ Inserts a newly evaluated genome into the population.
+
+        The genome with the lowest fitness is removed from the population. If
+        speciation is enabled, the new genome is placed in the first species
+        it's compatible with (a new species is created if there is none).
+        """
+        # Removing the weakest genome:
+        weakest = self.genomes.pop(
+            int(np.argmin([g.fitness for g in self.genomes]))
+        )
+        for sp in self.species:
+            sp.members = [g for g in sp.members if g is not weakest]
+        self.species = [sp for sp in self.species if len(sp.members) > 0]
+
+        # Speciating the new genome:
+        chosen_species = None
+        if not self._speciation:
+            if len(self.species) == 0:
+                self.species = [DefaultSpecies(creation_gen=generation)]
+            chosen_species = self.species[0]
+        elif len(self.species) > 0:
+            hits = np.flatnonzero(self.distance_matrix(
+                [genome], [sp.representative for sp in self.species]
+            )[0] <= self._config.species_distance_threshold)
+            if len(hits) > 0:
+                chosen_species = self.species[hits[0]]
+
+        if chosen_species is None:
+            chosen_species = DefaultSpecies(creation_gen=generation)
+            chosen_species.representative = genome
+            self.species.append(chosen_species)
+
+        chosen_species.members.append(genome)
+        self.genomes.append(genome)
+
+    def _virtual_generation_end(self,
+                                generation: int,
+                                generations: int,
+                                callbacks: List[Callback]) -> None:
+        """ Updates the population's records, calls the callbacks and
+        re-speciates the population at the end of a virtual generation.
+        """
+        self._update_records(callbacks)
+
+        # SPECIATION
+        if self._speciation:
+            # CALLBACK: on_speciation_start
+            for cb in callbacks:
+                cb.on_speciation_start()
+
+            self.speciate(current_generation=generation)
+        else:
+            self.species[0].members = self.genomes[:]
+
+        # CALLBACK: on_generation_end
+        for cb in callbacks:
+            cb.on_generation_end(generation, generations, preys=self._preys)
+        self._preys = 0
+
     def mass_extinction(self, best_genome: BaseGenome) -> None:
         """ All the genomes in the population (except for the best genome) are
         replaced by new random genomes (random copies of the population's base
@@ -601,22 +709,35 @@ class GeneticPopulation(BasePopulation):
 
         self.species = surviving_species
 
-        # Assigning genomes to species:
+        # Distances between the genomes and the existing species:
         dist_threshold = self._config.species_distance_threshold
-        for genome in self.genomes:
+        old_species = list(self.species)
+        compatible = self.distance_matrix(
+            self.genomes, [sp.representative for sp in old_species]
+        ) <= dist_threshold
+        new_species = []  # type: List[DefaultSpecies]
+
+        # Assigning genomes to species:
+        for i, genome in enumerate(self.genomes):
             chosen_species = None
 
             # Checking compatibility with existing species:
-            for sp in self.species:
-                if sp.compatibility(genome) <= dist_threshold:
-                    chosen_species = sp
-                    break
+            hits = np.flatnonzero(compatible[i])
+            if len(hits) > 0:
+                chosen_species = old_species[hits[0]]
+            elif len(new_species) > 0:
+                hits = np.flatnonzero(self.distance_matrix(
+                    [genome], [sp.representative for sp in new_species]
+                )[0] <= dist_threshold)
+                if len(hits) > 0:
+                    chosen_species = new_species[hits[0]]
 
             # Creating new species, if necessary:
             if chosen_species is None:
                 chosen_species = DefaultSpecies(creation_gen=current_generation)
                 chosen_species.representative = genome
                 self.species.append(chosen_species)
+                new_species.append(chosen_species)
 
             # Adding genome to the chosen species:
             chosen_species.members.append(genome)
@@ -24,28 +24,40 @@
 """ Imports core names of :mod:`nevopy.neat`.
 """
 
-# Config
-from nevopy.neat.config import NeatConfig
+from nevopy.utils.lazy_import import lazy_loader
 
-# Genes
-from nevopy.neat.genes import align_connections
-from nevopy.neat.genes import ConnectionGene
-from nevopy.neat.genes import NodeGene
+__getattr__, __dir__ = lazy_loader(__name__, {
+    # Config
+    "NeatConfig": "nevopy.neat.config",
 
-# Genomes
-from nevopy.neat.genomes import FixTopNeatGenome
-from nevopy.neat.genomes import NeatGenome
+    # Genes
+    "align_connections": "nevopy.neat.genes",
+    "ConnectionGene": "nevopy.neat.genes",
+    "NodeGene": "nevopy.neat.genes",
 
-# ID handler
-from nevopy.neat.id_handler import IdHandler
+    # Genomes
+    "FixTopNeatGenome": "nevopy.neat.genomes",
+    "NeatGenome": "nevopy.neat.genomes",
 
-# Population
-from nevopy.neat.population import NeatPopulation
+    # ID handler
+    "IdHandler": "nevopy.neat.id_handler",
+    "ProvisionalIdHandler": "nevopy.neat.id_handler",
 
-# Species
-from nevopy.neat.species import NeatSpecies
+    # Phenotype
+    "NeatPhenotype": "nevopy.neat.phenotype",
+    "NeatPopulationPhenotype": "nevopy.neat.phenotype",
 
-# Visualization
-from nevopy.neat.visualization import NodeVisualizationInfo
-from nevopy.neat.visualization import visualize_activations
-from nevopy.neat.visualization import visualize_genome
+    # Population
+    "NeatPopulation": "nevopy.neat.population",
+
+    # Serialization
+    "serialization": "nevopy.neat.serialization",
+
+    # Species
+    "NeatSpecies": "nevopy.neat.species",
+
+    # Visualization
+    "NodeVisualizationInfo": "nevopy.neat.visualization",
+    "visualize_activations": "nevopy.neat.visualization",
+    "visualize_genome": "nevopy.neat.visualization",
+})
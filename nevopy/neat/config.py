@@ -182,6 +182,10 @@ class NeatConfig(ne.genetic_algorithm.config.GeneticAlgorithmConfig):
         species_no_improvement_limit (int): If a species doesn't show
             improvement in its best fitness for this amount of generations, it
             will be extinct.
+        parallel_speciation (bool): If `True`, the distances between the
+            genomes and the representatives of the species are computed in
+            chunks by the population's processing scheduler. Useful for large
+            populations with many species.
 
         reset_innovations_period (Optional[int]): If `None`, the innovation IDs
             of the new genes will never be reset. If an `int`, the innovation
@@ -194,6 +198,12 @@ class NeatConfig(ne.genetic_algorithm.config.GeneticAlgorithmConfig):
             considers its last output when calculating its new output.
         initial_node_activation (float): Initial activation value cached by a
             node when it's created or reset.
+        prune_evaluated_genomes (bool): If `True`, the fitness function
+            receives pruned copies of the genomes, without the structure that
+            can't influence their outputs (see :meth:`.NeatGenome.pruned`).
+            This reduces the cost of sending the genomes to the workers of a
+            processing scheduler, but the fitness function won't receive the
+            population's genome objects.
     """
 
     #: Attributes supported by the class and their default values. Each
@@ -236,10 +246,12 @@ class NeatConfig(ne.genetic_algorithm.config.GeneticAlgorithmConfig):
         species_distance_threshold=2,
         species_elitism_threshold=5,
         species_no_improvement_limit=15,
+        parallel_speciation=False,
         # others
         reset_innovations_period=5,
         allow_self_connections=True,
-        initial_node_activation=0
+        initial_node_activation=0,
+        prune_evaluated_genomes=False,
     )
 
     #: Name of the attributes whose values change according to the mass
@@ -27,6 +27,10 @@
 from enum import Enum
 from typing import Callable, List, Optional, Tuple
 
+import numpy as np
+
+import nevopy as ne
+
 
 class NodeGene:
     """ A gene that represents/encodes a neuron (node) in a neural network.
@@ -36,6 +40,12 @@ class NodeGene:
     has an activation function, which is applied to inputs received from other
     nodes of the network.
 
+    A node gene can either be standalone, holding its own data, or be a
+    lightweight view of a row of the node table of a :class:`.NeatGenome` (see
+    :meth:`.genome_view`). Genomes store their genes in contiguous numpy arrays
+    and only hand out views, so reading or changing an attribute of a node
+    obtained from a genome reads or changes the genome's arrays.
+
     Args:
         node_id (int): The node's identifier / innovation number.
         node_type (NodeGene.Type): The node's type.
@@ -54,6 +64,10 @@ class NodeGene:
             that have this node as the destination.
     """
 
+    __slots__ = ("_id", "_type", "_function", "_initial_activation",
+                 "_activation", "_in_connections", "_out_connections",
+                 "_genome", "_idx")
+
     def __init__(self,
                  node_id: int,
                  node_type: "NodeGene.Type",
@@ -62,16 +76,36 @@ class NodeGene:
         assert node_id is not None
         self._id = node_id
         self._type = node_type
-        self.initial_activation = initial_activation
+        self._function = activation_func
+        self._initial_activation = initial_activation
         self._activation = initial_activation
-        self.function = activation_func
-        self.in_connections = []   # type: List[ConnectionGene]
-        self.out_connections = []  # type: List[ConnectionGene]
+        self._in_connections = []   # type: List[ConnectionGene]
+        self._out_connections = []  # type: List[ConnectionGene]
+        self._genome = None  # type: Optional["ne.neat.NeatGenome"]
+        self._idx = None     # type: Optional[int]
 
     class Type(Enum):
         """ Specifies the possible types of node genes. """
         INPUT, BIAS, HIDDEN, OUTPUT = range(4)
 
+    @classmethod
+    def genome_view(cls, genome: "ne.neat.NeatGenome", idx: int) -> "NodeGene":
+        """ Creates a view of a row of a genome's node table.
+
+        Args:
+            genome (NeatGenome): The genome that stores the node's data.
+            idx (int): Row of the node in the genome's node table (the position
+                of the node in :meth:`.NeatGenome.nodes`).
+
+        Returns:
+            A node gene whose attributes are read from and written to the
+            genome's arrays.
+        """
+        node = cls.__new__(cls)
+        node._genome = genome
+        node._idx = idx
+        return node
+
     @property
     def id(self) -> int:
         """ Innovation ID of the gene.
@@ -82,21 +116,87 @@ class NodeGene:
         original historical ancestor of each gene. New genes are assigned new
         increasingly higher numbers." - :cite:`stanley:ec02`
         """
+        if self._genome is not None:
+            return int(self._genome._node_ids[self._idx])
         return self._id
 
     @property
     def type(self) -> "NodeGene.Type":
         """ Type of the node (input, bias, hidden or output). """
+        if self._genome is not None:
+            return _NODE_TYPES[self._genome._node_types[self._idx]]
         return self._type
 
+    @property
+    def function(self) -> Callable[[float], float]:
+        """ Activation function of the node. """
+        if self._genome is not None:
+            g = self._genome
+            return g._functions[g._node_funcs[self._idx]]
+        return self._function
+
+    @function.setter
+    def function(self, f: Callable[[float], float]) -> None:
+        if self._genome is not None:
+            g = self._genome
+            func_id = g._function_id(f)
+            g._own_topology()
+            g._node_funcs[self._idx] = func_id
+            g.invalidate_phenotype()
+        else:
+            self._function = f
+
+    @property
+    def initial_activation(self) -> float:
+        """ Initial value of the node's activation. """
+        if self._genome is not None:
+            return float(self._genome._node_init[self._idx])
+        return self._initial_activation
+
+    @initial_activation.setter
+    def initial_activation(self, value: float) -> None:
+        if self._genome is not None:
+            self._genome._own_topology()
+            self._genome._node_init[self._idx] = value
+            self._genome.invalidate_phenotype()
+        else:
+            self._initial_activation = value
+
     @property
     def activation(self) -> float:
         """
         The node's cached activation value, i.e., the node's output when it was
         last processed.
         """
+        if self._genome is not None:
+            return self._genome._node_act[self._idx]
         return self._activation
 
+    def _set_activation(self, value: float) -> None:
+        """ Updates the node's cached activation value. """
+        if self._genome is not None:
+            self._genome._node_act[self._idx] = value
+        else:
+            self._activation = value
+
+    @property
+    def in_connections(self) -> List["ConnectionGene"]:
+        """ Connections that have this node as the destination. """
+        if self._genome is not None:
+            g = self._genome
+            cons = g._connection_views()
+            return [cons[i] for i in g._adjacency()[0][self._idx]]
+        return self._in_connections
+
+    @property
+    def out_connections(self) -> List["ConnectionGene"]:
+        """ Connections that have this node as the source. """
+        if self._genome is not None:
+            g = self._genome
+            cons = g._connection_views()
+            return [cons[i] for i in g._adjacency()[1][self._idx]]
+        return self._out_connections
+
     def activate(self, x: float) -> None:
         """ Applies the node's activation function to the given input.
 
@@ -107,7 +207,7 @@ class NodeGene:
         Returns:
             None. The node's output is updated internally.
         """
-        self._activation = self.function(x)
+        self._set_activation(self.function(x))
 
     def simple_copy(self) -> "NodeGene":
         """ Makes and returns a simple copy of this node.
@@ -116,13 +216,14 @@ class NodeGene:
 
         The copied node shares the same values for all the attributes of the
         source node, except for the connections. The copied node is created
-        without any connections.
+        without any connections and is always standalone (it's not bound to a
+        genome).
 
         Returns:
             A copy of this node without any connection.
         """
-        return NodeGene(node_id=self._id,
-                        node_type=self._type,
+        return NodeGene(node_id=self.id,
+                        node_type=self.type,
                         activation_func=self.function,
                         initial_activation=self.initial_activation)
 
@@ -131,7 +232,11 @@ class NodeGene:
         Resets the node's activation value (it's cached output) to its initial
         value.
         """
-        self._activation = self.initial_activation
+        self._set_activation(self.initial_activation)
+
+
+#: Node types indexed by their values (used to decode the genomes' arrays).
+_NODE_TYPES = tuple(NodeGene.Type)
 
 
 class ConnectionGene:
@@ -140,6 +245,11 @@ class ConnectionGene:
     A connection gene represents/encodes a connection (edge) between two nodes
     (neurons) of a neural network (phenotype of a genome).
 
+    Like :class:`.NodeGene`, a connection gene can either be standalone or be a
+    lightweight view of a row of the connection table of a :class:`.NeatGenome`
+    (see :meth:`.genome_view`). Changing the weight or the state of a view
+    changes the genome's arrays and discards the genome's compiled phenotype.
+
     Args:
         cid (int): The innovation number of the connection. As described in the
             original NEAT paper :cite:`stanley:ec02`, this serves as a
@@ -160,6 +270,9 @@ class ConnectionGene:
             network.
     """
 
+    __slots__ = ("_id", "_from_node", "_to_node", "_weight", "_enabled",
+                 "_genome", "_idx")
+
     def __init__(self,
                  cid: int,
                  from_node: NodeGene,
@@ -169,8 +282,31 @@ class ConnectionGene:
         self._id = cid
         self._from_node = from_node
         self._to_node = to_node
-        self.weight = weight
-        self.enabled = enabled
+        self._weight = weight
+        self._enabled = enabled
+        self._genome = None  # type: Optional["ne.neat.NeatGenome"]
+        self._idx = None     # type: Optional[int]
+
+    @classmethod
+    def genome_view(cls,
+                    genome: "ne.neat.NeatGenome",
+                    idx: int) -> "ConnectionGene":
+        """ Creates a view of a row of a genome's connection table.
+
+        Args:
+            genome (NeatGenome): The genome that stores the connection's data.
+            idx (int): Row of the connection in the genome's connection table
+                (the position of the connection in
+                :attr:`.NeatGenome.connections`).
+
+        Returns:
+            A connection gene whose attributes are read from and written to the
+            genome's arrays.
+        """
+        con = cls.__new__(cls)
+        con._genome = genome
+        con._idx = idx
+        return con
 
     @property
     def id(self) -> int:
@@ -182,23 +318,66 @@ class ConnectionGene:
          nodes that form the connection, this ID is helpful to increase the
          speed of certain comparisons.
         """
+        if self._genome is not None:
+            return int(self._genome._con_ids[self._idx])
         return self._id
 
     @property
     def from_node(self) -> NodeGene:
         """ Node where the connection is originated (source node). """
+        if self._genome is not None:
+            g = self._genome
+            return g._node_views()[g._con_src[self._idx]]
         return self._from_node
 
     @property
     def to_node(self) -> NodeGene:
         """ Node to where the connection is headed (destination node). """
+        if self._genome is not None:
+            g = self._genome
+            return g._node_views()[g._con_dst[self._idx]]
         return self._to_node
 
+    @property
+    def weight(self) -> float:
+        """ The weight of the connection. """
+        if self._genome is not None:
+            return float(self._genome._con_weights[self._idx])
+        return self._weight
+
+    @weight.setter
+    def weight(self, value: float) -> None:
+        if self._genome is not None:
+            self._genome._con_weights[self._idx] = value
+            self._genome.invalidate_phenotype()
+        else:
+            self._weight = value
+
+    @property
+    def enabled(self) -> bool:
+        """ Whether the connection is enabled or not. """
+        if self._genome is not None:
+            return bool(self._genome._con_enabled[self._idx])
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        if self._genome is not None:
+            self._genome._own_topology()
+            self._genome._con_enabled[self._idx] = value
+            self._genome._live_cache = None
+            self._genome.invalidate_phenotype()
+        else:
+            self._enabled = value
+
     def self_connecting(self) -> bool:
         """
         Returns `True` if the connection is connecting a node to itself and
         `False` otherwise.
         """
+        if self._genome is not None:
+            g = self._genome
+            return bool(g._con_src[self._idx] == g._con_dst[self._idx])
         return self._from_node == self._to_node
 
 
@@ -236,14 +415,12 @@ def align_connections(
         (on one of the lists) and a `None` value (on the other list), the genes
         are either disjoint or excess.
     """
-    con_dict1 = {c.id: c for c in con_list1}
-    con_dict2 = {c.id: c for c in con_list2}
-    union = sorted(set(con_dict1.keys()) | set(con_dict2.keys()))
+    ids1 = np.array([c.id for c in con_list1], dtype=np.int64)
+    ids2 = np.array([c.id for c in con_list2], dtype=np.int64)
+    union = np.union1d(ids1, ids2)
 
-    aligned1, aligned2 = [], []
-    for cid in union:
-        aligned1.append(con_dict1[cid] if cid in con_dict1 else None)
-        aligned2.append(con_dict2[cid] if cid in con_dict2 else None)
+    aligned1 = _align_to(union, ids1, con_list1)
+    aligned2 = _align_to(union, ids2, con_list2)
 
     # debug
     if print_alignment:
@@ -254,6 +431,19 @@ def align_connections(
     return aligned1, aligned2
 
 
+def _align_to(union: np.ndarray,
+              ids: np.ndarray,
+              connections: List[ConnectionGene],
+) -> List[Optional[ConnectionGene]]:
+    """ Places each connection in the position of its ID in the sorted array
+    ``union`` (positions with no connection are filled with `None`).
+    """
+    aligned = [None] * len(union)  # type: List[Optional[ConnectionGene]]
+    for i, pos in enumerate(np.searchsorted(union, ids).tolist()):
+        aligned[pos] = connections[i]
+    return aligned
+
+
 class NodeIdException(Exception):
     """ Indicates that an attempt has been made to assign a new ID to a gene
     node that already has an ID.
@@ -28,14 +28,15 @@ phenotype). In this implementation, there is no distinction between a genome and
 the network it encodes. In NEAT, the genome is the entity subject to evolution.
 """
 
+import hashlib
 import logging
 import os
-from typing import Any, cast, Dict, List, Optional, Sequence, Tuple
+from typing import (Any, Callable, cast, Dict, List, Optional, Sequence, Tuple,
+                    Union)
 
 import numpy as np
 # np.warnings.filterwarnings("ignore", category=np.VisibleDeprecationWarning) \
     # pylint: disable=wrong-import-position
-from tensorflow import reshape
 
 import nevopy as ne
 
@@ -79,89 +80,141 @@ class NeatGenome(ne.base_genome.BaseGenome):
         species_id (int): Indicates the species to which the genome belongs.
         fitness (float): The last calculated fitness of the genome.
         adj_fitness (float): The last calculated adjusted fitness of the genome.
-        hidden_nodes (:obj:`list` of :obj:`.NodeGene`): List with all the node
-            genes of the type :attr:`.NodeGene.Type.HIDDEN` in the genome.
-        connections (:obj:`list` of :obj:`.ConnectionGene`): List with all the
-            connection genes in the genome.
-        _existing_connections_dict (Dict[int, Set]): Used as a fast lookup table
-            to consult existing connections in the network. Given a node N, it
-            maps N's ID to the IDs of all the nodes that have a connection with
-            N as the source.
+        _node_ids (np.ndarray): Innovation IDs of the genome's nodes. Together
+            with ``_node_types``, ``_node_funcs`` (indices in ``_functions``),
+            ``_node_init`` and ``_node_act``, it forms the genome's node table.
+            The rows are ordered as in :meth:`.nodes`.
+        _con_ids (np.ndarray): Innovation IDs of the genome's connections.
+            Together with ``_con_src`` and ``_con_dst`` (rows of the nodes in
+            the node table), ``_con_weights`` and ``_con_enabled``, it forms the
+            genome's connection table.
+        _owns_topology (bool): Whether the genome's topology (the node table,
+            the connection table, except for the weights, and their lookup
+            tables) isn't shared with other genomes. Copies of a genome share
+            its topology until one of them changes it (copy-on-write).
+        _phenotype (Optional[NeatPhenotype]): Cached compiled version of the
+            genome's network (see :meth:`.compile`). It's discarded whenever
+            the genome is mutated.
     """
 
+    #: Attributes shared by a genome and its copies (see :meth:`.deep_copy`).
+    _TOPOLOGY_ATTRS = ("_functions", "_node_ids", "_node_types", "_node_funcs",
+                       "_node_init", "_con_ids", "_con_src", "_con_dst",
+                       "_con_enabled", "_node_rows", "_con_lookup",
+                       "_con_order", "_adjacency_cache", "_free_slots_cache",
+                       "_live_cache")
+
     def __init__(self,
                  num_inputs: int,
                  num_outputs: int,
                  config: "ne.neat.config.NeatConfig",
                  initial_connections: bool = True) -> None:
         super().__init__()
+        self._owns_topology = True
         self._config = config
         self.species_id = None        # type: Optional[int]
-        self._activated_nodes = None  # type: Optional[Dict[int, bool]]
+        self._phenotype = None  \
+            # type: Optional["ne.neat.phenotype.NeatPhenotype"]
 
         self.fitness = 0.0
         self.adj_fitness = 0.0
 
-        self.input_nodes = []   # type: List["ne.neat.NodeGene"]
-        self.hidden_nodes = []  # type: List["ne.neat.NodeGene"]
-        self.output_nodes = []  # type: List["ne.neat.NodeGene"]
-        self.bias_node = None   # type: Optional["ne.neat.NodeGene"]
-
-        self.connections = []  # type: List["ne.neat.ConnectionGene"]
-        self._existing_connections_dict = {} \
-            # type: Dict[int, Dict[int, "ne.neat.ConnectionGene"]]
         self._output_activation = self.config.out_nodes_activation
         self._hidden_activation = self.config.hidden_nodes_activation
 
-        # init input nodes
-        node_counter = 0
-        for _ in range(num_inputs):
-            self.input_nodes.append(
-                ne.neat.NodeGene(
-                    node_id=node_counter,
-                    node_type=ne.neat.NodeGene.Type.INPUT,
-                    activation_func=ne.activations.linear,
-                    initial_activation=self.config.initial_node_activation)
-            )
-            node_counter += 1
-
-        # init bias node
-        if self.config.bias_value is not None:
-            self.bias_node = ne.neat.NodeGene(
-                node_id=node_counter,
-                node_type=ne.neat.NodeGene.Type.BIAS,
-                activation_func=ne.activations.linear,
-                initial_activation=self.config.bias_value,
-            )
-            node_counter += 1
-
-        # init output nodes
-        connection_counter = 0
-        for _ in range(num_outputs):
-            out_node = ne.neat.NodeGene(
-                node_id=node_counter,
-                node_type=ne.neat.NodeGene.Type.OUTPUT,
-                activation_func=self._output_activation,
-                initial_activation=self.config.initial_node_activation,
-            )
-            self.output_nodes.append(out_node)
-            node_counter += 1
+        # node table (order: inputs, bias, outputs and hidden)
+        has_bias = self.config.bias_value is not None
+        self._num_inputs = num_inputs
+        self._num_outputs = num_outputs
+        self._hidden_start = num_inputs + has_bias + num_outputs
+
+        self._functions = []  # type: List[Callable[[float], float]]
+        in_func = self._function_id(ne.activations.linear)
+        out_func = self._function_id(self._output_activation)
+        init = self.config.initial_node_activation
+
+        types = ([ne.neat.NodeGene.Type.INPUT] * num_inputs
+                 + [ne.neat.NodeGene.Type.BIAS] * has_bias
+                 + [ne.neat.NodeGene.Type.OUTPUT] * num_outputs)
+        self._node_ids = np.arange(len(types), dtype=np.int64)
+        self._node_types = np.array([t.value for t in types], dtype=np.int8)
+        self._node_funcs = np.array(
+            [in_func] * (num_inputs + has_bias) + [out_func] * num_outputs,
+            dtype=np.int8)
+        self._node_init = np.array(
+            [init] * num_inputs
+            + ([self.config.bias_value] if has_bias else [])
+            + [init] * num_outputs, dtype=float)
+        self._node_act = self._node_init.copy()
+
+        # connection table
+        self._con_ids = np.zeros(0, dtype=np.int64)
+        self._con_src = np.zeros(0, dtype=np.int64)
+        self._con_dst = np.zeros(0, dtype=np.int64)
+        self._con_weights = np.zeros(0, dtype=float)
+        self._con_enabled = np.zeros(0, dtype=bool)
+
+        # lazily built caches (not pickled)
+        self._clear_caches()
+
+        # connecting all input nodes to all output nodes
+        if initial_connections:
+            num_cons = num_inputs * num_outputs
+            out_start = num_inputs + has_bias
+            self._con_ids = np.arange(1, num_cons + 1, dtype=np.int64)
+            self._con_src = np.tile(np.arange(num_inputs, dtype=np.int64),
+                                    num_outputs)
+            self._con_dst = np.repeat(
+                np.arange(out_start, out_start + num_outputs, dtype=np.int64),
+                num_inputs)
+            self._con_weights = np.random.uniform(
+                *self.config.new_weight_interval, size=num_cons)
+            self._con_enabled = np.ones(num_cons, dtype=bool)
 
-            # connecting all input nodes to all output nodes
-            if initial_connections:
-                for in_node in self.input_nodes:
-                    connection_counter += 1
-                    self.add_connection(connection_counter, in_node, out_node)
+    @property
+    def input_nodes(self) -> List["ne.neat.NodeGene"]:
+        """ List with the genome's input nodes. """
+        return self._node_views()[:self._num_inputs]
+
+    @property
+    def bias_node(self) -> Optional["ne.neat.NodeGene"]:
+        """ The genome's bias node (`None` if the genome doesn't have one). """
+        if self._hidden_start > self._num_inputs + self._num_outputs:
+            return self._node_views()[self._num_inputs]
+        return None
+
+    @property
+    def output_nodes(self) -> List["ne.neat.NodeGene"]:
+        """ List with the genome's output nodes. """
+        start = self._hidden_start - self._num_outputs
+        return self._node_views()[start:self._hidden_start]
+
+    @property
+    def hidden_nodes(self) -> List["ne.neat.NodeGene"]:
+        """ List with all the node genes of the type
+        :attr:`.NodeGene.Type.HIDDEN` in the genome.
+        """
+        return self._node_views()[self._hidden_start:]
+
+    @property
+    def connections(self) -> List["ne.neat.ConnectionGene"]:
+        """ List with all the connection genes in the genome.
+
+        The connections are views of the rows of the genome's connection table
+        (see :meth:`.ConnectionGene.genome_view`). Changing the returned list
+        doesn't change the genome.
+        """
+        return list(self._connection_views())
 
     @property
     def input_shape(self) -> int:
         """ Number of input nodes in the genome. """
-        return len(self.input_nodes)
+        return self._num_inputs
 
     @property
     def output_shape(self) -> int:
         """ Number of output nodes in the genome. """
-        return len(self.output_nodes)
+        return self._num_outputs
 
     @property
     def config(self) -> Any:
@@ -171,20 +224,345 @@ class NeatGenome(ne.base_genome.BaseGenome):
     def config(self, c) -> None:
         self._config = c
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """ Only the genome's arrays are pickled. The compiled phenotype, the
+        gene views and the lookup tables are rebuilt on demand.
+        """
+        state = self.__dict__.copy()
+        state["_phenotype"] = None
+        state["_node_views_cache"] = None
+        state["_con_views_cache"] = None
+        state["_node_rows"] = None
+        state["_con_lookup"] = None
+        state["_con_order"] = None
+        state["_adjacency_cache"] = None
+        state["_free_slots_cache"] = None
+        state["_live_cache"] = None
+        return state
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """ Pickles the genome's node and connection tables in the compact
+        binary format of :mod:`nevopy.neat.serialization` (the remaining
+        attributes are pickled as usual).
+        """
+        serialization = ne.neat.serialization
+        return (serialization.unpack_genome,
+                (type(self), serialization.pack_arrays([self])),
+                serialization.genome_state(self))
+
+    def _clear_caches(self) -> None:
+        """ Discards the gene views and the lookup tables of the genome. """
+        self._node_views_cache = None \
+            # type: Optional[List["ne.neat.NodeGene"]]
+        self._con_views_cache = None \
+            # type: Optional[List["ne.neat.ConnectionGene"]]
+        self._node_rows = None  # type: Optional[Dict[int, int]]
+        self._con_lookup = None  # type: Optional[Dict[Tuple[int, int], int]]
+        self._con_order = None  # type: Optional[Tuple[np.ndarray, np.ndarray]]
+        self._adjacency_cache = None \
+            # type: Optional[Tuple[List[List[int]], List[List[int]]]]
+        self._free_slots_cache = None  # type: Optional[np.ndarray]
+        self._live_cache = None \
+            # type: Optional[Tuple[np.ndarray, np.ndarray]]
+
+    def _own_topology(self) -> None:
+        """ Makes private copies of the parts of the genome's topology that
+        are changed in place, if the topology is shared with other genomes.
+
+        Must be called before changing the topology of the genome. Arrays that
+        are only replaced (never changed in place) keep being shared.
+        """
+        if self._owns_topology:
+            return
+        self._functions = list(self._functions)
+        self._node_funcs = self._node_funcs.copy()
+        self._node_init = self._node_init.copy()
+        self._con_enabled = self._con_enabled.copy()
+        if self._node_rows is not None:
+            self._node_rows = dict(self._node_rows)
+        if self._con_lookup is not None:
+            self._con_lookup = dict(self._con_lookup)
+        if self._free_slots_cache is not None:
+            self._free_slots_cache = self._free_slots_cache.copy()
+        self._owns_topology = True
+
+    def _node_views(self) -> List["ne.neat.NodeGene"]:
+        """ Returns the (cached) views of the rows of the node table. """
+        if self._node_views_cache is None:
+            self._node_views_cache = []
+        views = self._node_views_cache
+        for i in range(len(views), len(self._node_ids)):
+            views.append(ne.neat.NodeGene.genome_view(self, i))
+        return views
+
+    def _connection_views(self) -> List["ne.neat.ConnectionGene"]:
+        """ Returns the (cached) views of the rows of the connection table. """
+        if self._con_views_cache is None:
+            self._con_views_cache = []
+        views = self._con_views_cache
+        for i in range(len(views), len(self._con_ids)):
+            views.append(ne.neat.ConnectionGene.genome_view(self, i))
+        return views
+
+    def _node_row(self, node_id: int) -> int:
+        """ Returns the row, in the node table, of the node with the given ID.
+        """
+        if self._node_rows is None:
+            self._node_rows = {nid: i for i, nid
+                               in enumerate(self._node_ids.tolist())}
+        return self._node_rows[node_id]
+
+    def _connection_lookup(self) -> Dict[Tuple[int, int], int]:
+        """ Returns a table mapping the IDs of the source and destination nodes
+        of each connection to the connection's row in the connection table.
+        """
+        if self._con_lookup is None:
+            ids = self._node_ids
+            self._con_lookup = {
+                (s, d): i for i, (s, d) in enumerate(zip(
+                    ids[self._con_src].tolist(), ids[self._con_dst].tolist()))
+            }
+        return self._con_lookup
+
+    def _adjacency(self) -> Tuple[List[List[int]], List[List[int]]]:
+        """ Returns, for each row of the node table, the rows of the
+        connections that have the node as destination and as source.
+
+        The index is cached until the genome's topology changes, so the
+        incoming and outgoing connections of a node (see
+        :attr:`.NodeGene.in_connections`) can be retrieved without scanning the
+        whole connection table.
+        """
+        if self._adjacency_cache is None:
+            num_nodes = len(self._node_ids)
+
+            def group(rows: np.ndarray) -> List[List[int]]:
+                order = np.argsort(rows, kind="stable")
+                bounds = np.cumsum(np.bincount(rows, minlength=num_nodes))
+                return [chunk.tolist()
+                        for chunk in np.split(order, bounds[:-1])]
+
+            self._adjacency_cache = (group(self._con_dst),
+                                     group(self._con_src))
+        return self._adjacency_cache
+
+    def _free_slots(self) -> np.ndarray:
+        """ Returns, for each row of the node table, the number of new
+        connections that can still leave the node.
+
+        Only hidden and output nodes can be the destination of a connection,
+        and self-connections count only if they are allowed by the settings.
+        The counts are updated whenever a connection is added to the genome
+        and rebuilt when a node is added.
+        """
+        if self._free_slots_cache is None:
+            num_nodes = len(self._node_ids)
+            dest_start = self._num_inputs + (self.bias_node is not None)
+            free = (num_nodes - dest_start
+                    - np.bincount(self._con_src, minlength=num_nodes))
+            if not self.config.allow_self_connections:
+                # discounting the missing self-connections of the nodes that
+                # can be destinations
+                rows = np.arange(dest_start, num_nodes)
+                loops = self._con_src[self._con_src == self._con_dst]
+                free[rows[~np.isin(rows, loops)]] -= 1
+            self._free_slots_cache = free
+        return self._free_slots_cache
+
+    def live_rows(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the rows of the genome's live nodes and connections.
+
+        A hidden node is live if there is a path of enabled connections from
+        it to one of the output nodes (it's then processed by the network, see
+        :meth:`.process`). The input, bias and output nodes are always live. A
+        connection is live if it's enabled and points to a live node. The
+        remaining nodes and connections (the genome's dead structure) can't
+        influence the network's outputs.
+
+        The result is cached until the genome's topology changes.
+
+        Returns:
+            A tuple with the (sorted) rows, in the node table, of the live
+            nodes and the (sorted) rows, in the connection table, of the live
+            connections.
+        """
+        if self._live_cache is None:
+            n = len(self._node_ids)
+            enabled = np.flatnonzero(self._con_enabled)
+            src, dst = self._con_src[enabled], self._con_dst[enabled]
+
+            # walking the enabled connections backwards from the outputs
+            reached = np.zeros(n, dtype=bool)
+            frontier = np.arange(self._hidden_start - self._num_outputs,
+                                 self._hidden_start)
+            reached[frontier] = True
+            while len(frontier) > 0:
+                frontier = np.unique(src[np.isin(dst, frontier)])
+                frontier = frontier[~reached[frontier]]
+                reached[frontier] = True
+
+            live = reached.copy()
+            live[:self._hidden_start] = True
+            self._live_cache = (np.flatnonzero(live), enabled[reached[dst]])
+        return self._live_cache
+
+    def pruned(self) -> "NeatGenome":
+        """ Makes a copy of the genome without its dead structure.
+
+        The copy only has the live nodes and connections of the genome (see
+        :meth:`.live_rows`): disabled connections and hidden nodes with no path
+        to an output node are removed. It encodes the same network (its outputs
+        are the same as the genome's) and is smaller to store, pickle and
+        process, but it shouldn't be used for reproduction, since the removed
+        genes are lost.
+
+        Returns:
+            A pruned copy of the genome (with the initial activations).
+        """
+        return self.__copy_rows(*self.live_rows())
+
+    def evaluation_view(self) -> "NeatGenome":
+        """ Returns the genome itself or, if the setting
+        :attr:`.NeatConfig.prune_evaluated_genomes` is enabled, a pruned copy
+        of it (see :meth:`.pruned`).
+        """
+        if self.config.prune_evaluated_genomes:
+            return self.pruned()
+        return self
+
+    def sorted_connection_ids(self) -> Tuple[np.ndarray, np.ndarray]:
+        """ Returns the innovation IDs of the genome's connections, sorted.
+
+        The result is cached until a new connection is added to the genome, so
+        the alignment of genomes (used by speciation and mating) doesn't have
+        to sort the IDs on every comparison.
+
+        Returns:
+            A tuple with a sorted array with the (unique) IDs of the genome's
+            connections and an array with the rows, in the connection table, of
+            the connections in that order. If an ID is shared by more than one
+            connection, the last one added is used. The last ID in the sorted
+            array is the genome's highest connection innovation number.
+        """
+        if self._con_order is None:
+            last = len(self._con_ids) - 1
+            ids, rev_rows = np.unique(self._con_ids[::-1], return_index=True)
+            self._con_order = (ids, last - rev_rows)
+        return self._con_order
+
+    def _function_id(self, func: Callable[[float], float]) -> int:
+        """ Returns the index of the given activation function in the genome's
+        table of functions (adding it to the table if needed).
+        """
+        try:
+            return self._functions.index(func)
+        except ValueError:
+            self._own_topology()
+            self._functions.append(func)
+            return len(self._functions) - 1
+
+    def _add_node(self,
+                  node_id: int,
+                  node_type: "ne.neat.NodeGene.Type",
+                  activation_func: Callable[[float], float],
+                  initial_activation: float) -> "ne.neat.NodeGene":
+        """ Appends a new node to the genome's node table.
+
+        Returns:
+            A view of the new node.
+        """
+        self._own_topology()
+        row = len(self._node_ids)
+        self._node_ids = np.append(self._node_ids, node_id)
+        self._node_types = np.append(self._node_types,
+                                     np.int8(node_type.value))
+        self._node_funcs = np.append(self._node_funcs,
+                                     np.int8(self._function_id(
+                                         activation_func)))
+        self._node_init = np.append(self._node_init, initial_activation)
+        self._node_act = np.append(self._node_act, initial_activation)
+        if self._node_rows is not None:
+            self._node_rows[node_id] = row
+        self._adjacency_cache = None
+        self._free_slots_cache = None
+        self._live_cache = None
+        self._phenotype = None
+        return self._node_views()[row]
+
+    def has_node(self, node_id: int) -> bool:
+        """ Checks whether the genome has a node with the given ID. """
+        try:
+            self._node_row(node_id)
+            return True
+        except KeyError:
+            return False
+
+    def compile(self) -> "ne.neat.phenotype.NeatPhenotype":
+        """ Returns the compiled phenotype of the genome.
+
+        The phenotype (:class:`.NeatPhenotype`) is an array-backed evaluation
+        plan of the network encoded by the genome. It's built on demand and
+        cached until the genome is mutated.
+
+        Returns:
+            The genome's compiled phenotype.
+        """
+        if self._phenotype is None:
+            self._phenotype = ne.neat.NeatPhenotype(self)
+        return self._phenotype
+
+    def invalidate_phenotype(self) -> None:
+        """ Discards the genome's cached phenotype.
+
+        The genome's own mutation methods and gene views already do this. You
+        only need to call this method after changing the genome's arrays
+        directly.
+        """
+        self._phenotype = None
+
     def reset_activations(self) -> None:
         """ Resets cached activations of the genome's nodes.
 
         It restores the current activation value of all the nodes in the network
         to their initial value.
         """
-        self._activated_nodes = None
-        for n in self.nodes():
-            n.reset_activation()
+        self._node_act[:] = self._node_init
+
+        if self._phenotype is not None:
+            self._phenotype.reset_batch_state()
 
     def reset(self) -> None:
         """ Wrapper for :meth:`.reset_activations`. """
         self.reset_activations()
 
+    def content_hash(self) -> Optional[bytes]:
+        """ Computes a digest of the genome's nodes and connections.
+
+        The digest covers the nodes (ids, types, activation functions and
+        initial activations) and the sources, destinations, weights and states
+        of the connections. The innovation ids of the connections and the
+        current activations of the nodes are ignored.
+
+        The activation functions are identified by their module and qualified
+        name. If any of them can't be identified this way (lambdas and other
+        functions defined inside a local scope, for example), `None` is
+        returned, since two such functions may share the same name.
+        """
+        func_names = [_function_name(f) for f in self._functions]
+        if None in func_names:
+            return None
+
+        arrays = (self._node_ids, self._node_types, self._node_funcs,
+                  self._node_init, self._con_src, self._con_dst,
+                  self._con_weights, self._con_enabled)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.array([len(a) for a in arrays],
+                               dtype=np.int64).tobytes())
+        for a in arrays:
+            digest.update(np.ascontiguousarray(a).tobytes())
+        digest.update(",".join(func_names).encode())
+        return digest.digest()
+
     def distance(self, other: "NeatGenome") -> float:
         """ Calculates the distance between two genomes.
 
@@ -215,35 +593,62 @@ class NeatGenome(ne.base_genome.BaseGenome):
         Returns:
             The distance between the genomes.
         """
-        genes = ne.neat.align_connections(self.connections, other.connections)
-        excess = disjoint = num_matches = 0
-        weight_diff = 0.0
-
-        g1_max_innov = np.amax([c.id for c in self.connections])
-        g2_max_innov = np.amax([c.id for c in other.connections])
-
-        for cn1, cn2 in zip(*genes):
-            # non-matching genes:
-            if cn1 is None or cn2 is None:
-                # if c1 is None, c2 can't be None (and vice-versa)
-                # noinspection PyUnresolvedReferences
-                if ((cn1 is None and cn2.id > g1_max_innov)
-                        or (cn2 is None and cn1.id > g2_max_innov)):
-                    excess += 1
-                else:
-                    disjoint += 1
-            # matching genes:
-            else:
-                num_matches += 1
-                weight_diff += abs(cn1.weight - cn2.weight)
+        ids1, rows1 = self.sorted_connection_ids()
+        ids2, rows2 = other.sorted_connection_ids()
+        n = max(len(self._con_ids), len(other._con_ids))
+        if n == 0:
+            return 0.0
+
+        # matching genes (sorted merge of the innovation IDs)
+        _, idx1, idx2 = np.intersect1d(ids1, ids2,
+                                       assume_unique=True, return_indices=True)
+        num_matches = len(idx1)
+        weight_diff = np.abs(self._con_weights[rows1[idx1]]
+                             - other._con_weights[rows2[idx2]]).sum()
+
+        # non-matching genes: excess if beyond the other genome's highest ID
+        excess = 0
+        if len(ids1) > 0 and len(ids2) > 0:
+            excess = (len(ids1) - np.searchsorted(ids1, ids2[-1], side="right")
+                      + len(ids2) - np.searchsorted(ids2, ids1[-1],
+                                                    side="right"))
+        disjoint = len(ids1) + len(ids2) - 2 * num_matches - excess
 
         c1 = self.config.excess_genes_coefficient
         c2 = self.config.disjoint_genes_coefficient
         c3 = self.config.weight_difference_coefficient
 
-        n = max(len(self.connections), len(other.connections))
-        return (((c1 * excess + c2 * disjoint) / n)
-                + c3 * weight_diff / num_matches)
+        dist = (c1 * excess + c2 * disjoint) / n
+        if num_matches > 0:
+            dist += c3 * weight_diff / num_matches
+        return float(dist)
+
+    @classmethod
+    def distance_matrix(cls,
+                        genomes: Sequence["NeatGenome"],
+                        others: Sequence["NeatGenome"]) -> np.ndarray:
+        """ Calculates the distance between each pair of genomes of the given
+        sequences.
+
+        The connection genes of the genomes in ``others`` (usually, the
+        representatives of species) are indexed by innovation ID into dense
+        presence and weight matrices, so the distances (see :meth:`.distance`)
+        between a genome and all the genomes in ``others`` are computed at once.
+        If any of the genomes overrides :meth:`.distance`, the distances are
+        computed pair by pair.
+
+        Args:
+            genomes (Sequence[NeatGenome]): The first sequence of genomes.
+            others (Sequence[NeatGenome]): The second sequence of genomes.
+
+        Returns:
+            A numpy array with shape `(len(genomes), len(others))`. The element
+            `[i, j]` holds the value of ``genomes[i].distance(others[j])``.
+        """
+        if any(type(g).distance is not NeatGenome.distance
+               for g in list(genomes) + list(others)):
+            return super().distance_matrix(genomes, others)
+        return _neat_distance_matrix(genomes, others)
 
     def connection_exists(self, src_id: int, dest_id: int) -> bool:
         """ Checks whether a connection between the given nodes exists.
@@ -256,10 +661,37 @@ class NeatGenome(ne.base_genome.BaseGenome):
             `True` if the specified connection exists in the genome's network
             and `False` otherwise.
         """
-        try:
-            return dest_id in self._existing_connections_dict[src_id]
-        except KeyError:
-            return False
+        return (src_id, dest_id) in self._connection_lookup()
+
+    def relabel_innovations(self,
+                            node_ids: Dict[int, int],
+                            connection_ids: Dict[int, int]) -> None:
+        """ Replaces provisional innovation IDs with definitive ones.
+
+        Genomes mutated with a :class:`.ProvisionalIdHandler` (in a parallel
+        process) hold provisional IDs for the nodes and connections they
+        created. This method replaces them with the IDs assigned by
+        :meth:`.IdHandler.register`.
+
+        Args:
+            node_ids (Dict[int, int]): Maps provisional node IDs to definitive
+                ones.
+            connection_ids (Dict[int, int]): Maps provisional connection IDs to
+                definitive ones.
+        """
+        if node_ids:
+            self._node_ids = np.array([node_ids.get(i, i)
+                                       for i in self._node_ids.tolist()],
+                                      dtype=np.int64)
+            self._node_rows = None
+            self._con_lookup = None
+        if connection_ids:
+            self._con_ids = np.array([connection_ids.get(i, i)
+                                      for i in self._con_ids.tolist()],
+                                     dtype=np.int64)
+            self._con_order = None
+        if node_ids or connection_ids:
+            self._phenotype = None
 
     def add_connection(self,
                        cid: int,
@@ -269,6 +701,9 @@ class NeatGenome(ne.base_genome.BaseGenome):
                        weight: Optional[float] = None) -> None:
         """ Adds a new connection gene to the genome.
 
+        The nodes are identified by their IDs, so they must be nodes of this
+        genome (or copies of them).
+
         Args:
             cid (int): ID of the connection. It's used as a historical marker
                 of the connection's creation, acting as an "innovation number".
@@ -300,19 +735,25 @@ class NeatGenome(ne.base_genome.BaseGenome):
 
         weight = (np.random.uniform(*self.config.new_weight_interval)
                   if weight is None else weight)
-        connection = ne.neat.ConnectionGene(cid=cid,
-                                            from_node=src_node,
-                                            to_node=dest_node,
-                                            weight=weight)
 
-        connection.enabled = enabled
-        self.connections.append(connection)
-        src_node.out_connections.append(connection)
-        dest_node.in_connections.append(connection)
-
-        if src_node.id not in self._existing_connections_dict:
-            self._existing_connections_dict[src_node.id] = {}
-        self._existing_connections_dict[src_node.id][dest_node.id] = connection
+        self._own_topology()
+        src_row = self._node_row(src_node.id)
+        dest_row = self._node_row(dest_node.id)
+        self._connection_lookup()[(src_node.id, dest_node.id)] = \
+            len(self._con_ids)
+
+        self._con_ids = np.append(self._con_ids, cid)
+        self._con_src = np.append(self._con_src, src_row)
+        self._con_dst = np.append(self._con_dst, dest_row)
+        self._con_weights = np.append(self._con_weights, weight)
+        self._con_enabled = np.append(self._con_enabled, enabled)
+        self._con_order = None
+        self._adjacency_cache = None
+        self._live_cache = None
+        if self._free_slots_cache is not None and (
+                src_row != dest_row or self.config.allow_self_connections):
+            self._free_slots_cache[src_row] -= 1
+        self._phenotype = None
 
     def add_random_connection(self,
                               id_handler: "ne.neat.id_handler.IdHandler",
@@ -331,31 +772,46 @@ class NeatGenome(ne.base_genome.BaseGenome):
             A tuple containing the source node and the destination node of the
             connection, if a new connection was successfully created. `None`, if
             there is no space in the genome for a new connection.
+
+        Note:
+            The new connection is chosen uniformly among all the missing ones.
+            The genome keeps count of how many new connections can leave each
+            node, so a saturated genome is detected without checking every pair
+            of nodes.
         """
-        all_src_nodes = self.nodes()
-        np.random.shuffle(all_src_nodes)
-
-        all_dest_nodes = [n for n in all_src_nodes
-                          if (n.type != ne.neat.NodeGene.Type.BIAS
-                              and n.type != ne.neat.NodeGene.Type.INPUT)]
-        np.random.shuffle(all_dest_nodes)
-
-        for src_node in all_src_nodes:
-            for dest_node in all_dest_nodes:
-                if src_node != dest_node or self.config.allow_self_connections:
-                    if not self.connection_exists(src_node.id, dest_node.id):
-                        cid = id_handler.next_connection_id(src_node.id,
-                                                            dest_node.id)
-                        self.add_connection(cid, src_node, dest_node)
-                        return src_node, dest_node
-        return None
+        free = self._free_slots()
+        total = int(free.sum())
+        if total == 0:
+            return None
+
+        # choosing the source node (weighted by its number of free slots)
+        src_row = int(np.searchsorted(np.cumsum(free),
+                                      np.random.randint(total),
+                                      side="right"))
+
+        # choosing the destination node among the free ones
+        dest_start = self._num_inputs + (self.bias_node is not None)
+        dest_rows = np.arange(dest_start, len(self._node_ids))
+        taken = self._con_dst[self._con_src == src_row]
+        if not self.config.allow_self_connections:
+            taken = np.append(taken, src_row)
+        dest_rows = dest_rows[~np.isin(dest_rows, taken)]
+        dest_row = int(dest_rows[np.random.randint(len(dest_rows))])
+
+        nodes = self._node_views()
+        src_node, dest_node = nodes[src_row], nodes[dest_row]
+        cid = id_handler.next_connection_id(src_node.id, dest_node.id)
+        self.add_connection(cid, src_node, dest_node)
+        return src_node, dest_node
 
     def enable_random_connection(self) -> None:
         """ Randomly activates a disabled connection gene. """
-        disabled = [c for c in self.connections if not c.enabled]
+        disabled = np.flatnonzero(~self._con_enabled)
         if len(disabled) > 0:
-            connection = np.random.choice(disabled)
-            connection.enabled = True
+            self._own_topology()
+            self._con_enabled[np.random.choice(disabled)] = True
+            self._live_cache = None
+            self._phenotype = None
 
     def add_random_hidden_node(self,
                                id_handler: "ne.neat.id_handler.IdHandler",
@@ -384,29 +840,32 @@ class NeatGenome(ne.base_genome.BaseGenome):
             wasn't possible to find a connection to "host" the new node. This
             usually happens when the ID handler hasn't been reset in a while.
         """
-        eligible_connections = [c for c in self.connections if c.enabled]
-        if not eligible_connections:
+        eligible_connections = np.flatnonzero(self._con_enabled)
+        if len(eligible_connections) == 0:
             return None
         np.random.shuffle(eligible_connections)
 
-        for original_connection in eligible_connections:
-            src_node = original_connection.from_node
-            dest_node = original_connection.to_node
+        nodes = self._node_views()
+        for idx in eligible_connections:
+            src_node = nodes[self._con_src[idx]]
+            dest_node = nodes[self._con_dst[idx]]
 
             hid = id_handler.next_hidden_node_id(src_node.id, dest_node.id)
-            if (self.connection_exists(src_node.id, hid)
+            if (self.has_node(hid)
+                    or self.connection_exists(src_node.id, hid)
                     or self.connection_exists(hid, dest_node.id)):
                 # might happen if the id handler cache hasn't been reset yet
                 continue
 
-            original_connection.enabled = False
-            new_node = ne.neat.NodeGene(
+            self._own_topology()
+            self._con_enabled[idx] = False
+            self._live_cache = None
+            new_node = self._add_node(
                 node_id=hid,
                 node_type=ne.neat.NodeGene.Type.HIDDEN,
                 activation_func=self._hidden_activation,
                 initial_activation=self.config.initial_node_activation
             )
-            self.hidden_nodes.append(new_node)
 
             # adding connections
             cid = id_handler.next_connection_id(src_node.id, new_node.id)
@@ -417,7 +876,7 @@ class NeatGenome(ne.base_genome.BaseGenome):
             cid = id_handler.next_connection_id(new_node.id, dest_node.id)
             self.add_connection(cid,
                                 new_node, dest_node,
-                                weight=original_connection.weight)
+                                weight=self._con_weights[idx])
             return new_node
 
         return None
@@ -425,20 +884,59 @@ class NeatGenome(ne.base_genome.BaseGenome):
     def mutate_weights(self) -> None:
         """ Randomly mutates the weights of the genome's connections.
 
-        Each connection gene in the genome has a chance to be perturbed, reset
-        or to remain unchanged.
+        Each connection gene in the genome has a chance to be reset to a random
+        value. The weights that aren't reset are perturbed by a random
+        percentage of their values (see :class:`.NeatConfig`). All the weights
+        are mutated at once, with vectorized operations.
+        """
+        self._phenotype = None
+        self._con_weights = _mutated_weights(
+            self._con_weights,
+            reset_chance=self.config.weight_reset_chance,
+            perturbation_pc=self.config.weight_perturbation_pc,
+            new_weight_interval=self.config.new_weight_interval,
+        )
+
+    @classmethod
+    def mutate_population_weights(cls, genomes: Sequence["NeatGenome"]) -> None:
+        """ Randomly mutates the weights of all the given genomes at once.
+
+        The weights of all the genomes are concatenated and mutated (as
+        described in :meth:`.mutate_weights`) with a single vectorized pass,
+        which is much faster than calling :meth:`.mutate_weights` for each
+        genome when the population is large. Each genome's settings are
+        respected. Genomes whose class overrides :meth:`.mutate_weights` (like
+        :class:`.FixTopNeatGenome`) are mutated individually.
+
+        Args:
+            genomes (Sequence[NeatGenome]): The genomes to be mutated.
         """
-        for connection in self.connections:
-            if ne.utils.chance(self.config.weight_reset_chance):
-                # perturbating the connection
-                connection.weight = np.random.uniform(
-                    *self.config.new_weight_interval)
+        plain = []  # type: List[NeatGenome]
+        for genome in genomes:
+            if type(genome).mutate_weights is NeatGenome.mutate_weights:
+                plain.append(genome)
             else:
-                # resetting the connection
-                p = np.random.uniform(low=-self.config.weight_perturbation_pc,
-                                      high=self.config.weight_perturbation_pc)
-                d = connection.weight * p
-                connection.weight += d
+                genome.mutate_weights()
+        if not plain:
+            return
+
+        sizes = [len(g._con_weights) for g in plain]
+
+        def per_weight(values: List[Any]) -> np.ndarray:
+            return np.repeat(np.array(values, dtype=float), sizes, axis=0)
+
+        configs = [g.config for g in plain]
+        weights = _mutated_weights(
+            np.concatenate([g._con_weights for g in plain]),
+            reset_chance=per_weight([c.weight_reset_chance for c in configs]),
+            perturbation_pc=per_weight([c.weight_perturbation_pc
+                                        for c in configs]),
+            new_weight_interval=per_weight([c.new_weight_interval
+                                            for c in configs]).T,
+        )
+        for genome, w in zip(plain, np.split(weights, np.cumsum(sizes)[:-1])):
+            genome._con_weights = w
+            genome._phenotype = None
 
     def simple_copy(self) -> "NeatGenome":
         """ Makes a simple copy of the genome.
@@ -459,30 +957,52 @@ class NeatGenome(ne.base_genome.BaseGenome):
         random weights.
         """
         new_genome = self.simple_copy()
-        copied_nodes = {n.id: n for n in new_genome.nodes()}
-
-        # creating required nodes
-        for node in self.hidden_nodes:
-            new_node = node.simple_copy()
-            copied_nodes[node.id] = new_node
-            new_genome.hidden_nodes.append(new_node)
+        assert new_genome._hidden_start == self._hidden_start
+
+        # sharing the topology (copy-on-write)
+        for attr in NeatGenome._TOPOLOGY_ATTRS:
+            setattr(new_genome, attr, getattr(self, attr))
+        self._owns_topology = new_genome._owns_topology = False
+        new_genome._node_views_cache = None
+        new_genome._con_views_cache = None
+
+        # copying the weights and the activations
+        new_genome._node_act = self._node_init.copy()
+        new_genome._con_weights = (
+            self._con_weights.copy() if not random_weights
+            else np.random.uniform(*self.config.new_weight_interval,
+                                   size=len(self._con_ids))
+        )
+        return new_genome
 
-        # adding connections
-        for c in self.connections:
-            try:
-                new_genome.add_connection(
-                    cid=c.id,
-                    src_node=copied_nodes[c.from_node.id],
-                    dest_node=copied_nodes[c.to_node.id],
-                    enabled=c.enabled,
-                    weight=c.weight if not random_weights else None)
-            except ConnectionExistsError as e:
-                cons = [f"[{con.id}] {con.from_node.id}->{con.to_node.id} "
-                        f"({con.enabled})" for con in self.connections]
-                raise ConnectionExistsError(
-                    "Connection exists error when duplicating parent.\n"
-                    f"Source node's connections: {cons}") from e
+    def __copy_rows(self,
+                    node_rows: np.ndarray,
+                    con_rows: np.ndarray) -> "NeatGenome":
+        """ Auxiliary function that copies the given rows of the genome's node
+        and connection tables into a new genome (with the initial activations).
 
+        The rows of the input, bias and output nodes must be included in
+        `node_rows`, and the connections in `con_rows` can only link nodes in
+        `node_rows`. The new genome owns all of its arrays.
+        """
+        new_genome = self.simple_copy()
+        assert new_genome._hidden_start == self._hidden_start
+
+        index = np.full(len(self._node_ids), -1, dtype=np.int64)
+        index[node_rows] = np.arange(len(node_rows))
+
+        new_genome._functions = list(self._functions)
+        new_genome._node_ids = self._node_ids[node_rows]
+        new_genome._node_types = self._node_types[node_rows]
+        new_genome._node_funcs = self._node_funcs[node_rows]
+        new_genome._node_init = self._node_init[node_rows]
+        new_genome._node_act = new_genome._node_init.copy()
+        new_genome._con_ids = self._con_ids[con_rows]
+        new_genome._con_src = index[self._con_src[con_rows]]
+        new_genome._con_dst = index[self._con_dst[con_rows]]
+        new_genome._con_weights = self._con_weights[con_rows]
+        new_genome._con_enabled = self._con_enabled[con_rows]
+        new_genome._clear_caches()
         return new_genome
 
     def random_copy(self) -> "NeatGenome":
@@ -498,56 +1018,15 @@ class NeatGenome(ne.base_genome.BaseGenome):
         """ Makes an exact/deep copy of the genome.
 
         All the nodes and connections (including their weights) of the parent
-        genome are copied to the new genome.
+        genome are copied to the new genome. Only the weights and the
+        activations of the nodes are actually copied: the topology is shared by
+        both genomes until one of them changes it (it's then copied).
 
         Returns:
             An exact/deep copy of the genome.
         """
         return self.__copy_aux(random_weights=False)
 
-    def process_node(self, n: "ne.neat.genes.NodeGene") -> float:
-        """ Recursively processes the activation of the given node.
-
-        Unless it's a bias or input node (that have a fixed output), a node must
-        process the input it receives from other nodes in order to produce an
-        activation. This is done recursively: if `n` receives input from a node
-        `m` that haven't had its activation calculated yet, the activation of
-        `m` will be calculated recursively before the activation of `n` is
-        computed. Recurrences are solved by using the previous activation of the
-        "problematic" node.
-
-        Let :math:`w_i` be the weight of the :math:`i^{\\text{th}}` connection
-        that has `n` as destination node. Let :math:`a_i` be the current cached
-        output of the source node of :math:`c_i`. Let :math:`\\sigma` be the
-        activation function of `n`. The activation (output) `a` of `n` is
-        computed as follows:
-
-        :math:`a = \\sigma (\\sum \\limits_{i} w_i \\cdot a_i)`
-
-        Args:
-            n (NodeGene): The node to be processed.
-
-        Returns:
-            The activation value (output) of the node.
-        """
-        # checking if the node needs to be activated
-        if (n.type != ne.neat.NodeGene.Type.INPUT
-                and n.type != ne.neat.NodeGene.Type.BIAS
-                and not self._activated_nodes[n.id]):
-            # activating the node
-            # the current node (n) is immediately marked as activated; this is
-            # needed due to recurrency: if, during the recursive calls, some
-            # node m depends on the activation of n, the old activation of n
-            # is used.
-            self._activated_nodes[n.id] = True
-            zsum = 0.0
-            for connection in n.in_connections:
-                if connection.enabled:
-                    src_node, weight = connection.from_node, connection.weight
-                    zsum += weight * self.process_node(src_node)
-            n.activate(zsum)
-        return n.activation
-
     def process(self, x: Sequence[float]) -> np.ndarray:
         """ Feeds the given input to the neural network.
 
@@ -557,9 +1036,13 @@ class NeatGenome(ne.base_genome.BaseGenome):
         is a Graph Neural Networks (GNN).
 
         Note:
-            The processing is done recursively, starting from the output nodes
-            (top-down approach). Because of that, nodes not connected to at
-            least one of the network's output nodes won't be processed.
+            The nodes are activated recursively, starting from the output
+            nodes (top-down approach): before a node is activated, the nodes it
+            receives input from are activated. Recurrences are solved by using
+            the previous activation of the "problematic" node. Because of that,
+            nodes not connected to at least one of the network's output nodes
+            won't be processed. To speed things up, the processing is done by
+            the genome's compiled phenotype (see :meth:`.compile`).
 
         Args:
             x (Sequence[float]): A sequence object (like a list or numpy array)
@@ -584,23 +1067,48 @@ class NeatGenome(ne.base_genome.BaseGenome):
                 f"but got {len(x)}."
             )
 
-        # preparing input nodes
-        for in_node, value in zip(self.input_nodes, x):
-            in_node.activate(value)
+        return self.compile().process(x)
+
+    def process_batch(self,
+                      x: np.ndarray,
+                      stateful: bool = False) -> np.ndarray:
+        """ Feeds a batch of samples to the neural network at once.
 
-        # resetting activated nodes dict
-        self._activated_nodes = {
-            n.id: False
-            for n in self.output_nodes + self.hidden_nodes
-        }
+        The samples are processed with vectorized operations by the genome's
+        compiled phenotype, which is much faster than calling :meth:`.process`
+        once per sample. This is useful, for instance, for fitness functions
+        that evaluate a genome on a dataset.
 
-        # processing nodes in a top-down manner (starts from the output nodes)
-        # nodes not connected to at least one output node are not processed
-        h = np.zeros(len(self.output_nodes))
-        for i, out_node in enumerate(self.output_nodes):
-            h[i] = self.process_node(out_node)
+        In the default (stateless) mode, each sample is processed as if the
+        genome had just been reset, so the result for a row is the same as the
+        one obtained by calling :meth:`.reset` and then :meth:`.process` with
+        that row. In the stateful mode, each row of the batch keeps its own
+        recurrent state between calls (see :meth:`.NeatPhenotype.process_batch`
+        for details). The activations of the genome's nodes are not changed by
+        this method.
 
-        return h
+        Args:
+            x (np.ndarray): Array with shape `(N, num_inputs)`, in which each
+                row is a sample.
+            stateful (bool): Whether each row of the batch should keep its own
+                recurrent state between calls.
+
+        Returns:
+            A numpy array with shape `(N, num_outputs)`. The row `i` contains
+            the output of the network for the :math:`i^{th}` sample.
+
+        Raises:
+            InvalidInputError: If `x` isn't a 2D array whose rows have one value
+                for each of the network's input nodes.
+        """
+        x = np.asarray(x)
+        if x.ndim != 2 or x.shape[1] != len(self.input_nodes):
+            raise ne.InvalidInputError(
+                "The input must be a 2D array with one column for each input "
+                f"node of the network! Expected shape (N, "
+                f"{len(self.input_nodes)}) but got {x.shape}."
+            )
+        return self.compile().process_batch(x, stateful=stateful)
 
     def nodes(self) -> List["ne.neat.genes.NodeGene"]:
         """
@@ -625,15 +1133,10 @@ class NeatGenome(ne.base_genome.BaseGenome):
             incoming connection and `False` otherwise. Self-connecting
             connections are not considered.
         """
-        for out_node in self.output_nodes:
-            valid = False
-            for in_con in out_node.in_connections:
-                if in_con.enabled and not in_con.self_connecting():
-                    valid = True
-                    break
-            if not valid:
-                return False
-        return True
+        mask = self._con_enabled & (self._con_src != self._con_dst)
+        out_rows = np.arange(self._hidden_start - self._num_outputs,
+                             self._hidden_start)
+        return bool(np.isin(out_rows, self._con_dst[mask]).all())
 
     def valid_in_nodes(self) -> bool:
         """ Checks if all the genome's input nodes are valid.
@@ -646,15 +1149,9 @@ class NeatGenome(ne.base_genome.BaseGenome):
             `True` if all the genome's input nodes are valid and `False`
             otherwise.
         """
-        for in_node in self.input_nodes:
-            valid = False
-            for out_con in in_node.out_connections:
-                if out_con.enabled:
-                    valid = True
-                    break
-            if not valid:
-                return False
-        return True
+        in_rows = np.arange(self._num_inputs)
+        return bool(np.isin(in_rows,
+                            self._con_src[self._con_enabled]).all())
 
     def mate(self, other: "NeatGenome") -> "NeatGenome":
         """ Mates two genomes to produce a new genome (offspring).
@@ -696,7 +1193,6 @@ class NeatGenome(ne.base_genome.BaseGenome):
 
         # new genome
         new_gen = self.simple_copy()
-        copied_nodes = {n.id: n for n in new_gen.nodes()}
 
         # mate (choose new genome's connections)
         chosen_connections = []
@@ -731,15 +1227,17 @@ class NeatGenome(ne.base_genome.BaseGenome):
                 # adding the hidden nodes of the connection (if needed)
                 for node in (c.from_node, c.to_node):
                     if (node.type == ne.neat.NodeGene.Type.HIDDEN
-                            and node.id not in copied_nodes):
-                        new_node = node.simple_copy()
-                        new_gen.hidden_nodes.append(new_node)
-                        copied_nodes[node.id] = new_node
+                            and not new_gen.has_node(node.id)):
+                        new_gen._add_node(
+                            node_id=node.id,
+                            node_type=node.type,
+                            activation_func=node.function,
+                            initial_activation=node.initial_activation,
+                        )
 
         # adding inherited connections
         for c, enabled in chosen_connections:
-            src_node = copied_nodes[c.from_node.id]
-            dest_node = copied_nodes[c.to_node.id]
+            src_node, dest_node = c.from_node, c.to_node
             try:
                 new_gen.add_connection(cid=c.id,
                                        src_node=src_node, dest_node=dest_node,
@@ -784,6 +1282,67 @@ class NeatGenome(ne.base_genome.BaseGenome):
         return ne.neat.visualize_activations(genome=self, **kwargs)
 
 
+def _neat_distance_matrix(genomes: Sequence[NeatGenome],
+                          others: Sequence[NeatGenome]) -> np.ndarray:
+    """ Vectorized version of :meth:`.NeatGenome.distance` (see
+    :meth:`.NeatGenome.distance_matrix`).
+    """
+    dist = np.zeros((len(genomes), len(others)))
+    if len(genomes) == 0 or len(others) == 0:
+        return dist
+
+    # indexing the connections of `others` by innovation ID
+    sorted_others = [o.sorted_connection_ids() for o in others]
+    index = np.unique(np.concatenate([ids for ids, _ in sorted_others]))
+    present = np.zeros((len(others), len(index)), dtype=bool)
+    weights = np.zeros((len(others), len(index)))
+    for j, (o, (ids, rows)) in enumerate(zip(others, sorted_others)):
+        cols = np.searchsorted(index, ids)
+        present[j, cols] = True
+        weights[j, cols] = o._con_weights[rows]
+
+    # number of connections of each genome in `others` up to each ID
+    cum_present = np.cumsum(present, axis=1)
+    o_count = np.array([len(ids) for ids, _ in sorted_others])
+    o_total = np.array([len(o._con_ids) for o in others])
+    o_max = np.array([ids[-1] if len(ids) > 0 else -1
+                      for ids, _ in sorted_others])
+
+    for i, g in enumerate(genomes):
+        ids, rows = g.sorted_connection_ids()
+        n = np.maximum(len(g._con_ids), o_total)
+
+        # matching genes
+        cols = np.searchsorted(index, ids)
+        found = cols < len(index)
+        found[found] = index[cols[found]] == ids[found]
+        matches = present[:, cols[found]]
+        num_matches = matches.sum(axis=1)
+        weight_diff = (np.abs(weights[:, cols[found]]
+                              - g._con_weights[rows[found]]) * matches).sum(1)
+
+        # excess genes (only when both genomes have connections)
+        excess = np.zeros(len(others), dtype=np.int64)
+        if len(ids) > 0:
+            pos = np.searchsorted(index, ids[-1], side="right")
+            o_up_to_max = cum_present[:, pos - 1] if pos > 0 else 0
+            excess = (len(ids) - np.searchsorted(ids, o_max, side="right")
+                      + o_count - o_up_to_max)
+            excess[o_count == 0] = 0
+        disjoint = len(ids) + o_count - 2 * num_matches - excess
+
+        c1 = g.config.excess_genes_coefficient
+        c2 = g.config.disjoint_genes_coefficient
+        c3 = g.config.weight_difference_coefficient
+        with np.errstate(divide="ignore", invalid="ignore"):
+            row = (c1 * excess + c2 * disjoint) / n
+            row += np.where(num_matches > 0,
+                            c3 * weight_diff / num_matches, 0)
+        dist[i] = np.where(n > 0, row, 0)
+
+    return dist
+
+
 def _debug_mating(genes, c, gen1, gen2, new_gen):
     """ Used to debug the "mate_genomes" function. """
     alignment_info = ""
@@ -881,6 +1440,16 @@ class FixTopNeatGenome(NeatGenome):
                          initial_connections=initial_neat_connections)
         self.fito_genome = fito_genome
 
+    def content_hash(self) -> Optional[bytes]:
+        """ Computes a digest of the genome's nodes and connections and of the
+        weights of its fixed-topology section.
+        """
+        neat_hash = super().content_hash()
+        if neat_hash is None:
+            return None
+        return hashlib.blake2b(neat_hash + self.fito_genome.content_hash(),
+                               digest_size=16).digest()
+
     def distance(self, other: NeatGenome) -> float:
         """ Sums, to the default distance calculated by
         :meth:`.NeatGenome.distance()`, the sum of the absolute difference
@@ -902,6 +1471,44 @@ class FixTopNeatGenome(NeatGenome):
 
         return dist + extra_dist
 
+    @classmethod
+    def distance_matrix(cls,
+                        genomes: Sequence[NeatGenome],
+                        others: Sequence[NeatGenome]) -> np.ndarray:
+        """ Vectorized version of :meth:`.distance` for many pairs of genomes
+        (see :meth:`.NeatGenome.distance_matrix`).
+
+        The NEAT part of the distance is computed as in
+        :meth:`.NeatGenome.distance_matrix` and the weights of the fixed
+        topology layers are flattened and compared all at once. If the genomes
+        aren't all instances of :class:`.FixTopNeatGenome` with the same layer
+        architecture, or if any of them overrides :meth:`.distance`, the
+        distances are computed pair by pair.
+        """
+        all_genomes = list(genomes) + list(others)
+        if (len(genomes) == 0 or len(others) == 0
+                or any(type(g).distance is not FixTopNeatGenome.distance
+                       for g in all_genomes)):
+            return super().distance_matrix(genomes, others)
+
+        flat_weights = [np.concatenate(
+            [np.reshape(w, -1) for l in g.fito_genome.layers for w in l.weights]
+        ) for g in all_genomes]
+        if len({w.size for w in flat_weights}) != 1:
+            return super().distance_matrix(genomes, others)
+
+        flat_weights = np.stack(flat_weights)
+        extra_dist = ne.utils.pairwise_distances(flat_weights[:len(genomes)],
+                                                 flat_weights[len(genomes):],
+                                                 norm=1)
+        c3 = np.array([g.config.weight_difference_coefficient
+                       for g in genomes])[:, np.newaxis]
+        extra_dist *= c3
+        if flat_weights.shape[1] > 0:
+            extra_dist /= flat_weights.shape[1]
+
+        return _neat_distance_matrix(genomes, others) + extra_dist
+
     def mutate_weights(self) -> None:
         super().mutate_weights()
         if self.fito_genome.config.maex_counter != self.config.maex_counter:
@@ -944,7 +1551,7 @@ class FixTopNeatGenome(NeatGenome):
         """ Feeds the input to the fixed topology genome and uses the output as
         input to the NEAT genome.
         """
-        x = reshape(self.fito_genome.process(x), [-1])
+        x = np.reshape(self.fito_genome.process(x), [-1])
         return super().process(x)
 
     def mate(self, other: NeatGenome) -> NeatGenome:
@@ -959,3 +1566,35 @@ class FixTopNeatGenome(NeatGenome):
             new_genome.fito_genome = self.fito_genome.mate(other.fito_genome)
 
         return new_genome
+
+
+def _mutated_weights(weights: np.ndarray,
+                     reset_chance: Union[float, np.ndarray],
+                     perturbation_pc: Union[float, np.ndarray],
+                     new_weight_interval: Union[Tuple[float, float],
+                                                np.ndarray],
+) -> np.ndarray:
+    """ Returns a mutated copy of the given connection weights.
+
+    The parameters of the mutation are either scalars or arrays with one value
+    per weight (`new_weight_interval` is then an array with shape `(2, N)`).
+    See :meth:`.NeatGenome.mutate_weights`.
+    """
+    size = len(weights)
+    reset = np.random.uniform(size=size) < reset_chance
+    low, high = new_weight_interval
+    new_values = np.random.uniform(low, high, size=size)
+    perturbation = np.random.uniform(-1, 1, size=size) * perturbation_pc
+    return np.where(reset, new_values, weights + weights * perturbation)
+
+
+def _function_name(func: Callable[[float], float]) -> Optional[str]:
+    """ Returns the module and the qualified name of the given function, or
+    `None` if they don't identify it unambiguously.
+    """
+    # NumPy's ufuncs have neither a module nor a qualified name
+    module = getattr(func, "__module__", None) or type(func).__module__
+    qualname = getattr(func, "__qualname__", getattr(func, "__name__", None))
+    if qualname is None or "<" in qualname:
+        return None
+    return f"{module}.{qualname}"
@@ -26,7 +26,13 @@ genomes, hidden nodes and connections. In the case of nodes and connections
 genes, the ID can also be interpreted as an innovation number.
 """
 
-from typing import Dict
+from typing import Dict, List, Tuple
+
+#: A structural innovation proposed by a :class:`.ProvisionalIdHandler`. It's
+#: a tuple containing a bool indicating whether the innovation is a hidden node
+#: (`True`) or a connection (`False`), the IDs of the source and destination
+#: nodes and the provisional (negative) ID assigned to the innovation.
+TProposal = Tuple[bool, int, int, int]
 
 
 class IdHandler:
@@ -55,7 +61,9 @@ class IdHandler:
     are reset (see :attr:`.NeatConfig.reset_innovations_period`).
 
     Warning:
-        This class isn't compatible with parallel processing.
+        This class isn't compatible with parallel processing. Processes that
+        mutate genomes in parallel should use a :class:`.ProvisionalIdHandler`
+        instead and have their proposals reconciled by :meth:`.register`.
 
     Args:
         num_inputs (int): Number of input nodes in the genomes.
@@ -67,8 +75,9 @@ class IdHandler:
                  num_inputs: int,
                  num_outputs: int,
                  has_bias: bool) -> None:
-        self._node_counter = num_inputs + num_outputs + 1 if has_bias else 0
-        self._connection_counter = num_inputs * num_outputs
+        self._node_counter = num_inputs + num_outputs + (1 if has_bias else 0)
+        # the initial connections have the IDs 1, 2, ..., in * out
+        self._connection_counter = num_inputs * num_outputs + 1
         self._species_counter = 0
         self._new_connections_ids = {}  # type: Dict[int, Dict[int, int]]
         self._new_nodes_ids = {}        # type: Dict[int, Dict[int, int]]
@@ -146,3 +155,95 @@ class IdHandler:
         self._connection_counter += 1
         self._new_connections_ids[src_id][dest_id] = cid
         return cid
+
+    def register(self,
+                 proposals: List[TProposal],
+    ) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """ Assigns definitive IDs to innovations proposed by a
+        :class:`.ProvisionalIdHandler`.
+
+        The proposals are registered in the order they were made, as if the
+        genome that made them had used this handler directly. Reconciling the
+        proposals of a batch of genomes in a fixed order (instead of the order
+        in which parallel workers finished) makes the assigned IDs
+        deterministic.
+
+        Args:
+            proposals (List[TProposal]): Proposals made by a provisional ID
+                handler (see :attr:`.ProvisionalIdHandler.proposals`).
+
+        Returns:
+            A tuple with two dictionaries mapping the provisional IDs of hidden
+            nodes and of connections, respectively, to their definitive IDs
+            (see :meth:`.NeatGenome.relabel_innovations`).
+        """
+        node_ids = {}  # type: Dict[int, int]
+        connection_ids = {}  # type: Dict[int, int]
+        for is_node, src_id, dest_id, provisional_id in proposals:
+            src_id = node_ids.get(src_id, src_id)
+            dest_id = node_ids.get(dest_id, dest_id)
+            if is_node:
+                node_ids[provisional_id] = self.next_hidden_node_id(src_id,
+                                                                    dest_id)
+            else:
+                connection_ids[provisional_id] = self.next_connection_id(
+                    src_id, dest_id)
+        return node_ids, connection_ids
+
+
+class ProvisionalIdHandler:
+    """ Stand-in for an :class:`.IdHandler` in parallel processes.
+
+    Innovations already cached by the original ID handler are assigned their
+    known IDs. New innovations receive provisional negative IDs and are recorded
+    as proposals, which are later turned into definitive IDs by
+    :meth:`.IdHandler.register` (in the main process). A provisional handler
+    only reads the original handler, so a single handler can be shared (or
+    sent) to any number of parallel workers.
+
+    Args:
+        id_handler (IdHandler): The original ID handler.
+
+    Attributes:
+        proposals (List[TProposal]): The innovations proposed by the handler,
+            in the order they were made.
+    """
+
+    def __init__(self, id_handler: IdHandler) -> None:
+        self._known_nodes_ids = id_handler._new_nodes_ids
+        self._known_connections_ids = id_handler._new_connections_ids
+        self._provisional_ids = {}  # type: Dict[Tuple[bool, int, int], int]
+        self.proposals = []  # type: List[TProposal]
+
+    def _next_id(self,
+                 is_node: bool,
+                 known_ids: Dict[int, Dict[int, int]],
+                 src_id: int,
+                 dest_id: int) -> int:
+        if src_id in known_ids and dest_id in known_ids[src_id]:
+            return known_ids[src_id][dest_id]
+
+        key = (is_node, src_id, dest_id)
+        if key not in self._provisional_ids:
+            provisional_id = -(len(self.proposals) + 1)
+            self._provisional_ids[key] = provisional_id
+            self.proposals.append((is_node, src_id, dest_id, provisional_id))
+        return self._provisional_ids[key]
+
+    def next_hidden_node_id(self, src_id: int, dest_id: int) -> int:
+        """ Returns a known or provisional ID for a hidden node.
+
+        See :meth:`.IdHandler.next_hidden_node_id`.
+        """
+        if src_id is None or dest_id is None:
+            raise RuntimeError("Trying to generate an ID to a node whose "
+                               "parents (one or both) have \"None\" IDs!")
+        return self._next_id(True, self._known_nodes_ids, src_id, dest_id)
+
+    def next_connection_id(self, src_id: int, dest_id: int) -> int:
+        """ Returns a known or provisional ID for a connection gene.
+
+        See :meth:`.IdHandler.next_connection_id`.
+        """
+        return self._next_id(False, self._known_connections_ids,
+                             src_id, dest_id)
@@ -0,0 +1,586 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Implements the compiled phenotype of a :class:`.NeatGenome`.
+
+Processing an input by recursively walking the genome's graph, starting from
+its output nodes, is simple, but slow: every call has to rediscover the order
+in which the nodes must be activated. This module
+implements :class:`.NeatPhenotype`, an array-backed evaluation plan that is
+built once from the genome's structure and reused until the genome changes,
+and :class:`.NeatPopulationPhenotype`, which packs the phenotypes of many
+genomes in order to evaluate all of them at once.
+"""
+
+from typing import (Callable, Dict, List, Optional, Sequence, Tuple,
+                    TYPE_CHECKING)
+
+import numpy as np
+
+import nevopy as ne
+
+if TYPE_CHECKING:
+    from nevopy.neat.genomes import NeatGenome
+
+#: Type of a processing level: the rows of the level's nodes in the state
+#:  buffer, the rows read by them, their weight matrix and their activation
+#:  groups (activation function and positions of the nodes within the level).
+_Level = Tuple[np.ndarray, np.ndarray, np.ndarray,
+               List[Tuple[Callable, Optional[np.ndarray]]]]
+
+
+class NeatPhenotype:
+    """ Compiled (array-backed) version of the network encoded by a genome.
+
+    The phenotype is built from a snapshot of a :class:`.NeatGenome`. Only the
+    genome's live structure is compiled (see :meth:`.NeatGenome.live_rows`):
+    disabled connections and hidden nodes that can't reach an output node are
+    left out. The nodes reachable from the output nodes are sorted in the same
+    order a recursive (depth-first, output-first) walk of the graph activates
+    them and are then grouped into levels. A node's level is one greater than
+    the highest level among the nodes it receives input from during the same
+    step, so all the nodes of a level can be activated at once with a single
+    matrix product.
+
+    Recurrences are solved exactly like in the recursive algorithm: when a node
+    receives input from a node that, in the recursive order, would only be
+    activated after it (including itself), the previous activation of the
+    source node is used. To do so, the phenotype keeps a state buffer with
+    twice the number of live nodes in the genome: the first half holds the
+    current activations and the second half a snapshot of the activations at
+    the start of the step.
+
+    If the genome has no dead nodes, the genome's array of node activations is
+    replaced by the first half of the state buffer. Otherwise, the activations
+    of the live nodes are copied from and back to the genome's array on each
+    call to :meth:`.process`. Either way, the :attr:`.NodeGene.activation` of
+    the genome's nodes always reflects the phenotype's state.
+
+    Batches of samples can be processed at once with :meth:`.process_batch`.
+    In that case, each column of the state buffer holds the state of one
+    sample. Batched processing never changes the activations of the genome's
+    nodes.
+
+    Note:
+        Activation functions are applied to arrays, so they must be compatible
+        with numpy arrays (as the ones in :mod:`nevopy.activations` are).
+
+    Args:
+        genome (NeatGenome): The genome to be compiled.
+
+    Attributes:
+        node_ids (np.ndarray): IDs of the genome's live nodes, in the order
+            they appear in the state buffer (the order of
+            :meth:`.NeatGenome.nodes`).
+        activation_functions (List[Callable]): The distinct activation
+            functions used by the genome's nodes.
+        activation_ids (np.ndarray): Index, in :attr:`activation_functions`, of
+            the activation function of each live node.
+        processing_order (np.ndarray): Rows, in the state buffer, of the nodes
+            processed by the network, in the order they are activated.
+        recurrent (bool): Whether the network reads, in any step, the previous
+            activation of a node.
+    """
+
+    def __init__(self, genome: "NeatGenome") -> None:
+        # the inputs, bias and outputs (the first rows) are always live, so
+        # only the rows of the hidden nodes change in the state buffer
+        node_rows, con_rows = genome.live_rows()
+        n = len(node_rows)
+        index = np.full(len(genome._node_ids), -1, dtype=np.int64)
+        index[node_rows] = np.arange(n)
+
+        self._num_nodes = n
+        self._num_inputs = genome._num_inputs
+        self._out_end = genome._hidden_start
+        self._out_start = self._out_end - genome._num_outputs
+
+        self.node_ids = genome._node_ids[node_rows]
+        self.activation_functions = list(genome._functions)
+        self.activation_ids = genome._node_funcs[node_rows].astype(np.int32)
+
+        # State buffer (current activations + snapshot of the last step):
+        self._initial = genome._node_init[node_rows]
+        self._batch_state = None  # type: Optional[np.ndarray]
+        self._buffer = np.zeros(2 * n)
+        self._buffer[:n] = genome._node_act[node_rows]
+        self._genome_rows = None  # type: Optional[np.ndarray]
+        if n == len(genome._node_ids):
+            genome._node_act = self._buffer[:n]
+        else:
+            self._genome_rows = node_rows
+            self._genome_act = genome._node_act
+
+        # Incoming live connections of each node (in insertion order):
+        in_edges = [[] for _ in range(n)]  # type: List[List[Tuple[int, float]]]
+        for src, dst, w in zip(index[genome._con_src[con_rows]].tolist(),
+                               index[genome._con_dst[con_rows]].tolist(),
+                               genome._con_weights[con_rows].tolist()):
+            in_edges[dst].append((src, w))
+
+        # Processing order and levels:
+        order = _processing_order(in_edges, self._out_start, self._out_end)
+        position = {r: p for p, r in enumerate(order)}
+        self.processing_order = np.array(order, dtype=np.int64)
+        self.recurrent = False
+
+        functions = self.activation_functions
+        node_level = {}  # type: Dict[int, int]
+        graph_nodes = []  # type: List[Tuple[int, int]]
+        graph_edges = []  # type: List[Tuple[int, int, float]]
+        level_nodes = []  # type: List[List[Tuple[int, List, Callable]]]
+        for r in order:
+            lv = 0
+            edges = []
+            for src, w in in_edges[r]:
+                if src < self._out_start:
+                    # input or bias node
+                    edges.append((src, w))
+                elif position[src] < position[r]:
+                    # the source is activated before `r` in the same step
+                    edges.append((src, w))
+                    lv = max(lv, node_level[src] + 1)
+                else:
+                    # recurrence: the source's previous activation is used
+                    edges.append((src + n, w))
+                    self.recurrent = True
+
+            node_level[r] = lv
+            if lv == len(level_nodes):
+                level_nodes.append([])
+            level_nodes[lv].append((r, edges,
+                                    functions[self.activation_ids[r]]))
+
+            k = len(graph_nodes)
+            graph_nodes.append((r, lv))
+            graph_edges += [(k, s, w) for s, w in edges]
+
+        self._levels = [_build_level(lv) for lv in level_nodes] \
+            # type: List[_Level]
+
+        # Flat version of the graph (used to pack many phenotypes together):
+        graph_nodes = np.array(graph_nodes, dtype=np.int64).reshape(-1, 2)
+        graph_edges = np.array(graph_edges, dtype=float).reshape(-1, 3)
+        self._graph = (
+            graph_nodes[:, 0], graph_nodes[:, 1],
+            graph_edges[:, 0].astype(np.int64),
+            graph_edges[:, 1].astype(np.int64),
+            graph_edges[:, 2],
+        )  # type: Tuple[np.ndarray, ...]
+
+    @property
+    def num_levels(self) -> int:
+        """ Number of levels (sequential steps) in the evaluation plan. """
+        return len(self._levels)
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """ Feeds a single sample to the compiled network.
+
+        This is equivalent to :meth:`.NeatGenome.process`, but doesn't check
+        the input's shape. The activations of the nodes are updated in the
+        phenotype's state buffer.
+
+        Args:
+            x (np.ndarray): The values to be fed to the input nodes.
+
+        Returns:
+            A numpy array with the activations of the output nodes.
+        """
+        buf = self._buffer
+        n = self._num_nodes
+        if self._genome_rows is not None:
+            buf[:n] = self._genome_act[self._genome_rows]
+        if self.recurrent:
+            buf[n:] = buf[:n]
+
+        buf[:self._num_inputs] = x
+        for rows, sources, weights, act_groups in self._levels:
+            z = weights @ buf[sources]
+            if len(act_groups) == 1:
+                buf[rows] = act_groups[0][0](z)
+            else:
+                for func, pos in act_groups:
+                    buf[rows[pos]] = func(z[pos])
+
+        if self._genome_rows is not None:
+            self._genome_act[self._genome_rows] = buf[:n]
+        return buf[self._out_start:self._out_end].copy()
+
+    def process_batch(self,
+                      x: np.ndarray,
+                      stateful: bool = False) -> np.ndarray:
+        """ Feeds a batch of samples to the compiled network.
+
+        All the samples are processed at once, using vectorized operations.
+        Two recurrent modes are available:
+
+            * **stateless** (default): each sample is processed independently,
+              in a single step, as if the network had just been reset. The
+              previous activation of a node is, thus, always its initial
+              activation. This is equivalent to calling
+              :meth:`.NeatGenome.reset` followed by :meth:`.NeatGenome.process`
+              for each sample.
+            * **stateful**: each row of the batch has its own state, kept by
+              the phenotype between calls. The `i`-th row of a call continues
+              from the state left by the `i`-th row of the previous call, which
+              is equivalent to having one copy of the network per row. The
+              states are reset by :meth:`.reset_batch_state` (called by
+              :meth:`.NeatGenome.reset`) or when the batch size changes.
+
+        For feed-forward networks, both modes yield the same results.
+
+        Args:
+            x (np.ndarray): Array with shape `(N, num_inputs)`. Each row is a
+                sample.
+            stateful (bool): Whether to keep a state for each row of the batch
+                between calls.
+
+        Returns:
+            A numpy array with shape `(N, num_outputs)` with the activations of
+            the output nodes for each sample.
+        """
+        n = self._num_nodes
+        batch_size = x.shape[0]
+        buf = np.empty((2 * n, batch_size))
+
+        stateful = stateful and self.recurrent
+        if stateful:
+            if (self._batch_state is None
+                    or self._batch_state.shape[1] != batch_size):
+                self.reset_batch_state(batch_size=batch_size)
+            buf[:n] = self._batch_state
+        else:
+            buf[:n] = self._initial[:, np.newaxis]
+
+        if self.recurrent:
+            buf[n:] = buf[:n]
+
+        buf[:self._num_inputs] = np.transpose(x)
+        for rows, sources, weights, act_groups in self._levels:
+            z = weights @ buf[sources]
+            if len(act_groups) == 1:
+                buf[rows] = act_groups[0][0](z)
+            else:
+                for func, pos in act_groups:
+                    buf[rows[pos]] = func(z[pos])
+
+        if stateful:
+            self._batch_state = buf[:n]
+        return np.transpose(buf[self._out_start:self._out_end]).copy()
+
+    def reset_batch_state(self,
+                          rows: Optional[np.ndarray] = None,
+                          batch_size: Optional[int] = None) -> None:
+        """ Resets the states used by stateful batched processing.
+
+        Args:
+            rows (Optional[np.ndarray]): Indices (or boolean mask) of the rows
+                of the batch to be reset. If `None`, all the states are reset.
+            batch_size (Optional[int]): If given, new states for a batch of
+                this size are created (``rows`` is ignored).
+        """
+        if batch_size is not None:
+            self._batch_state = np.repeat(self._initial[:, np.newaxis],
+                                          batch_size, axis=1)
+        elif self._batch_state is not None:
+            if rows is None:
+                self._batch_state = None
+            else:
+                self._batch_state[:, rows] = self._initial[:, np.newaxis]
+
+
+class NeatPopulationPhenotype:
+    """ Packed phenotype of a group of genomes, evaluated all at once.
+
+    The compiled graphs (see :class:`.NeatPhenotype`) of all the given genomes
+    are packed into a single state buffer, with one block of rows per genome.
+    The levels with the same depth in the different genomes are merged, so a
+    whole population can be evaluated on a shared batch of inputs with a
+    number of vectorized operations that depends only on the depth of the
+    deepest network, not on the number of genomes.
+
+    Since the genomes have different topologies, the incoming edges of the
+    nodes of a merged level are stored in padded arrays: each node reads a
+    fixed number of rows of the state buffer (the maximum fan-in of the level)
+    and the missing edges point to a row that is always zero.
+
+    The packed phenotype is built from snapshots of the genomes' phenotypes, so
+    it must be rebuilt if any of the genomes change.
+
+    Args:
+        genomes (Sequence[NeatGenome]): The genomes to be packed. All of them
+            must have the same number of input and output nodes.
+
+    Raises:
+        InvalidInputError: If the genomes don't have the same number of input
+            and output nodes.
+    """
+
+    def __init__(self, genomes: Sequence["NeatGenome"]) -> None:
+        phenotypes = [g.compile() for g in genomes]
+        self._num_genomes = len(phenotypes)
+        self._num_inputs = phenotypes[0]._num_inputs
+        num_outputs = phenotypes[0]._out_end - phenotypes[0]._out_start
+        for p in phenotypes:
+            if (p._num_inputs != self._num_inputs
+                    or p._out_end - p._out_start != num_outputs):
+                raise ne.InvalidInputError(
+                    "All the genomes must have the same number of input and "
+                    "output nodes!"
+                )
+
+        offsets = np.cumsum([0] + [p._num_nodes for p in phenotypes])
+        self._num_nodes = n = int(offsets[-1])
+        self._zero_row = 2 * n
+        self._state = None  # type: Optional[np.ndarray]
+        self.recurrent = any(p.recurrent for p in phenotypes)
+
+        self._initial = np.concatenate([p._initial for p in phenotypes])
+        self._input_rows = (offsets[:-1, np.newaxis]
+                            + np.arange(self._num_inputs))
+        self._output_rows = np.array(
+            [off + np.arange(p._out_start, p._out_end)
+             for off, p in zip(offsets[:-1], phenotypes)],
+            dtype=np.int64).reshape(self._num_genomes, num_outputs)
+
+        # Merging the flat graphs of the phenotypes:
+        functions = []  # type: List[Callable]
+        func_ids = []
+        for p in phenotypes:
+            for f in p.activation_functions:
+                if f not in functions:
+                    functions.append(f)
+            func_ids.append(np.array([functions.index(f)
+                                      for f in p.activation_functions],
+                                     dtype=np.int64)[p.activation_ids])
+
+        graphs = [p._graph for p in phenotypes]
+        num_graph_nodes = np.array([len(g[0]) for g in graphs])
+        num_graph_edges = np.array([len(g[2]) for g in graphs])
+        node_offsets = np.cumsum(num_graph_nodes) - num_graph_nodes
+
+        node_rows = np.concatenate(
+            [g[0] for g in graphs]) + np.repeat(offsets[:-1], num_graph_nodes)
+        node_levels = np.concatenate([g[1] for g in graphs])
+        node_funcs = np.concatenate([f[g[0]]
+                                     for f, g in zip(func_ids, graphs)])
+
+        edge_nodes = (np.concatenate([g[2] for g in graphs])
+                      + np.repeat(node_offsets, num_graph_edges))
+        edge_src = np.concatenate([g[3] for g in graphs])
+        edge_weights = np.concatenate([g[4] for g in graphs])
+        # the previous activations of all the nodes are in the second half
+        sizes = np.repeat([p._num_nodes for p in phenotypes], num_graph_edges)
+        edge_src = (edge_src + np.repeat(offsets[:-1], num_graph_edges)
+                    + (edge_src >= sizes) * (n - sizes))
+
+        # Sorting the nodes by level and the edges by destination node:
+        node_order = np.argsort(node_levels, kind="stable")
+        position = np.empty_like(node_order)
+        position[node_order] = np.arange(len(node_order))
+        node_rows, node_levels = node_rows[node_order], node_levels[node_order]
+        node_funcs = node_funcs[node_order]
+
+        edge_nodes = position[edge_nodes]
+        edge_order = np.argsort(edge_nodes, kind="stable")
+        edge_nodes = edge_nodes[edge_order]
+        edge_src, edge_weights = edge_src[edge_order], edge_weights[edge_order]
+
+        fan_in = np.bincount(edge_nodes, minlength=len(node_rows))
+        edge_slots = np.arange(len(edge_nodes)) - (np.cumsum(fan_in)
+                                                   - fan_in)[edge_nodes]
+
+        num_levels = int(node_levels.max(initial=-1)) + 1
+        node_bounds = np.searchsorted(node_levels, np.arange(num_levels + 1))
+        edge_bounds = np.searchsorted(edge_nodes, node_bounds)
+
+        self._levels = []  # type: List[Tuple[np.ndarray, ...]]
+        for d in range(num_levels):
+            n0, n1 = node_bounds[d], node_bounds[d + 1]
+            e0, e1 = edge_bounds[d], edge_bounds[d + 1]
+
+            # padding the edges of each node to the level's maximum fan-in
+            max_fan_in = max(int(fan_in[n0:n1].max(initial=0)), 1)
+            sources = np.full((n1 - n0, max_fan_in), self._zero_row,
+                              dtype=np.int64)
+            weights = np.zeros((n1 - n0, max_fan_in))
+            sources[edge_nodes[e0:e1] - n0, edge_slots[e0:e1]] = \
+                edge_src[e0:e1]
+            weights[edge_nodes[e0:e1] - n0, edge_slots[e0:e1]] = \
+                edge_weights[e0:e1]
+
+            level_funcs = node_funcs[n0:n1]
+            act_groups = [(functions[f], np.flatnonzero(level_funcs == f))
+                          for f in np.unique(level_funcs)]
+            if len(act_groups) == 1:
+                act_groups = [(act_groups[0][0], None)]
+            self._levels.append((node_rows[n0:n1], sources, weights,
+                                 act_groups))
+
+    @property
+    def num_levels(self) -> int:
+        """ Number of merged levels (depth of the deepest network). """
+        return len(self._levels)
+
+    def process_batch(self, x: np.ndarray) -> np.ndarray:
+        """ Feeds a batch of samples to all the packed networks at once.
+
+        Each sample is processed as if the networks had just been reset (the
+        stateless mode of :meth:`.NeatPhenotype.process_batch`).
+
+        Args:
+            x (np.ndarray): Array with shape `(N, num_inputs)`. Each row is a
+                sample.
+
+        Returns:
+            A numpy array with shape `(num_genomes, N, num_outputs)`. The
+            element `[g, i]` holds the output of the :math:`g^{th}` genome for
+            the :math:`i^{th}` sample.
+        """
+        n = self._num_nodes
+        buf = np.empty((2 * n + 1, x.shape[0]))
+        buf[:n] = self._initial[:, np.newaxis]
+        if self.recurrent:
+            buf[n:2 * n] = buf[:n]
+        buf[self._zero_row] = 0
+
+        buf[self._input_rows] = np.transpose(x)[np.newaxis]
+        for rows, sources, weights, act_groups in self._levels:
+            z = np.einsum("kf,kfn->kn", weights, buf[sources])
+            if len(act_groups) == 1:
+                buf[rows] = act_groups[0][0](z)
+            else:
+                for func, pos in act_groups:
+                    buf[rows[pos]] = func(z[pos])
+
+        return np.transpose(buf[self._output_rows], axes=(0, 2, 1))
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        """ Feeds a separate batch of samples to each of the packed networks.
+
+        Unlike :meth:`process_batch`, each network receives its own samples and
+        each row of a network's batch keeps its own recurrent state between
+        calls (like in the stateful mode of
+        :meth:`.NeatPhenotype.process_batch`). This is useful to run many
+        genomes on many copies of an environment in lockstep. The states are
+        reset by :meth:`reset_state` or when the batch size changes.
+
+        Args:
+            x (np.ndarray): Array with shape `(num_genomes, N, num_inputs)`.
+                The element `[g, i]` is the :math:`i^{th}` sample fed to the
+                :math:`g^{th}` genome.
+
+        Returns:
+            A numpy array with shape `(num_genomes, N, num_outputs)`.
+        """
+        n = self._num_nodes
+        batch_size = x.shape[1]
+        if self._state is None or self._state.shape[1] != batch_size:
+            self.reset_state(batch_size)
+
+        buf = self._state
+        if self.recurrent:
+            buf[n:2 * n] = buf[:n]
+
+        buf[self._input_rows] = np.transpose(x, axes=(0, 2, 1))
+        for rows, sources, weights, act_groups in self._levels:
+            z = np.einsum("kf,kfn->kn", weights, buf[sources])
+            if len(act_groups) == 1:
+                buf[rows] = act_groups[0][0](z)
+            else:
+                for func, pos in act_groups:
+                    buf[rows[pos]] = func(z[pos])
+
+        return np.transpose(buf[self._output_rows], axes=(0, 2, 1))
+
+    def reset_state(self, batch_size: int = 1) -> None:
+        """ Resets the states used by :meth:`process`.
+
+        Args:
+            batch_size (int): Number of rows in the batches that will be fed to
+                each network.
+        """
+        n = self._num_nodes
+        self._state = np.zeros((2 * n + 1, batch_size))
+        self._state[:n] = self._initial[:, np.newaxis]
+        self._state[n:2 * n] = self._state[:n]
+
+
+def _processing_order(in_edges: List[List[Tuple[int, float]]],
+                      out_start: int,
+                      out_end: int) -> List[int]:
+    """ Returns the rows of the hidden and output nodes in the order they are
+    activated by a recursive walk of the genome's graph.
+
+    The graph is walked depth-first, starting from the output nodes and
+    following the enabled connections backwards. A node is activated after all
+    of its source nodes are visited (post-order). An explicit stack is used, so
+    deep networks don't hit Python's recursion limit. Input and bias nodes
+    (rows before ``out_start``) are never visited.
+    """
+    order = []  # type: List[int]
+    visited = set()
+    for out_row in range(out_start, out_end):
+        if out_row in visited:
+            continue
+
+        visited.add(out_row)
+        stack = [(out_row, iter(in_edges[out_row]))]
+        while stack:
+            row, edges = stack[-1]
+            for src, _ in edges:
+                if src >= out_start and src not in visited:
+                    visited.add(src)
+                    stack.append((src, iter(in_edges[src])))
+                    break
+            else:
+                stack.pop()
+                order.append(row)
+    return order
+
+
+def _build_level(nodes: List[Tuple[int, List, Callable]]) -> _Level:
+    """ Builds the arrays used to activate the nodes of a processing level. """
+    rows = np.array([r for r, _, _ in nodes], dtype=np.int64)
+    sources = np.unique([s for _, edges, _ in nodes for s, _ in edges])
+    sources = sources.astype(np.int64)
+    col = {s: j for j, s in enumerate(sources)}
+
+    weights = np.zeros((len(nodes), len(sources)))
+    for i, (_, edges, _) in enumerate(nodes):
+        for s, w in edges:
+            weights[i, col[s]] += w
+
+    funcs = []  # type: List[Callable]
+    for _, _, f in nodes:
+        if f not in funcs:
+            funcs.append(f)
+
+    act_groups = []  # type: List[Tuple[Callable, Optional[np.ndarray]]]
+    if len(funcs) == 1:
+        act_groups.append((funcs[0], None))
+    else:
+        for f in funcs:
+            act_groups.append((f, np.array([i for i, (_, _, g) in
+                                             enumerate(nodes) if g is f])))
+    return rows, sources, weights, act_groups
@@ -28,10 +28,12 @@ implements the :class:`.NeatPopulation` class, which handles the evolution of a
 population/community of NEAT genomes.
 """
 
-from typing import Any, Callable, Dict, List, Optional, Sequence
+import functools
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+import nevopy as ne
 from nevopy.utils import utils
 from nevopy.base_population import BasePopulation
 from nevopy.callbacks import Callback
@@ -42,6 +44,9 @@ from nevopy.neat.config import NeatConfig
 from nevopy.neat.genes import NodeGene
 from nevopy.neat.genomes import NeatGenome
 from nevopy.neat.id_handler import IdHandler
+from nevopy.neat.id_handler import ProvisionalIdHandler
+from nevopy.neat.id_handler import TProposal
+from nevopy.neat.phenotype import NeatPopulationPhenotype
 from nevopy.neat.species import NeatSpecies
 from nevopy.processing.base_scheduler import ProcessingScheduler
 from nevopy.processing.pool_processing import PoolProcessingScheduler
@@ -226,7 +231,9 @@ class NeatPopulation(BasePopulation):
             fitness_function (Callable[[NeatGenome], float]): Fitness function
                 to be used to evaluate the fitness of individual genomes. It
                 must receive a genome as input and produce a float (the genome's
-                fitness) as output.
+                fitness) as output. Alternatively, an instance of
+                :class:`.PopulationFitnessFunction` can be used to evaluate the
+                whole population at once (see :meth:`.process_batch`).
             callbacks (Optional[List[Callback]]): List with instances of
                 :class:`.Callback` that will be called during the evolutionary
                 session. By default, a :class:`.History` callback is always
@@ -268,9 +275,8 @@ class NeatPopulation(BasePopulation):
                 cb.on_generation_start(generation_num, generations)
 
             # calculating fitness
-            fitness_results = self.scheduler.run(
-                items=self.genomes,
-                func=fitness_function
+            fitness_results = self.compute_fitness(
+                fitness_function
             )  # type: Sequence[float]
 
             # assigning fitness and adjusted fitness
@@ -278,47 +284,7 @@ class NeatPopulation(BasePopulation):
                 genome.fitness = fitness
                 sp = self.species[genome.species_id]
                 genome.adj_fitness = genome.fitness / len(sp.members)
-            best = self.fittest()
-
-            # counting max number of hidden nodes in one genome
-            self.__max_hidden_nodes = np.max([len(g.hidden_nodes)
-                                              for g in self.genomes])
-
-            # counting max number of hidden connections in one genome
-            self.__max_hidden_connections = np.max([
-                len([c for c in g.connections
-                     if (c.enabled
-                         and (c.from_node.type == NodeGene.Type.HIDDEN
-                              or c.to_node.type == NodeGene.Type.HIDDEN))
-                     ])
-                for g in self.genomes
-            ])
-
-            # callback: on_fitness_calculated
-            avg_fitness = self.average_fitness()
-            for cb in callbacks:
-                cb.on_fitness_calculated(
-                    best_fitness=best.fitness,
-                    avg_fitness=avg_fitness,
-                    max_hidden_nodes=self.__max_hidden_nodes,
-                    max_hidden_connections=self.__max_hidden_connections
-                )
-
-            # checking improvements
-            improv_diff = best.fitness - self._past_best_fitness
-            improv_min_pc = self._config.maex_improvement_threshold_pc
-            if improv_diff >= abs(self._past_best_fitness * improv_min_pc):
-                self._mass_extinction_counter = 0
-                self._past_best_fitness = best.fitness
-            else:
-                self._mass_extinction_counter += 1
-            self._config.update_mass_extinction(self._mass_extinction_counter)
-
-            # callback: on_mass_extinction_counter_updated
-            for cb in callbacks:
-                cb.on_mass_extinction_counter_updated(
-                    self._mass_extinction_counter
-                )
+            best = self._update_records(callbacks)
 
             # checking mass extinction
             if (self._mass_extinction_counter
@@ -363,6 +329,201 @@ class NeatPopulation(BasePopulation):
 
         return history_callback
 
+    def _update_records(self, callbacks: List[Callback]) -> NeatGenome:
+        """ Updates the population's records after the fitness of its genomes
+        has been calculated.
+
+        The maximum numbers of hidden nodes and hidden connections in a genome
+        and the mass extinction counter are updated. The callbacks are notified
+        (:meth:`.Callback.on_fitness_calculated` and
+        :meth:`.Callback.on_mass_extinction_counter_updated`).
+
+        Returns:
+            The fittest genome in the population.
+        """
+        best = self.fittest()
+
+        # counting max number of hidden nodes in one genome
+        self.__max_hidden_nodes = np.max([len(g.hidden_nodes)
+                                          for g in self.genomes])
+
+        # counting max number of hidden connections in one genome
+        self.__max_hidden_connections = np.max([
+            len([c for c in g.connections
+                 if (c.enabled
+                     and (c.from_node.type == NodeGene.Type.HIDDEN
+                          or c.to_node.type == NodeGene.Type.HIDDEN))
+                 ])
+            for g in self.genomes
+        ])
+
+        # callback: on_fitness_calculated
+        avg_fitness = self.average_fitness()
+        for cb in callbacks:
+            cb.on_fitness_calculated(
+                best_fitness=best.fitness,
+                avg_fitness=avg_fitness,
+                max_hidden_nodes=self.__max_hidden_nodes,
+                max_hidden_connections=self.__max_hidden_connections,
+                **self._cache_info,
+            )
+
+        # checking improvements
+        improv_diff = best.fitness - self._past_best_fitness
+        improv_min_pc = self._config.maex_improvement_threshold_pc
+        if improv_diff >= abs(self._past_best_fitness * improv_min_pc):
+            self._mass_extinction_counter = 0
+            self._past_best_fitness = best.fitness
+        else:
+            self._mass_extinction_counter += 1
+        self._config.update_mass_extinction(self._mass_extinction_counter)
+
+        # callback: on_mass_extinction_counter_updated
+        for cb in callbacks:
+            cb.on_mass_extinction_counter_updated(
+                self._mass_extinction_counter
+            )
+        return best
+
+    def _steady_state_start(self) -> None:
+        """ Resets the improvement records (see :meth:`.evolve_steady_state`).
+        """
+        self._last_improvement = 0
+        self._past_best_fitness = float("-inf")
+        self._invalid_genomes_replaced = 0
+
+    def _steady_state_offspring(self) -> NeatGenome:
+        """ Generates a new genome for steady-state evolution.
+
+        A species is chosen with a chance proportional to its average fitness
+        (roulette wheel selection). The parents are chosen among its members
+        (rank-based selection), as in :meth:`.reproduction`.
+        """
+        species = list(self.species.values())
+        avg_fitness = np.maximum([sp.avg_fitness() for sp in species], 0)
+        total_fitness = np.sum(avg_fitness)
+        sp = species[np.random.choice(
+            len(species),
+            p=(avg_fitness / total_fitness if total_fitness > 0 else None),
+        )]
+
+        sp.members.sort(key=lambda genome: genome.fitness, reverse=True)
+        prob = self._cached_rank_prob_dist[:len(sp.members)]
+        prob = prob / np.sum(prob)
+        parents = self._select_parents(species=sp,
+                                       rank_prob_dist=prob,
+                                       num_offspring=1)[0]
+
+        baby, proposals = NeatPopulation.generate_offspring(
+            (*parents, np.random.randint(2**31 - 1)), self._id_handler,
+            self._config,
+        )
+        if baby is None:
+            self._invalid_genomes_replaced += 1
+            return self._random_genome_with_extras()
+
+        baby.relabel_innovations(*self._id_handler.register(proposals))
+        return baby
+
+    def _steady_state_insert(self, genome: NeatGenome, generation: int) -> None:
+        """ Inserts a newly evaluated genome into the population.
+
+        The genome with the lowest adjusted fitness is removed from the
+        population. The new genome is placed in the first species it's
+        compatible with (a new species is created if there is none).
+        """
+        # removing the weakest genome
+        adj_fitness = [g.fitness / len(self.species[g.species_id].members)
+                       for g in self.genomes]
+        weakest = self.genomes.pop(int(np.argmin(adj_fitness)))
+        sp = self.species[weakest.species_id]
+        sp.members = [g for g in sp.members if g is not weakest]
+        if len(sp.members) == 0:
+            self.species.pop(sp.id)
+
+        # speciating the new genome
+        species = list(self.species.values())
+        hits = np.flatnonzero(self.distance_matrix(
+            [genome], [sp.representative for sp in species]
+        )[0] <= self._config.species_distance_threshold)
+        if len(hits) > 0:
+            sp = species[hits[0]]
+        else:
+            sp = NeatSpecies(species_id=self._id_handler.next_species_id(),
+                             generation=generation)
+            sp.representative = genome
+            self.species[sp.id] = sp
+
+        sp.members.append(genome)
+        genome.species_id = sp.id
+        genome.adj_fitness = genome.fitness / len(sp.members)
+        self.genomes.append(genome)
+
+    def _virtual_generation_end(self,
+                                generation: int,
+                                generations: int,
+                                callbacks: List[Callback]) -> None:
+        """ Updates the population's records, calls the callbacks and
+        re-speciates the population at the end of a virtual generation.
+        """
+        for genome in self.genomes:
+            sp = self.species[genome.species_id]
+            genome.adj_fitness = genome.fitness / len(sp.members)
+        self._update_records(callbacks)
+
+        # callback: on_speciation_start
+        for cb in callbacks:
+            cb.on_speciation_start(
+                invalid_genoems_replaced=self._invalid_genomes_replaced,
+            )
+
+        # speciation
+        self._invalid_genomes_replaced = 0
+        self._update_innovations()
+        self.speciation(generation=generation)
+
+        # callback: on_generation_end
+        for cb in callbacks:
+            cb.on_generation_end(generation, generations)
+
+    def process_batch(self, x: np.ndarray) -> np.ndarray:
+        """ Feeds a batch of samples to all the genomes of the population.
+
+        The compiled graphs of all the genomes are packed into a
+        :class:`.NeatPopulationPhenotype`, so the whole population is evaluated
+        in a single vectorized pass (level by level, grouped by depth). Each
+        sample is processed as if the genomes had just been reset.
+
+        Args:
+            x (np.ndarray): Array with shape `(N, num_inputs)`, in which each
+                row is a sample.
+
+        Returns:
+            A numpy array with shape `(pop_size, N, num_outputs)`. The element
+            `[g, i]` holds the output of the :math:`g^{th}` genome for the
+            :math:`i^{th}` sample.
+
+        Raises:
+            InvalidInputError: If `x` isn't a 2D array whose rows have one value
+                for each of the genomes' input nodes.
+        """
+        x = np.asarray(x)
+        if x.ndim != 2 or x.shape[1] != self._base_genome.input_shape:
+            raise ne.InvalidInputError(
+                "The input must be a 2D array with one column for each input "
+                f"node of the genomes! Expected shape (N, "
+                f"{self._base_genome.input_shape}) but got {x.shape}."
+            )
+        return NeatPopulationPhenotype(self.genomes).process_batch(x)
+
+    def packed_phenotype(self) -> NeatPopulationPhenotype:
+        """ Packs the compiled graphs of all the genomes into a
+        :class:`.NeatPopulationPhenotype`, which feeds a separate batch of
+        samples to each genome in a single vectorized pass (see
+        :meth:`.NeatPopulationPhenotype.process`).
+        """
+        return NeatPopulationPhenotype(self.genomes)
+
     def _random_genome_with_extras(self) -> NeatGenome:
         """ Creates a new random genome with extra hidden nodes and connections.
 
@@ -394,77 +555,135 @@ class NeatPopulation(BasePopulation):
 
         return new_genome
 
-    def generate_offspring(self,
-                           species: NeatSpecies,
-                           rank_prob_dist: Sequence) -> NeatGenome:
-        """ Generates a new genome from one or more genomes of the species.
-
-        The offspring can be generated either by mating two randomly chosen
-        genomes (sexual reproduction) or by cloning a single genome (asexual
-        reproduction / binary fission). After the newly born genome is created,
-        it has a chance of mutating. The possible mutations are:
+    def _select_parents(self,
+                        species: NeatSpecies,
+                        rank_prob_dist: Sequence,
+                        num_offspring: int,
+    ) -> List[Tuple[NeatGenome, Optional[NeatGenome]]]:
+        """ Chooses the parents of the new genomes of the given species.
 
-            | . Enabling a disabled connection;
-            | . Changing the weights of one or more connections;
-            | . Creating a new connection between two random nodes;
-            | . Creating a new random hidden node.
+        The first parent of each new genome is chosen through rank-based
+        selection. If mating occurs, a second parent is chosen among the members
+        of the species (or, on rare occasions, among the members of other
+        species).
 
         Args:
             species (NeatSpecies): Species from which the offspring will be
                 generated.
             rank_prob_dist (Sequence): Sequence (usually a numpy array)
                 containing the chances of each of the species genomes being the
-                first parent of the newborn genome.
+                first parent of a newborn genome.
+            num_offspring (int): Number of genomes to be generated.
 
         Returns:
-            A newly generated genome.
+            A list with a tuple for each new genome. The tuple contains the
+            first parent and the second parent or `None`, if the genome is to be
+            generated through binary fission.
         """
-        g1 = np.random.choice(species.members, p=rank_prob_dist)
+        members = species.members
+        first = np.random.choice(len(members), size=num_offspring,
+                                 p=rank_prob_dist)
 
         # mating / cross-over
-        if utils.chance(self._config.mating_chance):
-            # interspecific
-            if (len(self.species) > 1
-                    and utils.chance(self._config.interspecies_mating_chance)):
-                g2 = np.random.choice([g for g in self.genomes
-                                       if g.species_id != species.id])
-            # intraspecific
-            else:
-                g2 = np.random.choice(species.members)
-            baby = g1.mate(g2)
-        # binary_fission
-        else:
-            baby = g1.deep_copy()
+        mating = np.random.uniform(size=num_offspring) < \
+            self._config.mating_chance
+        interspecific = mating & (np.random.uniform(size=num_offspring)
+                                  < self._config.interspecies_mating_chance)
+        others = ([g for g in self.genomes if g.species_id != species.id]
+                  if len(self.species) > 1 and interspecific.any() else [])
+        if len(others) == 0:
+            interspecific[:] = False
+        intra = np.random.randint(len(members), size=num_offspring)
+        inter = np.random.randint(max(len(others), 1), size=num_offspring)
+
+        parents = []  # type: List[Tuple[NeatGenome, Optional[NeatGenome]]]
+        for i in range(num_offspring):
+            g2 = None
+            if interspecific[i]:
+                g2 = others[inter[i]]
+            elif mating[i]:
+                g2 = members[intra[i]]
+            parents.append((members[first[i]], g2))
+        return parents
+
+    @staticmethod
+    def generate_offspring(args: Tuple[NeatGenome, Optional[NeatGenome], int],
+                           id_handler: IdHandler,
+                           config: NeatConfig,
+    ) -> Tuple[Optional[NeatGenome], List[TProposal]]:
+        """ Given one or two genomes (parents), generates a new genome.
+
+        The offspring is generated either by mating the two given genomes
+        (sexual reproduction) or by cloning a single genome (asexual
+        reproduction / binary fission). After the newly born genome is created,
+        it has a chance of mutating. The possible mutations are:
 
-        # enable connection mutation
-        if utils.chance(self._config.enable_connection_mutation_chance):
-            baby.enable_random_connection()
+            | . Enabling a disabled connection;
+            | . Changing the weights of one or more connections;
+            | . Creating a new connection between two random nodes;
+            | . Creating a new random hidden node.
 
-        # weight mutation
-        if utils.chance(self._config.weight_mutation_chance):
-            baby.mutate_weights()
+        This method is run by the population's processing scheduler, so it
+        doesn't change the ID handler: new nodes and connections receive
+        provisional IDs (see :class:`.ProvisionalIdHandler`), which must be
+        reconciled by the main process (see :meth:`.IdHandler.register`).
 
-        # new connection mutation
-        if utils.chance(self._config.new_connection_mutation_chance):
-            baby.add_random_connection(self._id_handler)
+        Args:
+            args (Tuple[NeatGenome, Optional[NeatGenome], int]): Tuple
+                containing a genome in its first index, another genome or `None`
+                in its second index and a random seed in its third index. If the
+                second index is another genome, then the new genome will be
+                generated by mating the two given genomes. If its `None`, the
+                new genome will be a mutated copy of the genome in the first
+                index. The seed makes the result independent of the process
+                that generates the genome.
+            id_handler (IdHandler): The population's ID handler. It's only used
+                to look up known innovations.
+            config (NeatConfig): The population's config. The mutation rates
+                are read from it (and not from the parents, which may hold a
+                stale copy of the config when run by another process).
 
-        # new node mutation
-        if utils.chance(self._config.new_node_mutation_chance):
-            baby.add_random_hidden_node(self._id_handler)
+        Returns:
+            A tuple with the newly generated genome (or `None`, if it's invalid)
+            and the structural innovations it proposes.
+        """
+        p1, p2, seed = args
+        rng_state = np.random.get_state()
+        np.random.seed(seed)
+        try:
+            provisional_handler = ProvisionalIdHandler(id_handler)
+
+            # mating (sexual) vs binary fission (asexual)
+            baby = p1.mate(p2) if p2 is not None else p1.deep_copy()
+            baby.config = config
+
+            # enable connection mutation
+            if utils.chance(config.enable_connection_mutation_chance):
+                baby.enable_random_connection()
+
+            # weight mutation
+            if utils.chance(config.weight_mutation_chance):
+                baby.mutate_weights()
+
+            # new connection mutation
+            if utils.chance(config.new_connection_mutation_chance):
+                baby.add_random_connection(provisional_handler)
+
+            # new node mutation
+            if utils.chance(config.new_node_mutation_chance):
+                baby.add_random_hidden_node(provisional_handler)
+        finally:
+            np.random.set_state(rng_state)
 
         # checking genome validity
-        valid_out = (not self._config.infanticide_output_nodes
+        valid_out = (not config.infanticide_output_nodes
                      or baby.valid_out_nodes())
-        valid_in = (not self._config.infanticide_input_nodes
+        valid_in = (not config.infanticide_input_nodes
                     or baby.valid_in_nodes())
 
-        # genome is valid
         if valid_out and valid_in:
-            return baby
-
-        # invalid genome: replacing with a new random genome
-        self._invalid_genomes_replaced += 1
-        return self._random_genome_with_extras()
+            return baby, provisional_handler.proposals
+        return None, []
 
     def reproduction(self) -> None:
         """ Handles the reproduction of the population's genomes.
@@ -489,6 +708,12 @@ class NeatPopulation(BasePopulation):
         calculated from the genome's fitness, but rather from how well
         positioned is the genome in the fitness rank.
 
+        The parents are chosen by the main process, but the offspring is
+        generated (mated, mutated and checked) through the population's
+        processing scheduler. The structural innovations proposed by the new
+        genomes are then registered in the ID handler in the order of the
+        offspring, so the assigned IDs don't depend on the scheduler.
+
         Most of the behaviour described above can be adjusted by changing the
         settings of the evolutionary process (see :class:`.NeatConfig`).
         """
@@ -516,8 +741,8 @@ class NeatPopulation(BasePopulation):
             num_offspring=self._size - len(new_pop)
         )
 
-        # creating new genomes
-        self._invalid_genomes_replaced = 0
+        # choosing parents
+        parents = []  # type: List[Tuple[NeatGenome, Optional[NeatGenome]]]
         for sp in self.species.values():
             # reproduction probabilities (rank-based selection)
             prob = self._cached_rank_prob_dist[:len(sp.members)]
@@ -527,16 +752,44 @@ class NeatPopulation(BasePopulation):
                 # normalizing distribution
                 prob = prob / prob_sum
 
-            # generating offspring
-            babies = [self.generate_offspring(species=sp,
-                                              rank_prob_dist=prob)
-                      for _ in range(offspring_count[sp.id])]
-            new_pop += babies
+            parents += self._select_parents(
+                species=sp,
+                rank_prob_dist=prob,
+                num_offspring=offspring_count.get(sp.id, 0),
+            )
+
+        # generating offspring
+        seeds = np.random.randint(2**31 - 1, size=len(parents))
+        results = self.scheduler.run(
+            items=[(p1, p2, int(seed))
+                   for (p1, p2), seed in zip(parents, seeds)],
+            func=functools.partial(NeatPopulation.generate_offspring,
+                                   id_handler=self._id_handler,
+                                   config=self._config),
+        )
+
+        # assigning IDs to the new innovations (in the offspring's order)
+        self._invalid_genomes_replaced = 0
+        for baby, proposals in results:
+            if baby is None:
+                # invalid genome: replacing with a new random genome
+                self._invalid_genomes_replaced += 1
+                baby = self._random_genome_with_extras()
+            else:
+                # offspring generated by other processes hold copies of the
+                # config, which wouldn't be reached by mass extinctions
+                baby.config = self._config
+                baby.relabel_innovations(*self._id_handler.register(proposals))
+            new_pop.append(baby)
 
         assert len(new_pop) == self._size
         self.genomes = new_pop
+        self._update_innovations()
 
-        # checking if the innovation ids should be reset
+    def _update_innovations(self) -> None:
+        """ Resets the cached innovations of the ID handler, if the reset period
+        has been reached (see :attr:`.NeatConfig.reset_innovations_period`).
+        """
         reset_period = self._config.reset_innovations_period
         reset_counter = self._id_handler.reset_counter
         if reset_period is not None and reset_counter > reset_period:
@@ -638,16 +891,28 @@ class NeatPopulation(BasePopulation):
         for sid in removed_sids:
             self.species.pop(sid)
 
-        # assigning genomes to species
+        # distances between the genomes and the existing species
         dist_threshold = self._config.species_distance_threshold
-        for genome in self.genomes:
+        old_species = list(self.species.values())
+        compatible = self.distance_matrix(
+            self.genomes, [sp.representative for sp in old_species]
+        ) <= dist_threshold
+        new_species = []  # type: List[NeatSpecies]
+
+        # assigning genomes to species
+        for i, genome in enumerate(self.genomes):
             chosen_species = None
 
             # checking compatibility with existing species
-            for sp in self.species.values():
-                if genome.distance(sp.representative) <= dist_threshold:
-                    chosen_species = sp
-                    break
+            hits = np.flatnonzero(compatible[i])
+            if len(hits) > 0:
+                chosen_species = old_species[hits[0]]
+            elif len(new_species) > 0:
+                hits = np.flatnonzero(self.distance_matrix(
+                    [genome], [sp.representative for sp in new_species]
+                )[0] <= dist_threshold)
+                if len(hits) > 0:
+                    chosen_species = new_species[hits[0]]
 
             # creating a new species, if needed
             if chosen_species is None:
@@ -656,6 +921,7 @@ class NeatPopulation(BasePopulation):
                                              generation=generation)
                 chosen_species.representative = genome
                 self.species[chosen_species.id] = chosen_species
+                new_species.append(chosen_species)
 
             # adding genome to species
             chosen_species.members.append(genome)
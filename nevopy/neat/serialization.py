@@ -0,0 +1,259 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Implements a compact, versioned binary format for :class:`.NeatGenome`.
+
+The genomes store their nodes and connections in NumPy arrays (see
+:class:`.NeatGenome`), so they can be serialized by copying these arrays to a
+single buffer, instead of walking through a graph of Python objects. A buffer
+of packed genomes has the following layout (little-endian):
+
+    * a header with the magic bytes ``b"NVGA"``, the format version (uint16),
+      a reserved field (uint16) and the number of genomes (uint64);
+    * an int64 array with shape `(num_genomes, 2)` holding the number of nodes
+      and connections of each genome;
+    * the genomes' tables, each one concatenated over all the genomes: the
+      node IDs (int64), initial activations (float64) and activations
+      (float64), the connection IDs (int64), sources (int64), destinations
+      (int64) and weights (float64), the node types (int8) and activation
+      function indices (int8) and the connections' states (bool).
+
+This format is used to pickle the genomes (see :meth:`.NeatGenome.__reduce__`),
+so it's also the format in which the genomes are sent to the workers of the
+processing schedulers and saved by :meth:`.NeatGenome.save` and
+:meth:`.BasePopulation.save`. The remaining attributes of the genomes (like
+their settings and their tables of activation functions) are pickled along
+with the buffer; pickle stores objects shared by many genomes, like the
+population's config, only once.
+
+:func:`dumps` and :func:`loads` serialize a whole sequence of genomes into a
+single buffer, which is the fastest way to checkpoint or ship a population.
+"""
+
+import pickle
+import struct
+from typing import Any, Dict, List, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from nevopy.neat.genomes import NeatGenome
+
+#: Magic bytes of a buffer of packed genome arrays.
+ARRAYS_MAGIC = b"NVGA"
+
+#: Magic bytes of a buffer produced by :func:`dumps`.
+GENOMES_MAGIC = b"NVGS"
+
+#: Current version of the format.
+FORMAT_VERSION = 1
+
+#: Header: magic bytes, version, reserved field and a count (or a length).
+_HEADER = struct.Struct("<4sHHQ")
+
+#: Packed arrays of the genomes (attribute, dtype and whether the array has one
+#:  entry per node or per connection). The 8-byte types come first, so all the
+#:  arrays are aligned in the buffer.
+_FIELDS = (
+    ("_node_ids", np.dtype("<i8"), "nodes"),
+    ("_node_init", np.dtype("<f8"), "nodes"),
+    ("_node_act", np.dtype("<f8"), "nodes"),
+    ("_con_ids", np.dtype("<i8"), "connections"),
+    ("_con_src", np.dtype("<i8"), "connections"),
+    ("_con_dst", np.dtype("<i8"), "connections"),
+    ("_con_weights", np.dtype("<f8"), "connections"),
+    ("_node_types", np.dtype("i1"), "nodes"),
+    ("_node_funcs", np.dtype("i1"), "nodes"),
+    ("_con_enabled", np.dtype("?"), "connections"),
+)  # type: Tuple[Tuple[str, np.dtype, str], ...]
+
+#: Names of the packed attributes.
+PACKED_ATTRS = tuple(name for name, _, _ in _FIELDS)
+
+
+class UnsupportedFormatError(Exception):
+    """ Indicates that a buffer isn't in a supported version of the format.
+    """
+
+
+def _read_header(data: memoryview, magic: bytes) -> int:
+    """ Checks the header of the given buffer and returns its count field. """
+    if len(data) < _HEADER.size:
+        raise UnsupportedFormatError("The buffer is too short!")
+    found_magic, version, _, count = _HEADER.unpack_from(data)
+    if found_magic != magic:
+        raise UnsupportedFormatError(f"Invalid magic bytes: {found_magic!r} "
+                                     f"(expected {magic!r})!")
+    if version > FORMAT_VERSION:
+        raise UnsupportedFormatError(
+            f"Format version {version} isn't supported (the latest supported "
+            f"version is {FORMAT_VERSION})!")
+    return count
+
+
+def pack_arrays(genomes: Sequence["NeatGenome"]) -> bytes:
+    """ Packs the node and connection tables of the given genomes into a
+    single buffer (see the layout in :mod:`.serialization`).
+
+    Args:
+        genomes (Sequence[NeatGenome]): The genomes to be packed.
+
+    Returns:
+        The buffer with the genomes' arrays.
+    """
+    counts = np.array([(len(g._node_ids), len(g._con_ids)) for g in genomes],
+                      dtype="<i8").reshape(-1, 2)
+    parts = [_HEADER.pack(ARRAYS_MAGIC, FORMAT_VERSION, 0, len(genomes)),
+             counts.tobytes()]
+    for name, dtype, _ in _FIELDS:
+        arrays = [getattr(g, name) for g in genomes]
+        parts.append(np.concatenate(arrays).astype(dtype, copy=False).tobytes()
+                     if arrays else b"")
+    return b"".join(parts)
+
+
+def unpack_arrays(data: Any) -> List[Dict[str, np.ndarray]]:
+    """ Unpacks a buffer produced by :func:`pack_arrays`.
+
+    Args:
+        data (Any): A bytes-like object with the packed arrays.
+
+    Returns:
+        A list with the arrays of each genome, as a dictionary mapping the name
+        of each attribute of :class:`.NeatGenome` to its value. The arrays are
+        writable and don't reference the given buffer.
+
+    Raises:
+        UnsupportedFormatError: If the buffer isn't in a supported version of
+            the format.
+    """
+    num_genomes = _read_header(memoryview(data).cast("B"), ARRAYS_MAGIC)
+    # copying the buffer once (the arrays are writable views of the copy)
+    buffer = np.frombuffer(bytearray(data), dtype=np.uint8)
+    offset = _HEADER.size
+    counts = struct.unpack_from(f"<{2 * num_genomes}q", data, offset)
+    offset += 8 * len(counts)
+
+    sizes = {"nodes": counts[0::2], "connections": counts[1::2]}
+    genomes = [{} for _ in range(num_genomes)]  \
+        # type: List[Dict[str, np.ndarray]]
+    for name, dtype, kind in _FIELDS:
+        end = offset + sum(sizes[kind]) * dtype.itemsize
+        values = buffer[offset:end].view(dtype)
+        offset = end
+        if not values.dtype.isnative:
+            values = values.astype(dtype.newbyteorder("="))
+        start = 0
+        for arrays, size in zip(genomes, sizes[kind]):
+            arrays[name] = values[start:start + size]
+            start += size
+    return genomes
+
+
+def unpack_genome(cls: type, data: Any) -> "NeatGenome":
+    """ Creates a genome of the given class from a buffer with the arrays of a
+    single genome (see :func:`pack_arrays`). The genome's remaining attributes
+    must be set afterwards (this is done by :py:mod:`pickle`).
+    """
+    genome = cls.__new__(cls)
+    genome.__dict__.update(unpack_arrays(data)[0])
+    return genome
+
+
+def genome_state(genome: "NeatGenome") -> Dict[str, Any]:
+    """ Returns the attributes of the given genome that aren't packed by
+    :func:`pack_arrays`.
+    """
+    state = genome.__getstate__()
+    for name in PACKED_ATTRS:
+        state.pop(name, None)
+    # the unpacked arrays aren't shared with other genomes
+    state["_owns_topology"] = True
+    return state
+
+
+def dumps(genomes: Sequence["NeatGenome"]) -> bytes:
+    """ Serializes the given genomes into a single buffer.
+
+    The buffer starts with a header (magic bytes ``b"NVGS"``, the format
+    version and the length of the metadata), followed by the pickled classes
+    and remaining attributes of the genomes (objects shared by the genomes,
+    like their config, are stored only once) and by the genomes' arrays (see
+    :func:`pack_arrays`).
+
+    Args:
+        genomes (Sequence[NeatGenome]): The genomes to be serialized.
+
+    Returns:
+        The buffer with the serialized genomes.
+    """
+    metadata = pickle.dumps(([type(g) for g in genomes],
+                             [genome_state(g) for g in genomes]),
+                            pickle.HIGHEST_PROTOCOL)
+    return b"".join([
+        _HEADER.pack(GENOMES_MAGIC, FORMAT_VERSION, 0, len(metadata)),
+        metadata,
+        pack_arrays(genomes),
+    ])
+
+
+def loads(data: Any) -> List["NeatGenome"]:
+    """ Deserializes genomes serialized by :func:`dumps`.
+
+    Args:
+        data (Any): A bytes-like object produced by :func:`dumps`.
+
+    Returns:
+        A list with the deserialized genomes.
+
+    Raises:
+        UnsupportedFormatError: If the buffer isn't in a supported version of
+            the format.
+    """
+    data = memoryview(data).cast("B")
+    metadata_size = _read_header(data, GENOMES_MAGIC)
+    start = _HEADER.size
+    classes, states = pickle.loads(data[start:start + metadata_size])
+
+    genomes = []
+    for cls, state, arrays in zip(
+            classes, states, unpack_arrays(data[start + metadata_size:])):
+        genome = cls.__new__(cls)
+        genome.__dict__.update(arrays)
+        genome.__dict__.update(state)
+        genomes.append(genome)
+    return genomes
+
+
+def save(genomes: Sequence["NeatGenome"], abs_path: str) -> None:
+    """ Saves the given genomes, serialized by :func:`dumps`, to the given
+    absolute path.
+    """
+    with open(abs_path, "wb") as out_file:
+        out_file.write(dumps(genomes))
+
+
+def load(abs_path: str) -> List["NeatGenome"]:
+    """ Loads the genomes saved by :func:`save` in the given absolute path. """
+    with open(abs_path, "rb") as in_file:
+        return loads(in_file.read())
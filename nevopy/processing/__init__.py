@@ -24,7 +24,14 @@
 """ Imports core names of :mod:`nevopy.processing`.
 """
 
-from nevopy.processing.base_scheduler import ProcessingScheduler
-from nevopy.processing.pool_processing import PoolProcessingScheduler
-from nevopy.processing.ray_processing import RayProcessingScheduler
-from nevopy.processing.serial_processing import SerialProcessingScheduler
+from nevopy.utils.lazy_import import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    "ProcessingScheduler": "nevopy.processing.base_scheduler",
+    "NetworkedProcessingScheduler": "nevopy.processing.networked_scheduler",
+    "PoolProcessingScheduler": "nevopy.processing.pool_processing",
+    "RayProcessingScheduler": "nevopy.processing.ray_processing",
+    "SerialProcessingScheduler": "nevopy.processing.serial_processing",
+    "SharedMemoryProcessingScheduler":
+        "nevopy.processing.shared_memory_processing",
+})
@@ -38,7 +38,7 @@ Attributes:
 """
 
 from abc import ABC, abstractmethod
-from typing import Callable, List, Optional, Sequence, TypeVar
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
 
 TProcItem = TypeVar("TProcItem")
 TProcResult = TypeVar("TProcResult")
@@ -58,8 +58,22 @@ class ProcessingScheduler(ABC):
     customize the computation of the population's fitness. You can, for example,
     implement a scheduler that makes use of multiple CPU cores or GPUs (parallel
     processing).
+
+    Besides processing batches of items (:meth:`run`), schedulers can process
+    items asynchronously: items are submitted one at a time (:meth:`submit`) and
+    their results are collected as they complete (:meth:`wait_completed`). This
+    is used by steady-state evolution (see
+    :meth:`.BasePopulation.evolve_steady_state`). The default implementation of
+    these methods is synchronous (the submitted items are processed together,
+    with :meth:`run`, when :meth:`wait_completed` is called). Schedulers capable
+    of asynchronous processing override them.
     """
 
+    def __init__(self) -> None:
+        # asynchronous processing (see `submit`)
+        self._submitted = []  # type: List[Tuple[int, TProcItem, Callable]]
+        self._ticket_counter = 0
+
     @abstractmethod
     def run(self,
             items: Sequence[TProcItem],
@@ -93,3 +107,48 @@ class ProcessingScheduler(ABC):
             passed as argument.
         """
         raise NotImplementedError()
+
+    def submit(self,
+               item: TProcItem,
+               func: Callable[[TProcItem], TProcResult]) -> int:
+        """ Schedules the processing of a single item.
+
+        Args:
+            item (TProcItem): The item to be processed.
+            func (Callable[[TProcItem], TProcResult]): Callable that takes the
+                item as input and returns a result.
+
+        Returns:
+            A ticket (int) identifying the item in the results returned by
+            :meth:`wait_completed`.
+        """
+        self._ticket_counter += 1
+        self._submitted.append((self._ticket_counter, item, func))
+        return self._ticket_counter
+
+    def wait_completed(self) -> List[Tuple[int, TProcResult]]:
+        """ Waits for the processing of at least one of the submitted items.
+
+        Returns:
+            A list with a tuple for each of the submitted items whose processing
+            completed since the last call to this method. Each tuple contains
+            the item's ticket (see :meth:`submit`) and the result of the
+            processing. If there are no items being processed, an empty list is
+            returned.
+        """
+        submitted, self._submitted = self._submitted, []
+
+        # processing the submitted items in groups that share the same callable
+        completed = []  # type: List[Tuple[int, TProcResult]]
+        start = 0
+        while start < len(submitted):
+            func = submitted[start][2]
+            end = start
+            while end < len(submitted) and submitted[end][2] is func:
+                end += 1
+            group = submitted[start:end]
+            results = self.run(items=[item for _, item, _ in group], func=func)
+            completed += [(ticket, r) for (ticket, _, _), r in zip(group,
+                                                                   results)]
+            start = end
+        return completed
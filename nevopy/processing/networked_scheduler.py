@@ -21,9 +21,536 @@
 # SOFTWARE.
 # ==============================================================================
 
-""" Implementation of a processing scheduler take makes use of workers hosted in
+""" Implementation of a processing scheduler that makes use of workers hosted in
 different machines in a network.
 
-Todo:
-    Implementation of the scheduler.
-"""
\ No newline at end of file
+The scheduler (running in the main process) listens for connections of worker
+processes, which can be launched in any machine that can reach it with the
+command:
+
+    .. code-block:: bash
+
+        NEVOPY_AUTHKEY=<key> python -m nevopy.processing.networked_scheduler \
+            --host <host> --port <port> --num-workers <n>
+
+(or ``nevopy-worker``, if `NEvoPy` was installed with `pip`). The workers
+receive the callable used to process the items (usually a fitness function)
+once, and then stream batches of items and results. Workers that disconnect or
+stop sending heartbeats are discarded, and the batches assigned to them are sent
+to other workers.
+
+Warning:
+    Items, results and callables are serialized with `pickle`, which isn't
+    secure against maliciously constructed data: anyone who knows the key
+    can run arbitrary code on the scheduler and on the workers. Connections are
+    authenticated with a shared key (`authkey`), which has no default value and
+    must be kept secret, but the traffic isn't encrypted. Only use this
+    scheduler in trusted networks.
+"""
+
+import argparse
+import collections
+import logging
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import socket
+import threading
+import time
+import traceback
+from multiprocessing.connection import Client, Connection, Listener, wait
+from multiprocessing.connection import answer_challenge, deliver_challenge
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from nevopy.processing.base_scheduler import ProcessingScheduler
+from nevopy.processing.base_scheduler import TProcItem, TProcResult
+
+_logger = logging.getLogger(__name__)
+
+#: Environment variable from which the key used to authenticate the workers is
+#: read when no key is explicitly given.
+AUTHKEY_ENV_VAR = "NEVOPY_AUTHKEY"
+
+#: A batch of items: its ID and a list with the index and value of each item.
+_TBatch = Tuple[int, List[Tuple[int, Any]]]
+
+
+class _WorkerHandle:
+    """ State of a worker connected to a :class:`.NetworkedProcessingScheduler`.
+    """
+
+    def __init__(self, conn: Connection, name: str) -> None:
+        self.conn = conn
+        self.name = name
+        self.func_version = None  # type: Optional[int]
+        self.batches = {}  # type: Dict[int, _TBatch]
+        self.last_seen = time.monotonic()
+
+
+class NetworkedProcessingScheduler(ProcessingScheduler):
+    """ Processing scheduler that distributes work to workers in a network.
+
+    The scheduler listens, on the given address, for the connections of worker
+    processes (see :func:`run_worker` and the module's command line interface).
+    Workers can connect and disconnect at any time. When :meth:`run` is called,
+    the items are split into batches, which are sent to the connected workers
+    (each worker holds up to `max_batches_per_worker` batches at a time, so it
+    doesn't stay idle while waiting for the next batch). The callable used to
+    process the items is only sent to a worker when it changes (it's compared
+    by identity).
+
+    Workers periodically send heartbeats to the scheduler. If a worker
+    disconnects or doesn't send a heartbeat for `heartbeat_timeout` seconds,
+    it's discarded and its batches are re-dispatched to other workers.
+
+    Note:
+        The callable and the items must be serializable with `pickle`.
+
+    Args:
+        host (str): Address of the interface the scheduler listens on. Use
+            `"0.0.0.0"` to accept connections from other machines.
+        port (int): Port the scheduler listens on. If `0`, a free port is
+            chosen (see :attr:`address`).
+        authkey (Optional[bytes]): Secret key used to authenticate the
+            workers. It must be the same key passed to the workers. If `None`,
+            the key is read from the environment variable `NEVOPY_AUTHKEY`.
+        batch_size (Optional[int]): Number of items in each batch. If `None`,
+            the items are split into (approximately) four batches per worker.
+        max_batches_per_worker (int): Maximum number of batches assigned to a
+            worker at a time.
+        heartbeat_timeout (float): Number of seconds without receiving a
+            heartbeat after which a worker is considered dead.
+        wait_timeout (Optional[float]): Maximum number of seconds :meth:`run`
+            waits for a worker to connect when there are no workers available.
+            If `None`, it waits indefinitely.
+        handshake_timeout (float): Maximum number of seconds a new connection
+            has to authenticate and identify itself before being dropped.
+
+    Raises:
+        ValueError: If no key is given and the environment variable
+            `NEVOPY_AUTHKEY` isn't set.
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 authkey: Optional[bytes] = None,
+                 batch_size: Optional[int] = None,
+                 max_batches_per_worker: int = 2,
+                 heartbeat_timeout: float = 10,
+                 wait_timeout: Optional[float] = None,
+                 handshake_timeout: float = 10) -> None:
+        super().__init__()
+        self._authkey = _resolve_authkey(authkey)
+        self._batch_size = batch_size
+        self._max_batches_per_worker = max_batches_per_worker
+        self._heartbeat_timeout = heartbeat_timeout
+        self._wait_timeout = wait_timeout
+        self._handshake_timeout = handshake_timeout
+
+        self._workers = []  # type: List[_WorkerHandle]
+        self._func = None  # type: Optional[Callable]
+        self._func_data = None  # type: Optional[bytes]
+        self._func_version = 0
+        self._batch_counter = 0
+
+        # the connections are authenticated by separate threads (see
+        # `_handshake`), so a client that doesn't answer can't block the others
+        self._listener = Listener((host, port))
+        self._new_connections = queue.Queue()  # type: queue.Queue
+        self._closed = False
+        self._accept_thread = threading.Thread(target=self._accept_loop,
+                                               daemon=True)
+        self._accept_thread.start()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """ Host and port the scheduler is listening on. """
+        return self._listener.address
+
+    @property
+    def num_workers(self) -> int:
+        """ Number of workers connected to the scheduler (including workers
+        that haven't been registered by :meth:`run` yet).
+        """
+        self._register_new_workers()
+        return len(self._workers)
+
+    def _accept_loop(self) -> None:
+        """ Accepts the connections of new workers (runs in a separate thread).
+        """
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed:
+                    break
+                continue
+            threading.Thread(target=self._handshake, args=(conn,),
+                             daemon=True).start()
+
+    def _handshake(self, conn: Connection) -> None:
+        """ Authenticates a new connection and receives the worker's name (runs
+        in a separate thread for each connection). Connections that don't
+        complete the handshake within the timeout are dropped.
+        """
+        timer = threading.Timer(self._handshake_timeout, _abort, args=(conn,))
+        timer.start()
+        try:
+            deliver_challenge(conn, self._authkey)
+            answer_challenge(conn, self._authkey)
+            message = conn.recv()
+            if (not isinstance(message, tuple) or len(message) != 2
+                    or message[0] != "hello"):
+                raise ValueError(f"Invalid handshake message: {message}")
+        except multiprocessing.AuthenticationError:
+            _logger.warning("A worker failed to authenticate!")
+            conn.close()
+            return
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            _logger.warning("A connection was dropped during the handshake!")
+            conn.close()
+            return
+        finally:
+            timer.cancel()
+
+        if self._closed:
+            conn.close()
+        else:
+            self._new_connections.put(_WorkerHandle(conn, message[1]))
+
+    def _register_new_workers(self) -> None:
+        while True:
+            try:
+                worker = self._new_connections.get_nowait()
+            except queue.Empty:
+                break
+            _logger.info(f"Worker connected: {worker.name}")
+            self._workers.append(worker)
+
+    def _drop_worker(self,
+                     worker: _WorkerHandle,
+                     pending: Deque[_TBatch]) -> None:
+        """ Discards a worker, re-queueing its batches. """
+        _logger.warning(f"Worker disconnected or unresponsive: {worker.name}. "
+                        f"Re-dispatching {len(worker.batches)} batch(es).")
+        self._workers.remove(worker)
+        pending.extendleft(reversed(list(worker.batches.values())))
+        try:
+            worker.conn.close()
+        except OSError:
+            pass
+
+    def _send(self,
+              worker: _WorkerHandle,
+              message: Tuple,
+              pending: Deque[_TBatch]) -> bool:
+        try:
+            worker.conn.send(message)
+            return True
+        except (OSError, EOFError):
+            self._drop_worker(worker, pending)
+            return False
+
+    def run(self,
+            items: Sequence[TProcItem],
+            func: Callable[[TProcItem], TProcResult]) -> List[TProcResult]:
+        """ Processes the given items and returns a result.
+
+        Main function of the scheduler. Call it to make the scheduler manage the
+        processing of a batch of items by the connected workers.
+
+        Args:
+            items (Sequence[TProcItem]): Iterable containing the items to be
+                processed.
+            func (Callable[[TProcItem], TProcResult]): Callable (usually a
+                function) that takes one item :attr:`.TProcItem` as input and
+                returns a result :attr:`.TProcResult` as output. Generally,
+                :attr:`.TProcItem` is an individual in the population and
+                :attr:`.TProcResult` is the individual's fitness. The callable
+                is only sent to the workers if it isn't the same object passed
+                in the previous call.
+
+        Returns:
+            A list containing the results of the processing of each item. It is
+            guaranteed that the ordering of the items in the returned list
+            follows the order in which the items are yielded by the iterable
+            passed as argument.
+
+        Raises:
+            RuntimeError: If the processing of an item raises an exception in a
+                worker or if no worker connects within `wait_timeout` seconds.
+        """
+        if len(items) == 0:
+            return []
+
+        if func is not self._func:
+            self._func = func
+            self._func_data = pickle.dumps(func)
+            self._func_version += 1
+
+        self._register_new_workers()
+        batch_size = self._batch_size
+        if batch_size is None:
+            batch_size = math.ceil(len(items) / (4 * max(len(self._workers),
+                                                         1)))
+
+        pending = collections.deque()  # type: Deque[_TBatch]
+        for start in range(0, len(items), batch_size):
+            self._batch_counter += 1
+            pending.append((self._batch_counter,
+                            [(i, items[i]) for i in range(
+                                start, min(start + batch_size, len(items)))]))
+
+        results = {}  # type: Dict[int, TProcResult]
+        now = time.monotonic()
+        for worker in self._workers:
+            worker.last_seen = now
+        idle_since = None  # type: Optional[float]
+
+        while len(results) < len(items):
+            self._register_new_workers()
+
+            # waiting for workers
+            if len(self._workers) == 0:
+                if idle_since is None:
+                    idle_since = time.monotonic()
+                if (self._wait_timeout is not None
+                        and time.monotonic() - idle_since > self._wait_timeout):
+                    raise RuntimeError("No worker connected to the scheduler "
+                                       f"at {self.address}!")
+                time.sleep(0.05)
+                continue
+            idle_since = None
+
+            # assigning batches
+            for worker in list(self._workers):
+                while (len(pending) > 0 and len(worker.batches)
+                       < self._max_batches_per_worker):
+                    if worker.func_version != self._func_version:
+                        if not self._send(worker, ("func",
+                                                   self._func_version,
+                                                   self._func_data), pending):
+                            break
+                        worker.func_version = self._func_version
+
+                    batch = pending.popleft()
+                    worker.batches[batch[0]] = batch
+                    if not self._send(worker, ("batch", *batch), pending):
+                        break
+
+            # receiving messages
+            conns = {w.conn: w for w in self._workers}
+            for conn in wait(list(conns), timeout=0.1):
+                worker = conns[conn]
+                try:
+                    message = conn.recv()
+                except (OSError, EOFError):
+                    self._drop_worker(worker, pending)
+                    continue
+
+                worker.last_seen = time.monotonic()
+                if message[0] == "result":
+                    _, batch_id, batch_results = message
+                    if worker.batches.pop(batch_id, None) is not None:
+                        results.update(batch_results)
+                elif message[0] == "error":
+                    _, batch_id, error = message
+                    if worker.batches.pop(batch_id, None) is None:
+                        # error from a batch of a previous call
+                        continue
+                    self._discard_batches()
+                    raise RuntimeError("Error while processing an item in the "
+                                       f"worker {worker.name}:\n{error}")
+
+            # checking heartbeats
+            now = time.monotonic()
+            for worker in list(self._workers):
+                if now - worker.last_seen > self._heartbeat_timeout:
+                    self._drop_worker(worker, pending)
+
+        assert len(results) == len(items), ("The number of results do not "
+                                            "match the number of items!")
+        return [results[i] for i in range(len(items))]
+
+    def _discard_batches(self) -> None:
+        """ Forgets the batches assigned to the workers (their results, if
+        received, will be ignored).
+        """
+        for worker in self._workers:
+            worker.batches = {}
+
+    def close(self) -> None:
+        """ Stops the workers and the scheduler's listener. """
+        self._closed = True
+        self._register_new_workers()
+        for worker in self._workers:
+            try:
+                worker.conn.send(("stop",))
+                worker.conn.close()
+            except OSError:
+                pass
+        self._workers = []
+        self._listener.close()
+
+
+def _resolve_authkey(authkey: Optional[bytes]) -> bytes:
+    """ Returns the given key or, if it's `None`, the key stored in the
+    environment variable :attr:`AUTHKEY_ENV_VAR`.
+
+    Raises:
+        ValueError: If no key is given and the environment variable isn't set.
+    """
+    if authkey is None:
+        env_key = os.environ.get(AUTHKEY_ENV_VAR)
+        if not env_key:
+            raise ValueError("No authentication key was given! Pass a secret "
+                             "key to the scheduler and to the workers or set "
+                             f"the environment variable {AUTHKEY_ENV_VAR}.")
+        authkey = env_key.encode()
+    if len(authkey) == 0:
+        raise ValueError("The authentication key can't be empty!")
+    return authkey
+
+
+def _abort(conn: Connection) -> None:
+    """ Shuts down the socket of a connection, waking up any thread blocked
+    reading from it.
+    """
+    try:
+        sock = socket.socket(fileno=os.dup(conn.fileno()))
+    except OSError:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+def run_worker(address: Tuple[str, int],
+               authkey: Optional[bytes] = None,
+               heartbeat_interval: float = 1,
+               connect_timeout: Optional[float] = 30) -> None:
+    """ Connects to a :class:`.NetworkedProcessingScheduler` and processes the
+    items it sends until the connection is closed.
+
+    Args:
+        address (Tuple[str, int]): Host and port of the scheduler.
+        authkey (Optional[bytes]): Secret key used to authenticate the worker.
+            If `None`, the key is read from the environment variable
+            `NEVOPY_AUTHKEY`.
+        heartbeat_interval (float): Number of seconds between heartbeats. It
+            should be significantly lower than the scheduler's
+            `heartbeat_timeout`.
+        connect_timeout (Optional[float]): Maximum number of seconds to keep
+            trying to connect to the scheduler. If `None`, the worker keeps
+            trying indefinitely.
+
+    Raises:
+        ValueError: If no key is given and the environment variable
+            `NEVOPY_AUTHKEY` isn't set.
+    """
+    authkey = _resolve_authkey(authkey)
+    start_time = time.monotonic()
+    while True:
+        try:
+            conn = Client(address, authkey=authkey)
+            break
+        except ConnectionRefusedError:
+            if (connect_timeout is not None
+                    and time.monotonic() - start_time > connect_timeout):
+                raise
+            time.sleep(0.5)
+
+    name = f"{socket.gethostname()}:{multiprocessing.current_process().pid}"
+    conn.send(("hello", name))
+
+    # heartbeats are sent by a separate thread, so they keep being sent while
+    # the items are processed
+    lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(message: Tuple) -> None:
+        with lock:
+            conn.send(message)
+
+    def heartbeat_loop() -> None:
+        while not stopped.wait(heartbeat_interval):
+            try:
+                send(("heartbeat",))
+            except OSError:
+                break
+
+    threading.Thread(target=heartbeat_loop, daemon=True).start()
+
+    func = None  # type: Optional[Callable]
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (OSError, EOFError):
+                break
+
+            if message[0] == "func":
+                func = pickle.loads(message[2])
+            elif message[0] == "batch":
+                _, batch_id, batch = message
+                try:
+                    batch_results = [(i, func(item)) for i, item in batch]
+                except Exception:  # pylint: disable=broad-except
+                    send(("error", batch_id, traceback.format_exc()))
+                else:
+                    send(("result", batch_id, batch_results))
+            elif message[0] == "stop":
+                break
+    finally:
+        stopped.set()
+        conn.close()
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """ Command line interface used to launch workers for a
+    :class:`.NetworkedProcessingScheduler`.
+    """
+    parser = argparse.ArgumentParser(
+        description="Launches workers for a NEvoPy networked scheduler.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address of the scheduler")
+    parser.add_argument("--port", type=int, required=True,
+                        help="port of the scheduler")
+    parser.add_argument("--authkey", default=None,
+                        help="secret key used to authenticate the workers "
+                             f"(defaults to the value of {AUTHKEY_ENV_VAR}; "
+                             "passing it on the command line exposes it to "
+                             "other users of the machine)")
+    parser.add_argument("-n", "--num-workers", type=int, default=1,
+                        help="number of worker processes to launch")
+    parser.add_argument("--heartbeat-interval", type=float, default=1,
+                        help="number of seconds between heartbeats")
+    parser.add_argument("--connect-timeout", type=float, default=30,
+                        help="number of seconds to keep trying to connect")
+    parsed = parser.parse_args(args)
+
+    worker_args = ((parsed.host, parsed.port),
+                   _resolve_authkey(parsed.authkey.encode()
+                                    if parsed.authkey is not None else None),
+                   parsed.heartbeat_interval,
+                   parsed.connect_timeout)
+    if parsed.num_workers == 1:
+        run_worker(*worker_args)
+        return
+
+    processes = [multiprocessing.Process(target=run_worker, args=worker_args)
+                 for _ in range(parsed.num_workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
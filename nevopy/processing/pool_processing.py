@@ -30,7 +30,8 @@ with `pickle`.
 """
 
 import multiprocessing
-from typing import Callable, List, Optional, Sequence
+import queue
+from typing import Callable, List, Optional, Sequence, Tuple
 
 from nevopy.processing.base_scheduler import ProcessingScheduler
 from nevopy.processing.base_scheduler import TProcItem, TProcResult
@@ -72,10 +73,15 @@ class PoolProcessingScheduler(ProcessingScheduler):
     def __init__(self,
                  num_processes: Optional[int] = None,
                  chunksize: Optional[int] = None) -> None:
+        super().__init__()
         self._num_processes = num_processes
         self._chunksize = chunksize
         self._pool = multiprocessing.Pool(processes=num_processes)
 
+        # asynchronous processing
+        self._completed = queue.Queue()  # type: queue.Queue
+        self._num_running = 0
+
     def run(self,
             items: Sequence[TProcItem],
             func: Callable[[TProcItem], TProcResult]) -> List[TProcResult]:
@@ -105,6 +111,46 @@ class PoolProcessingScheduler(ProcessingScheduler):
         """
         return self._pool.map(func, items, chunksize=self._chunksize)
 
+    def submit(self,
+               item: TProcItem,
+               func: Callable[[TProcItem], TProcResult]) -> int:
+        """ Schedules the processing of a single item in the pool (with
+        :meth:`.Pool.apply_async`).
+
+        See :meth:`.ProcessingScheduler.submit`.
+        """
+        self._ticket_counter += 1
+        ticket = self._ticket_counter
+        self._pool.apply_async(
+            func, (item,),
+            callback=lambda r: self._completed.put((ticket, r, None)),
+            error_callback=lambda e: self._completed.put((ticket, None, e)),
+        )
+        self._num_running += 1
+        return ticket
+
+    def wait_completed(self) -> List[Tuple[int, TProcResult]]:
+        """ Waits for the processing of at least one of the submitted items.
+
+        See :meth:`.ProcessingScheduler.wait_completed`.
+
+        Raises:
+            Exception: The exception raised while processing an item, if any.
+        """
+        completed = []  # type: List[Tuple[int, TProcResult]]
+        block = True
+        while self._num_running > 0:
+            try:
+                ticket, result, error = self._completed.get(block=block)
+            except queue.Empty:
+                break
+            self._num_running -= 1
+            if error is not None:
+                raise error
+            completed.append((ticket, result))
+            block = False
+        return completed
+
     def close(self):
         """ Calls the equivalent method on the scheduler's pool object. """
         self._pool.close()
@@ -29,7 +29,7 @@ implement parallel processing, either on a single machine or on a cluster.
 
 import logging
 import os
-from typing import Callable, Dict, List, Optional, Sequence, Set
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 import ray
 
@@ -107,6 +107,7 @@ class RayProcessingScheduler(ProcessingScheduler):
                  num_gpus: Optional[int] = None,
                  worker_gpu_frac: Optional[float] = None,
                  **kwargs) -> None:
+        super().__init__()
         if ray.is_initialized():
             RuntimeError("An existing ray runtime was detected! Stop it before "
                          "instantiating this class to avoid conflicts.")
@@ -124,6 +125,11 @@ class RayProcessingScheduler(ProcessingScheduler):
         self._worker_gpu_frac = (worker_gpu_frac if worker_gpu_frac is not None
                                  else self._num_gpus / self._num_cpus)
 
+        # asynchronous processing
+        self._func = None  # type: Optional[Callable]
+        self._func_id = None  # type: Any
+        self._running = {}  # type: Dict[ray.ObjectRef, int]
+
         _logger.info(f"Ray's Resources: CPUs: {self._num_cpus}  |  "
                      f"GPUs: {self._num_gpus}  |  "
                      f"GPU frac: {self._worker_gpu_frac:.4f}")
@@ -197,6 +203,36 @@ class RayProcessingScheduler(ProcessingScheduler):
                                                  "match the number of items!")
         return [results_dict[i] for i in sorted(results_dict)]
 
+    def submit(self,
+               item: TProcItem,
+               func: Callable[[TProcItem], TProcResult]) -> int:
+        """ Schedules the processing of a single item as a `ray` task.
+
+        See :meth:`.ProcessingScheduler.submit`.
+        """
+        if func is not self._func:
+            self._func = func
+            self._func_id = ray.put(func)
+
+        self._ticket_counter += 1
+        self._running[_func_wrapper.remote(self._func_id, item)] = \
+            self._ticket_counter
+        return self._ticket_counter
+
+    def wait_completed(self) -> List[Tuple[int, TProcResult]]:
+        """ Waits for the processing of at least one of the submitted items.
+
+        See :meth:`.ProcessingScheduler.wait_completed`.
+        """
+        if len(self._running) == 0:
+            return []
+
+        refs = list(self._running)
+        ray.wait(refs, num_returns=1)
+        done_refs, _ = ray.wait(refs, num_returns=len(refs), timeout=0)
+        return [(self._running.pop(ref), result)
+                for ref, result in zip(done_refs, ray.get(done_refs))]
+
 
 @ray.remote
 def _func_wrapper(func: Callable[[TProcItem], TProcResult],
@@ -0,0 +1,363 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Implements a processing scheduler that uses persistent worker processes and
+shared memory.
+
+The workers are started once and keep the callable being used (usually a fitness
+function, along with its environment or dataset) between calls. The items to be
+processed are written to a
+:py:class:`multiprocessing.shared_memory.SharedMemory` block and the results are
+returned through a shared array.
+"""
+
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import traceback
+import weakref
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from nevopy.processing.base_scheduler import ProcessingScheduler
+from nevopy.processing.base_scheduler import TProcItem, TProcResult
+
+#: Position of a serialized item in the shared memory block: offset and size of
+#: the pickle stream and offset and size of each of its out-of-band buffers.
+_TItemLayout = Tuple[int, int, Tuple[Tuple[int, int], ...]]
+
+
+class SharedMemoryProcessingScheduler(ProcessingScheduler):
+    """ Processing scheduler that uses persistent worker processes and shared
+    memory.
+
+    Similar to :class:`.PoolProcessingScheduler`, this scheduler implements
+    parallel processing on a single machine. The differences are in how data
+    reaches the workers:
+
+        | . The callable passed to :meth:`run` is only sent to the workers when
+          it changes (it's compared by identity). This way, a fitness function
+          holding an environment or a dataset is unpickled by each worker only
+          once, instead of on every generation.
+        | . The items are pickled with protocol 5, so their numpy arrays (like
+          the arrays of a :class:`.NeatGenome`) are written directly to a
+          shared memory block, without being copied into the pickle stream or
+          sent through pipes.
+        | . Results that are floats (usually fitness values) are written to a
+          shared array. Other results are sent back pickled.
+
+    Note:
+        The callable and the items must be serializable with `pickle`. Since
+        the workers keep the callable, changes made to it by the main process
+        after it has been sent won't be seen by the workers, unless a different
+        callable object is passed to :meth:`run`.
+
+    Args:
+        num_processes (Optional[int]): Number of worker processes to use. If
+            `None`, then the number returned by :py:func:`os.cpu_count()` is
+            used.
+        chunksize (Optional[int]): Number of items sent to a worker at a time.
+            If `None`, the items are split into (approximately) four chunks per
+            worker.
+    """
+
+    def __init__(self,
+                 num_processes: Optional[int] = None,
+                 chunksize: Optional[int] = None) -> None:
+        super().__init__()
+        self._num_processes = (num_processes if num_processes is not None
+                               else os.cpu_count())
+        self._chunksize = chunksize
+
+        self._func = None  # type: Optional[Callable]
+        self._func_version = 0
+        self._func_ref = None  # type: Optional[Tuple[int, str, int]]
+        self._segments = {}  # type: Dict[str, SharedMemory]
+        self._items_shm = None  # type: Optional[SharedMemory]
+        self._results_shm = None  # type: Optional[SharedMemory]
+        self._func_shm = None  # type: Optional[SharedMemory]
+
+        # the workers must share the resource tracker of the main process, so
+        # the blocks attached by them aren't reported as leaked
+        resource_tracker.ensure_running()
+
+        self._tasks = multiprocessing.Queue()
+        self._results = multiprocessing.Queue()
+        self._workers = [
+            multiprocessing.Process(target=_worker_loop,
+                                    args=(self._tasks, self._results),
+                                    daemon=True)
+            for _ in range(self._num_processes)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        # the workers are stopped and the shared memory blocks are released if
+        # the scheduler is garbage collected without being closed
+        weakref.finalize(self, _release, self._workers, self._segments)
+
+    def _segment(self,
+                 current: Optional[SharedMemory],
+                 size: int) -> SharedMemory:
+        """ Returns a shared memory block with at least `size` bytes, replacing
+        the current block if it's too small.
+        """
+        if current is not None and current.size >= size:
+            return current
+        if current is not None:
+            # workers still attached to the old block aren't affected
+            self._segments.pop(current.name)
+            current.close()
+            current.unlink()
+        new_size = max(size, 2 * (current.size if current is not None else 0))
+        shm = SharedMemory(create=True, size=max(new_size, 1))
+        self._segments[shm.name] = shm
+        return shm
+
+    def _publish_func(self, func: Callable) -> None:
+        """ Writes the pickled callable to a new shared memory block. """
+        data = pickle.dumps(func, protocol=pickle.HIGHEST_PROTOCOL)
+        old_shm = self._func_shm
+        self._func_shm = self._segment(None, len(data))
+        self._func_shm.buf[:len(data)] = data
+        if old_shm is not None:
+            self._segments.pop(old_shm.name)
+            old_shm.close()
+            old_shm.unlink()
+
+        self._func = func
+        self._func_version += 1
+        self._func_ref = (self._func_version, self._func_shm.name, len(data))
+
+    def _write_items(self, items: Sequence[TProcItem]) -> List[_TItemLayout]:
+        """ Pickles the items into the shared memory block of items. """
+        serialized = []
+        total_size = 0
+        for item in items:
+            buffers = []  # type: List[memoryview]
+
+            def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+                try:
+                    buffers.append(buffer.raw())
+                    return False
+                except BufferError:
+                    # non-contiguous buffer: serialized in-band
+                    return True
+
+            stream = pickle.dumps(item, protocol=5,
+                                  buffer_callback=buffer_callback)
+            serialized.append((stream, buffers))
+            total_size += len(stream) + sum(b.nbytes for b in buffers)
+
+        self._items_shm = self._segment(self._items_shm, total_size)
+        buf = self._items_shm.buf
+        layout = []  # type: List[_TItemLayout]
+        offset = 0
+        for stream, buffers in serialized:
+            stream_offset = offset
+            buf[offset:offset + len(stream)] = stream
+            offset += len(stream)
+
+            buffers_layout = []
+            for b in buffers:
+                buf[offset:offset + b.nbytes] = b
+                buffers_layout.append((offset, b.nbytes))
+                offset += b.nbytes
+            layout.append((stream_offset, len(stream), tuple(buffers_layout)))
+        return layout
+
+    def run(self,
+            items: Sequence[TProcItem],
+            func: Callable[[TProcItem], TProcResult]) -> List[TProcResult]:
+        """ Processes the given items and returns a result.
+
+        Main function of the scheduler. Call it to make the scheduler manage the
+        parallel processing of a batch of items using its worker processes.
+
+        Args:
+            items (Sequence[TProcItem]): Iterable containing the items to be
+                processed.
+            func (Callable[[TProcItem], TProcResult]): Callable (usually a
+                function) that takes one item :attr:`.TProcItem` as input and
+                returns a result :attr:`.TProcResult` as output. Generally,
+                :attr:`.TProcItem` is an individual in the population and
+                :attr:`.TProcResult` is the individual's fitness. The callable
+                is only sent to the workers if it isn't the same object passed
+                in the previous call.
+
+        Returns:
+            A list containing the results of the processing of each item. It is
+            guaranteed that the ordering of the items in the returned list
+            follows the order in which the items are yielded by the iterable
+            passed as argument.
+
+        Raises:
+            RuntimeError: If the processing of an item raises an exception or if
+                a worker process dies.
+        """
+        if len(items) == 0:
+            return []
+
+        if func is not self._func:
+            self._publish_func(func)
+
+        layout = self._write_items(items)
+        self._results_shm = self._segment(self._results_shm, 8 * len(items))
+
+        # sending the tasks
+        chunksize = (self._chunksize if self._chunksize is not None
+                     else math.ceil(len(items) / (4 * self._num_processes)))
+        num_tasks = 0
+        for start in range(0, len(items), chunksize):
+            end = min(start + chunksize, len(items))
+            self._tasks.put((self._func_ref,
+                             self._items_shm.name,
+                             self._results_shm.name,
+                             start,
+                             layout[start:end]))
+            num_tasks += 1
+
+        # collecting the results
+        objects = {}  # type: Dict[int, Any]
+        errors = []  # type: List[str]
+        while num_tasks > 0:
+            try:
+                task_objects, error = self._results.get(timeout=1)
+            except queue.Empty:
+                if not all(w.is_alive() for w in self._workers):
+                    raise RuntimeError("A worker process of the scheduler "
+                                       "died unexpectedly!")
+                continue
+            objects.update(task_objects)
+            if error is not None:
+                errors.append(error)
+            num_tasks -= 1
+
+        if len(errors) > 0:
+            raise RuntimeError("Error while processing an item in a worker "
+                               f"process:\n{errors[0]}")
+
+        values = np.ndarray((len(items),), dtype=np.float64,
+                            buffer=self._results_shm.buf).tolist()
+        return [objects[i] if i in objects else values[i]
+                for i in range(len(items))]
+
+    def close(self):
+        """ Stops the worker processes (after they finish their current work)
+        and releases the shared memory blocks.
+        """
+        for _ in self._workers:
+            self._tasks.put(None)
+        self._func = None
+        _release([], self._segments)
+
+    def join(self):
+        """ Waits for the worker processes to exit. Must be called after
+        :meth:`close` or :meth:`terminate`.
+        """
+        for worker in self._workers:
+            worker.join()
+
+    def terminate(self):
+        """ Stops the worker processes immediately and releases the shared
+        memory blocks.
+        """
+        self._func = None
+        _release(self._workers, self._segments)
+
+
+def _release(workers: List[multiprocessing.Process],
+             segments: Dict[str, SharedMemory]) -> None:
+    """ Terminates the given workers and unlinks the shared memory blocks. """
+    for worker in workers:
+        if worker.is_alive():
+            worker.terminate()
+    for shm in segments.values():
+        shm.close()
+        shm.unlink()
+    segments.clear()
+
+
+def _worker_loop(tasks: multiprocessing.Queue,
+                 results: multiprocessing.Queue) -> None:
+    """ Main loop of the worker processes of a
+    :class:`.SharedMemoryProcessingScheduler`.
+    """
+    segments = {}  # type: Dict[str, SharedMemory]
+    func = None  # type: Optional[Callable]
+    func_version = None  # type: Optional[int]
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        func_ref, items_name, results_name, start, layout = task
+        names = {func_ref[1], items_name, results_name}
+        for name in list(segments):
+            if name not in names:
+                segments.pop(name).close()
+        for name in names:
+            if name not in segments:
+                segments[name] = SharedMemory(name=name)
+
+        task_objects = {}  # type: Dict[int, Any]
+        error = None
+        items_buf = values = None
+        try:
+            if func_version != func_ref[0]:
+                func_shm = segments[func_ref[1]]
+                func = pickle.loads(func_shm.buf[:func_ref[2]])
+                func_version = func_ref[0]
+
+            items_buf = segments[items_name].buf
+            values = np.ndarray((len(layout),),
+                                dtype=np.float64,
+                                buffer=segments[results_name].buf,
+                                offset=8 * start)
+            for i, (offset, size, buffers) in enumerate(layout):
+                # the buffers are copied, so the item doesn't hold references
+                # to the shared memory block
+                item = pickle.loads(items_buf[offset:offset + size],
+                                    buffers=[bytearray(items_buf[o:o + n])
+                                             for o, n in buffers])
+                result = func(item)
+                if isinstance(result, (float, np.floating)):
+                    values[i] = result
+                else:
+                    task_objects[start + i] = result
+        except Exception:  # pylint: disable=broad-except
+            error = traceback.format_exc()
+        finally:
+            # releasing the views of the shared memory blocks, so they can be
+            # closed later
+            items_buf = values = None
+        results.put((task_objects, error))
+
+    for shm in segments.values():
+        shm.close()
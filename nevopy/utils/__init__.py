@@ -24,31 +24,43 @@
 """ Exposes the main utility functions and classes within this package.
 """
 
-# Modules imports:
-from nevopy.utils import deprecation
-from nevopy.utils import gym_utils
-from nevopy.utils import utils
+from nevopy.utils.lazy_import import lazy_loader
 
-# From `deprecation.py`
-from nevopy.utils.deprecation import deprecated
+__getattr__, __dir__ = lazy_loader(__name__, {
+    # Modules imports:
+    "deprecation": "nevopy.utils.deprecation",
+    "gym_utils": "nevopy.utils.gym_utils",
+    "utils": "nevopy.utils.utils",
 
-# From `gym_utils`:
-from nevopy.utils.gym_utils.callbacks import BatchObsGymCallback
-from nevopy.utils.gym_utils.callbacks import GymCallback
-from nevopy.utils.gym_utils.fitness_function import GymFitnessFunction
-from nevopy.utils.gym_utils.renderers import GymRenderer
-from nevopy.utils.gym_utils.renderers import NeatActivationsGymRenderer
+    # From `deprecation.py`
+    "deprecated": "nevopy.utils.deprecation",
 
-# From `utils.py`:
-from nevopy.utils.utils import align_lists
-from nevopy.utils.utils import chance
-from nevopy.utils.utils import clear_output
-from nevopy.utils.utils import Comparable
-from nevopy.utils.utils import is_jupyter_notebook
-from nevopy.utils.utils import make_table_row
-from nevopy.utils.utils import make_xor_data
-from nevopy.utils.utils import min_max_norm
-from nevopy.utils.utils import MutableWrapper
-from nevopy.utils.utils import pickle_load
-from nevopy.utils.utils import pickle_save
-from nevopy.utils.utils import rank_prob_dist
+    # From `gym_utils`:
+    "BatchObsGymCallback": "nevopy.utils.gym_utils.callbacks",
+    "GymCallback": "nevopy.utils.gym_utils.callbacks",
+    "EarlyTermination": "nevopy.utils.gym_utils.early_termination",
+    "ObservationInvarianceTermination":
+        "nevopy.utils.gym_utils.early_termination",
+    "RewardBoundTermination": "nevopy.utils.gym_utils.early_termination",
+    "StagnationTermination": "nevopy.utils.gym_utils.early_termination",
+    "EnvPool": "nevopy.utils.gym_utils.env_pool",
+    "GymFitnessFunction": "nevopy.utils.gym_utils.fitness_function",
+    "VectorizedGymFitnessFunction": "nevopy.utils.gym_utils.fitness_function",
+    "GymRenderer": "nevopy.utils.gym_utils.renderers",
+    "NeatActivationsGymRenderer": "nevopy.utils.gym_utils.renderers",
+
+    # From `utils.py`:
+    "align_lists": "nevopy.utils.utils",
+    "chance": "nevopy.utils.utils",
+    "clear_output": "nevopy.utils.utils",
+    "Comparable": "nevopy.utils.utils",
+    "is_jupyter_notebook": "nevopy.utils.utils",
+    "make_table_row": "nevopy.utils.utils",
+    "make_xor_data": "nevopy.utils.utils",
+    "min_max_norm": "nevopy.utils.utils",
+    "MutableWrapper": "nevopy.utils.utils",
+    "pairwise_distances": "nevopy.utils.utils",
+    "pickle_load": "nevopy.utils.utils",
+    "pickle_save": "nevopy.utils.utils",
+    "rank_prob_dist": "nevopy.utils.utils",
+})
@@ -26,6 +26,8 @@
 
 # Modules imports:
 from nevopy.utils.gym_utils import callbacks
+from nevopy.utils.gym_utils import early_termination
+from nevopy.utils.gym_utils import env_pool
 from nevopy.utils.gym_utils import fitness_function
 from nevopy.utils.gym_utils import renderers
 
@@ -33,8 +35,22 @@ from nevopy.utils.gym_utils import renderers
 from nevopy.utils.gym_utils.callbacks import BatchObsGymCallback
 from nevopy.utils.gym_utils.callbacks import GymCallback
 
+# Early termination policies:
+from nevopy.utils.gym_utils.early_termination import EarlyTermination
+from nevopy.utils.gym_utils.early_termination import (
+    ObservationInvarianceTermination
+)
+from nevopy.utils.gym_utils.early_termination import RewardBoundTermination
+from nevopy.utils.gym_utils.early_termination import StagnationTermination
+
+# Environment pool:
+from nevopy.utils.gym_utils.env_pool import EnvPool
+
 # Fitness function
 from nevopy.utils.gym_utils.fitness_function import GymFitnessFunction
+from nevopy.utils.gym_utils.fitness_function import (
+    VectorizedGymFitnessFunction
+)
 
 # Renderers:
 from nevopy.utils.gym_utils.renderers import GymRenderer
@@ -0,0 +1,236 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" This module implements policies that stop the evaluation of a genome by a
+:class:`.GymFitnessFunction` before the episodes end.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+import numpy as np
+
+
+class EarlyTermination(ABC):
+    """ Base class for the early termination policies of
+    :class:`.GymFitnessFunction`.
+
+    After each step of an episode, the fitness function asks its policies
+    whether the evaluation should go on. A policy can stop the current episode
+    or, if :attr:`stops_evaluation` is `True`, the whole evaluation of the
+    genome (the remaining episodes aren't run).
+
+    Attributes:
+        stops_evaluation (bool): Whether the policy stops the whole evaluation
+            of the genome instead of only the current episode.
+    """
+
+    stops_evaluation = False
+
+    def on_evaluation_start(self,
+                            num_eps: int,
+                            max_steps: float,
+                            fitness_threshold: Optional[float]) -> None:
+        """ Called before the first episode of the evaluation of a genome.
+
+        Args:
+            num_eps (int): Number of episodes that will be run.
+            max_steps (float): Maximum number of steps of an episode (it's
+                infinite if there is no limit).
+            fitness_threshold (Optional[float]): Fitness the genome must reach
+                to be competitive in the population (see
+                :attr:`.BasePopulation.fitness_threshold`). `None` if no
+                threshold has been given.
+        """
+
+    def on_episode_start(self, obs: Any) -> None:
+        """ Called at the start of a new episode, after the environment is
+        reset.
+
+        Args:
+            obs (Any): The first observation of the episode.
+        """
+
+    @abstractmethod
+    def should_stop(self,
+                    obs: Any,
+                    reward: float,
+                    current_eps: int,
+                    current_step: int,
+                    total_reward: float) -> bool:
+        """ Called after each step of an episode.
+
+        Args:
+            obs (Any): The observation yielded by the environment.
+            reward (float): The reward yielded by the environment.
+            current_eps (int): Number of the current episode.
+            current_step (int): Number of the step just taken.
+            total_reward (float): Total reward obtained by the genome so far,
+                over all the episodes.
+
+        Returns:
+            Whether the episode (or the evaluation) should be stopped.
+        """
+
+
+class RewardBoundTermination(EarlyTermination):
+    """ Stops the evaluation when the genome can't reach the fitness threshold
+    anymore.
+
+    After each step, an upper bound of the genome's final fitness (average
+    reward per episode) is computed assuming that every remaining step yields
+    the maximum reward. If the bound is lower than the fitness threshold passed
+    to the fitness function (usually by the population, see
+    :attr:`.BasePopulation.fitness_threshold`), the remaining steps and
+    episodes aren't run. As the population improves, the threshold rises and
+    the evaluation of poor genomes gets shorter.
+
+    Note:
+        The maximum number of steps of the episodes must be finite. When there
+        is no fitness threshold, the policy has no effect.
+
+    Args:
+        max_step_reward (float): Upper bound of the reward of a single step.
+    """
+
+    stops_evaluation = True
+
+    def __init__(self, max_step_reward: float) -> None:
+        self.max_step_reward = max_step_reward
+        self._num_eps = 0
+        self._max_steps = float("inf")
+        self._threshold = None  # type: Optional[float]
+
+    def on_evaluation_start(self,
+                            num_eps: int,
+                            max_steps: float,
+                            fitness_threshold: Optional[float]) -> None:
+        self._num_eps = num_eps
+        self._max_steps = max_steps
+        self._threshold = fitness_threshold
+
+    def should_stop(self,
+                    obs: Any,
+                    reward: float,
+                    current_eps: int,
+                    current_step: int,
+                    total_reward: float) -> bool:
+        if self._threshold is None or self._max_steps == float("inf"):
+            return False
+
+        # the steps of an episode are numbered from 0 to `max_steps - 1`
+        remaining_steps = (self._max_steps - current_step - 1
+                           + (self._num_eps - current_eps - 1)
+                           * self._max_steps)
+        bound = ((total_reward + remaining_steps * self.max_step_reward)
+                 / self._num_eps)
+        return bound < self._threshold
+
+
+class StagnationTermination(EarlyTermination):
+    """ Stops an episode when the reward obtained in it doesn't change for a
+    number of consecutive steps.
+
+    The episode's accumulated reward is compared to its value at the last
+    change, so a sequence of small rewards also counts as a change once their
+    sum exceeds ``min_delta``. Both gains and losses reset the count.
+
+    Note:
+        The reward that would be obtained in the skipped steps is assumed to be
+        zero, which is what the genome was getting when the episode was
+        stopped. Environments in which stalling is later punished (with a
+        negative reward at the end of the episode, for example) aren't a good
+        fit for this policy.
+
+    Args:
+        patience (int): Number of consecutive steps without a change in the
+            episode's reward after which the episode is stopped.
+        min_delta (float): Minimum absolute change in the episode's reward to
+            be considered a change.
+    """
+
+    def __init__(self, patience: int, min_delta: float = 0) -> None:
+        self.patience = patience
+        self.min_delta = min_delta
+        self._last_change = 0.0
+        self._eps_reward = 0.0
+        self._stalled = 0
+
+    def on_episode_start(self, obs: Any) -> None:
+        self._last_change = self._eps_reward = 0.0
+        self._stalled = 0
+
+    def should_stop(self,
+                    obs: Any,
+                    reward: float,
+                    current_eps: int,
+                    current_step: int,
+                    total_reward: float) -> bool:
+        self._eps_reward += reward
+        if abs(self._eps_reward - self._last_change) > self.min_delta:
+            self._last_change = self._eps_reward
+            self._stalled = 0
+        else:
+            self._stalled += 1
+        return self._stalled >= self.patience
+
+
+class ObservationInvarianceTermination(EarlyTermination):
+    """ Stops an episode when the observations yielded by the environment don't
+    change for a number of consecutive steps (the agent is stuck).
+
+    Note:
+        The same caveat of :class:`.StagnationTermination` applies: stopping
+        the episode shouldn't be able to improve the genome's fitness.
+
+    Args:
+        patience (int): Number of consecutive steps with the same observation
+            after which the episode is stopped.
+        atol (float): Absolute tolerance used to compare observations.
+    """
+
+    def __init__(self, patience: int, atol: float = 1e-8) -> None:
+        self.patience = patience
+        self.atol = atol
+        self._last_obs = None  # type: Optional[np.ndarray]
+        self._unchanged = 0
+
+    def on_episode_start(self, obs: Any) -> None:
+        self._last_obs = np.array(obs, dtype=float)
+        self._unchanged = 0
+
+    def should_stop(self,
+                    obs: Any,
+                    reward: float,
+                    current_eps: int,
+                    current_step: int,
+                    total_reward: float) -> bool:
+        obs = np.array(obs, dtype=float)
+        if (self._last_obs is not None
+                and obs.shape == self._last_obs.shape
+                and np.allclose(obs, self._last_obs, rtol=0, atol=self.atol)):
+            self._unchanged += 1
+        else:
+            self._unchanged = 0
+        self._last_obs = obs
+        return self._unchanged >= self.patience
@@ -0,0 +1,113 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" This module implements a pool of reusable :mod:`gym` environments.
+"""
+
+import os
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+import gym
+
+#: Idle environments of each pool in the current process, indexed by the id of
+#: the process and the key of the pool.
+_IDLE_ENVS = {}  # type: Dict[Tuple[int, str], List[gym.Env]]
+
+
+class EnvPool:
+    """ Pool of :mod:`gym` environments kept alive between fitness evaluations.
+
+    Building an environment can be expensive (specially for `Box2D` and `Atari`
+    environments). Instead of building and closing a new environment in each
+    call to a fitness function, environments are taken from the pool with
+    :meth:`acquire` and, after being used, returned to it with :meth:`release`.
+    They are reset, not rebuilt, before being used again.
+
+    The idle environments are stored per process: copies of the pool sent to
+    other processes (by pickling, like it's done by the processing schedulers)
+    or living in forked processes share the pool's settings, but each process
+    keeps its own environments. This way, the pool can be used with any
+    processing scheduler: persistent workers (like the ones used by
+    :class:`.RayProcessingScheduler`) keep their environments between
+    generations.
+
+    Args:
+        make_env (Callable[[], gym.Env]): Callable that creates a new
+            environment.
+        max_size (int): Maximum number of idle environments kept by the pool in
+            each process. Environments released when the pool is full are
+            closed.
+        health_check (Optional[Callable[[gym.Env], bool]]): Callable that
+            receives an idle environment and returns whether it can be reused.
+            Unhealthy environments are closed and replaced by new ones. By
+            default, all environments are considered healthy.
+    """
+
+    def __init__(self,
+                 make_env: Callable[[], gym.Env],
+                 max_size: int = 8,
+                 health_check: Optional[Callable[[gym.Env], bool]] = None,
+    ) -> None:
+        self._make_env = make_env
+        self.max_size = max_size
+        self.health_check = health_check
+        self._key = uuid.uuid4().hex
+
+    @property
+    def _idle(self) -> List[gym.Env]:
+        """ Idle environments of the pool in the current process. """
+        return _IDLE_ENVS.setdefault((os.getpid(), self._key), [])
+
+    def __len__(self) -> int:
+        """ Number of idle environments in the current process. """
+        return len(self._idle)
+
+    def acquire(self) -> gym.Env:
+        """ Takes a healthy environment from the pool or builds a new one if
+        the pool is empty.
+
+        The environment must be reset before being used.
+        """
+        idle = self._idle
+        while idle:
+            env = idle.pop()
+            if self.health_check is None or self.health_check(env):
+                return env
+            env.close()
+        return self._make_env()
+
+    def release(self, env: gym.Env) -> None:
+        """ Returns an environment to the pool. If the pool is full, the
+        environment is closed.
+        """
+        idle = self._idle
+        if len(idle) < self.max_size:
+            idle.append(env)
+        else:
+            env.close()
+
+    def close(self) -> None:
+        """ Closes the idle environments of the pool in the current process. """
+        for env in _IDLE_ENVS.pop((os.getpid(), self._key), []):
+            env.close()
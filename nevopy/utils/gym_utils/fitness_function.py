@@ -25,18 +25,23 @@
 with most :mod:`gym` environments.
 """
 
-from typing import Callable, List, Optional
+from typing import Any, Callable, List, Optional, Tuple
 
 import gym
 import numpy as np
 
+import nevopy as ne
 from nevopy.base_genome import BaseGenome
+from nevopy.fitness_function import PopulationFitnessFunction
+from nevopy.fitness_function import ThresholdedFitnessFunction
 from nevopy.utils.gym_utils.callbacks import GymCallback
+from nevopy.utils.gym_utils.early_termination import EarlyTermination
+from nevopy.utils.gym_utils.env_pool import EnvPool
 from nevopy.utils.gym_utils.renderers import GymRenderer
 from nevopy.utils.utils import MutableWrapper
 
 
-class GymFitnessFunction:
+class GymFitnessFunction(ThresholdedFitnessFunction):
     """ Wrapper for a fitness function to be used with :mod:`gym`.
 
     This utility class implements a generalizable fitness function compatible
@@ -66,6 +71,20 @@ class GymFitnessFunction:
             environment, only the 1st one will be fed to the genome. When,
             during a step, no observation is fed to the genome, the genome's
             last output is used to advance the environment's state.
+        env_pool_size (int): If greater than 0, the environments aren't closed
+            after being used. Instead, up to this number of environments are
+            kept alive in each process and reused (reset instead of rebuilt)
+            in the following calls to the fitness function (see
+            :class:`.EnvPool`). Useful with environments that are expensive to
+            build. By default, a new environment is built in each call.
+        env_health_check (Optional[Callable[[gym.Env], bool]]): Callable that
+            receives a pooled environment and returns whether it can be reused
+            (only used if ``env_pool_size > 0``).
+        early_termination (Optional[List[EarlyTermination]]): Policies that can
+            stop an episode, or the whole evaluation of a genome, before the
+            episode ends (see :class:`.EarlyTermination`). Some policies use the
+            fitness threshold passed to the fitness function (usually by the
+            population, see :class:`.ThresholdedFitnessFunction`).
 
     Attributes:
         env_renderer (GymRenderer): Instance of :class:`.GymRenderer` (or a
@@ -74,6 +93,8 @@ class GymFitnessFunction:
             different stages of the evaluation of the genome's fitness.
         num_obs_skip (int): Number of observations to be skipped during an
             episode.
+        early_termination (List[EarlyTermination]): Early termination policies
+            used by the fitness function.
     """
 
     def __init__(self,
@@ -82,8 +103,19 @@ class GymFitnessFunction:
                  callbacks: Optional[List[GymCallback]] = None,
                  default_num_episodes: int = 1,
                  default_max_steps: Optional[int] = None,
-                 num_obs_skip: int = 0) -> None:
+                 num_obs_skip: int = 0,
+                 env_pool_size: int = 0,
+                 env_health_check: Optional[Callable[[gym.Env], bool]] = None,
+                 early_termination: Optional[List[EarlyTermination]] = None,
+    ) -> None:
         self._make_env = make_env
+        self.early_termination = (early_termination
+                                  if early_termination is not None
+                                  else [])  # type: List[EarlyTermination]
+        self._env_pool = (EnvPool(make_env,
+                                  max_size=env_pool_size,
+                                  health_check=env_health_check)
+                          if env_pool_size > 0 else None)
         self.env_renderer = (env_renderer if env_renderer is not None
                              else GymRenderer())
         self.callbacks = (callbacks if callbacks is not None
@@ -107,12 +139,26 @@ class GymFitnessFunction:
                                                  gym.spaces.Discrete)
         temp_env.close()
 
+    def _build_env(self) -> gym.Env:
+        """ Builds a new environment or takes one from the pool. """
+        if self._env_pool is not None:
+            return self._env_pool.acquire()
+        return self._make_env()
+
+    def _close_env(self, env: gym.Env) -> None:
+        """ Closes the environment or returns it to the pool. """
+        if self._env_pool is not None:
+            self._env_pool.release(env)
+        else:
+            env.close()
+
     def __call__(self,
                  genome: Optional[BaseGenome],
                  num_eps: Optional[int] = None,
                  max_steps: Optional[int] = None,
                  visualize: bool = False,
                  extra_callbacks: Optional[List[GymCallback]] = None,
+                 fitness_threshold: Optional[float] = None,
     ) -> float:
         """ Makes a new environment and uses it to evaluate the genome's
         fitness (average reward obtained during the episodes).
@@ -134,9 +180,14 @@ class GymFitnessFunction:
             extra_callbacks (Optional[List[GymCallback]]): Optional list with
                 extra callbacks to be used only during this call to the fitness
                 function.
+            fitness_threshold (Optional[float]): Fitness the genome must reach
+                to be competitive. Used by the early termination policies.
 
         Returns:
-            The average reward obtained by the agent during the episodes.
+            The average reward obtained by the agent during the episodes. If
+            the evaluation is stopped by an early termination policy, the
+            average is taken over the episodes run and it's capped at the
+            fitness threshold.
         """
         # Preparing variables:
         total_reward = 0.0
@@ -154,31 +205,40 @@ class GymFitnessFunction:
             callbacks += extra_callbacks
 
         # Building the environment:
-        env = self._make_env()
+        env = self._build_env()
 
         # Callback: `on_env_built`:
         for cb in callbacks:
             cb.on_env_built(env=env, genome=genome)
 
+        for policy in self.early_termination:
+            policy.on_evaluation_start(num_eps=num_eps,
+                                       max_steps=max_steps,
+                                       fitness_threshold=fitness_threshold)
+
         # Running the episodes:
         eps = None
+        stop_evaluation = False
         for eps in range(num_eps):
             # Callback: `on_episode_start`:
             for cb in callbacks:
                 cb.on_episode_start(current_eps=eps, total_eps=num_eps)
 
             # Resetting:
-            obs = env.reset()
+            obs = _reset_env(env)
             if genome is not None:
                 genome.reset()
 
+            for policy in self.early_termination:
+                policy.on_episode_start(obs=obs)
+
             env_done = False
             force_stop_eps = MutableWrapper(False)
             last_action = None
 
             # Running the steps:
             step = 0
-            while (step <= max_steps
+            while (step < max_steps
                    and not env_done
                    and not force_stop_eps.value):
                 # Callback: `on_step_start`:
@@ -236,7 +296,7 @@ class GymFitnessFunction:
                 action = wrapped_action.value
 
                 # Processing step:
-                obs, reward, env_done, info = env.step(action)
+                obs, reward, env_done, info = _step_env(env, action)
                 total_reward += reward
 
                 # Callback: `on_step_taken`:
@@ -248,6 +308,20 @@ class GymFitnessFunction:
                                      total_reward=total_reward,
                                      force_stop_eps=force_stop_eps)
 
+                # Early termination:
+                for policy in self.early_termination:
+                    if policy.should_stop(obs=obs,
+                                          reward=reward,
+                                          current_eps=eps,
+                                          current_step=step,
+                                          total_reward=total_reward):
+                        force_stop_eps.value = True
+                        stop_evaluation |= policy.stops_evaluation
+                step += 1
+
+            if stop_evaluation:
+                break
+
         # Callback: `on_env_close`:
         for cb in callbacks:
             cb.on_env_close()
@@ -257,7 +331,171 @@ class GymFitnessFunction:
             self.env_renderer.flush()
 
         # Closing the environment:
-        env.close()
+        self._close_env(env)
 
         # Returning average fitness:
-        return (total_reward / (eps + 1)) if eps is not None else 0
+        fitness = (total_reward / (eps + 1)) if eps is not None else 0
+        if stop_evaluation and fitness_threshold is not None:
+            fitness = min(fitness, fitness_threshold)
+        return fitness
+
+
+class VectorizedGymFitnessFunction(GymFitnessFunction,
+                                   PopulationFitnessFunction):
+    """ Vectorized version of :class:`.GymFitnessFunction`.
+
+    Instead of evaluating one genome at a time, this fitness function evaluates
+    the whole population at once (see :class:`.PopulationFitnessFunction`). One
+    environment is created for each episode of each genome and all of them are
+    stepped in lockstep. At each step, the observations of all the environments
+    are fed to the genomes in a single call to the ``process`` method of the
+    population's packed phenotype (see
+    :meth:`.BasePopulation.packed_phenotype`), which, for NEAT populations, is
+    a single vectorized pass over all the genomes. Environments whose episodes
+    have ended are masked out and aren't stepped anymore.
+
+    For small environments (like `CartPole` or `LunarLander`), most of the time
+    of an evaluation is spent by the Python overhead of each step, not by the
+    environment's physics, so this is much faster than calling
+    :class:`.GymFitnessFunction` once per genome and episode.
+
+    Rendering, :class:`.GymCallback` objects and early termination policies
+    aren't supported in the vectorized mode; :meth:`__call__` can still be used
+    to evaluate (or visualize) a single genome.
+
+    Args:
+        make_env (Callable[[], gym.Env]): Callable that creates the environment
+            to be used. It should receive no arguments and return an instance of
+            :class:`gym.Env`.
+        default_num_episodes (int): Default number of episodes ran by each
+            genome.
+        default_max_steps (Optional[int]): Default maximum number of steps
+            allowed in each episode. By default, there is no limit to the number
+            of steps.
+        num_obs_skip (int): Number of observations to be skipped during an
+            episode (see :class:`.GymFitnessFunction`).
+        env_pool_size (int): Maximum number of environments kept alive between
+            evaluations (see :class:`.GymFitnessFunction`). Since all the
+            environments are used at the same time, it should be at least
+            the population's size times the number of episodes.
+        env_health_check (Optional[Callable[[gym.Env], bool]]): Callable that
+            receives a pooled environment and returns whether it can be reused.
+    """
+
+    def __init__(self,
+                 make_env: Callable[[], gym.Env],
+                 default_num_episodes: int = 1,
+                 default_max_steps: Optional[int] = None,
+                 num_obs_skip: int = 0,
+                 env_pool_size: int = 0,
+                 env_health_check: Optional[Callable[[gym.Env], bool]] = None,
+    ) -> None:
+        super().__init__(make_env=make_env,
+                         default_num_episodes=default_num_episodes,
+                         default_max_steps=default_max_steps,
+                         num_obs_skip=num_obs_skip,
+                         env_pool_size=env_pool_size,
+                         env_health_check=env_health_check)
+
+    def evaluate_population(self,
+                            population: "ne.base_population.BasePopulation",
+                            num_eps: Optional[int] = None,
+                            max_steps: Optional[int] = None) -> List[float]:
+        """ Evaluates all the genomes of the population in lockstep.
+
+        Args:
+            population (BasePopulation): The population being evolved.
+            num_eps (Optional[int]): Number of episodes ran by each genome. If
+                ``None``, the default number of episodes is used.
+            max_steps (Optional[int]): Maximum number of steps of an episode.
+                If ``None``, the default maximum number of steps is used.
+
+        Returns:
+            A list with the average reward obtained by each genome during its
+            episodes.
+        """
+        if num_eps is None:
+            num_eps = self._default_num_episodes
+
+        if max_steps is None:
+            max_steps = (self._default_max_steps  # type: ignore
+                         if self._default_max_steps is not None
+                         else float("inf"))
+
+        num_genomes = len(population.genomes)
+        num_envs = num_genomes * num_eps
+
+        # Building the environments (env `g * num_eps + e` runs the episode `e`
+        # of the genome `g`):
+        envs = [self._build_env() for _ in range(num_envs)]
+        obs = np.array([_reset_env(env) for env in envs], dtype=float)
+        phenotype = population.packed_phenotype()
+
+        active = np.ones(num_envs, dtype=bool)
+        total_reward = np.zeros(num_envs)
+        actions = None
+        step = 0
+        while step < max_steps and active.any():
+            # Calculating new actions:
+            if step % (self.num_obs_skip + 1) == 0:
+                h = phenotype.process(
+                    obs.reshape((num_genomes, num_eps) + obs.shape[1:])
+                )
+                actions = self._batch_actions(
+                    np.asarray(h).reshape(num_envs, -1)
+                )
+
+            # Stepping the active environments:
+            for i in np.flatnonzero(active):
+                obs[i], reward, done, _ = _step_env(envs[i], actions[i])
+                total_reward[i] += reward
+                if done:
+                    active[i] = False
+            step += 1
+
+        for env in envs:
+            self._close_env(env)
+
+        return total_reward.reshape(num_genomes, num_eps).mean(axis=1).tolist()
+
+    def _batch_actions(self, h: np.ndarray) -> np.ndarray:
+        """ Determines the actions from the outputs of the genomes (array with
+        one row per environment).
+        """
+        if not self._discrete_action_space:
+            # Boxed action space
+            return h
+
+        # Discrete action space
+        if h.shape[1] == 1:
+            return np.round(h[:, 0]).astype(np.int64)
+        return np.argmax(h, axis=1)
+
+
+def _reset_env(env: gym.Env) -> Any:
+    """ Resets the environment and returns its first observation.
+
+    Supports both the current API of :mod:`gym`, in which
+    :meth:`gym.Env.reset` returns the observation and a dictionary, and the
+    older API, in which only the observation is returned.
+    """
+    result = env.reset()
+    if (isinstance(result, tuple) and len(result) == 2
+            and isinstance(result[1], dict)):
+        return result[0]
+    return result
+
+
+def _step_env(env: gym.Env, action: Any) -> Tuple[Any, float, bool, Any]:
+    """ Steps the environment and returns the observation, the reward, whether
+    the episode has ended and the extra information yielded by it.
+
+    Supports both the current API of :mod:`gym`, in which :meth:`gym.Env.step`
+    returns five values (the episode ends if it's terminated or truncated), and
+    the older API, which returns four values.
+    """
+    result = env.step(action)
+    if len(result) == 5:
+        obs, reward, terminated, truncated, info = result
+        return obs, reward, terminated or truncated, info
+    return result
@@ -0,0 +1,89 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Implements the lazy loading of the names exported by NEvoPy's packages.
+
+Importing some of NEvoPy's modules is expensive, since they depend on heavy
+libraries (like TensorFlow, Ray, gym and matplotlib). To keep ``import nevopy``
+(and the startup of worker processes) fast, the ``__init__`` module of each
+package only declares where its names live. A name's module is imported the
+first time the name is accessed (`PEP 562
+<https://www.python.org/dev/peps/pep-0562/>`_).
+"""
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_loader(
+        package: str,
+        names: Dict[str, str],
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """ Builds the module-level ``__getattr__`` and ``__dir__`` functions of a
+    package whose names are loaded lazily.
+
+    Usage (in the package's ``__init__`` module):
+
+        .. code-block:: python
+
+            __getattr__, __dir__ = lazy_loader(__name__, {
+                "NeatGenome": "nevopy.neat.genomes",
+                "visualization": "nevopy.neat.visualization",
+            })
+
+    Args:
+        package (str): Name of the package (usually ``__name__``).
+        names (Dict[str, str]): Maps each name exported by the package to the
+            module that defines it. If the module is the package's submodule
+            with the same name, the submodule itself is exported. Submodules
+            of the package not listed here can also be accessed as attributes
+            (they are imported when first accessed).
+
+    Returns:
+        A tuple with the package's ``__getattr__`` and ``__dir__`` functions.
+        Once loaded, a name is stored in the package's namespace, so
+        ``__getattr__`` isn't called for it again.
+    """
+    def __getattr__(name: str) -> Any:
+        error = AttributeError(f"module '{package}' has no attribute '{name}'")
+        if name.startswith("__"):
+            raise error
+
+        module_name = names.get(name, f"{package}.{name}")
+        try:
+            module = importlib.import_module(module_name)
+        except ModuleNotFoundError as e:
+            if name in names or e.name != module_name:
+                raise
+            raise error from None
+
+        value = (module if module_name == f"{package}.{name}"
+                 else getattr(module, name))
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(names))
+
+    return __getattr__, __dir__
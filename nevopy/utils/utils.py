@@ -189,6 +189,36 @@ def align_lists(lists: Iterable[List[_T]],
     return result
 
 
+def pairwise_distances(a: np.ndarray,
+                       b: np.ndarray,
+                       norm: int = 2,
+                       max_block_size: int = 2 ** 22) -> np.ndarray:
+    """ Calculates the distance between each row of `a` and each row of `b`.
+
+    The differences between the rows are computed in blocks of rows of `a`, so
+    no more than (approximately) ``max_block_size`` values are held in memory
+    at once.
+
+    Args:
+        a (np.ndarray): Array with shape `(N, D)`.
+        b (np.ndarray): Array with shape `(M, D)`.
+        norm (int): Order of the norm of the difference between two rows (`1`
+            for the Manhattan distance and `2` for the euclidean distance).
+        max_block_size (int): Maximum number of values in each block of
+            differences.
+
+    Returns:
+        A numpy array with shape `(N, M)`. The element `[i, j]` holds the norm
+        of ``a[i] - b[j]``.
+    """
+    out = np.empty((len(a), len(b)))
+    step = max(1, max_block_size // max(1, len(b) * a.shape[1]))
+    for i in range(0, len(a), step):
+        out[i:i + step] = np.linalg.norm(a[i:i + step, np.newaxis] - b,
+                                         ord=norm, axis=-1)
+    return out
+
+
 def min_max_norm(values: Iterable) -> np.array:
     """ Applies min-max normalization to the given values. """
     a = np.array(values)
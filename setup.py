@@ -71,6 +71,11 @@ setuptools.setup(
     download_url="https://github.com/Talendar/nevopy/releases",
     # Contained modules and scripts:
     packages=setuptools.find_packages(),
+    entry_points={
+        "console_scripts": [
+            "nevopy-worker=nevopy.processing.networked_scheduler:main",
+        ],
+    },
     install_requires=REQUIRED_PACKAGES,
     tests_require=REQUIRED_PACKAGES + TEST_PACKAGES,
     # PyPI package information:
@@ -0,0 +1,207 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Tests for :mod:`nevopy.utils.gym_utils`.
+"""
+
+import pickle
+
+import gym
+import numpy as np
+
+import nevopy as ne
+from nevopy.neat.population import NeatPopulation
+from nevopy.processing.serial_processing import SerialProcessingScheduler
+
+
+class CounterEnv(gym.Env):
+    """ Deterministic environment: the agent must keep a counter close to a
+    target value. The episode ends when the counter gets too far from it.
+    """
+
+    def __init__(self, target=3, num_inputs=3):
+        self.action_space = gym.spaces.Discrete(2)
+        self.observation_space = gym.spaces.Box(-np.inf, np.inf,
+                                                shape=(num_inputs,))
+        self._target = target
+        self._counter = 0
+
+    def _obs(self):
+        return np.full(self.observation_space.shape,
+                       (self._counter - self._target) / 4, dtype=np.float32)
+
+    def reset(self, seed=None, options=None):
+        self._counter = 0
+        return self._obs(), {}
+
+    def step(self, action):
+        self._counter += 1 if action == 1 else -1
+        distance = abs(self._counter - self._target)
+        return self._obs(), 1 / (1 + distance), distance > 4, False, {}
+
+
+def reference_fitness(genome, num_eps, max_steps):
+    env = CounterEnv()
+    total = 0
+    for _ in range(num_eps):
+        obs, _ = env.reset()
+        genome.reset()
+        for _ in range(max_steps):
+            h = genome.process(obs)
+            obs, reward, terminated, _, _ = env.step(np.argmax(h))
+            total += reward
+            if terminated:
+                break
+    return total / num_eps
+
+
+def test_vectorized_gym_fitness_function(num_eps=3, max_steps=30):
+    pop = NeatPopulation(size=15, num_inputs=3, num_outputs=2,
+                         processing_scheduler=SerialProcessingScheduler())
+    for genome in pop.genomes:
+        for _ in range(10):
+            genome.add_random_hidden_node(pop._id_handler)
+            genome.add_random_connection(pop._id_handler)
+    fitness_function = ne.utils.VectorizedGymFitnessFunction(
+        make_env=CounterEnv,
+        default_num_episodes=num_eps,
+        default_max_steps=max_steps,
+    )
+    fitness = pop.compute_fitness(fitness_function)
+    expected = [reference_fitness(g, num_eps, max_steps) for g in pop.genomes]
+    assert np.allclose(fitness, expected)
+
+
+def test_serial_and_vectorized_fitness_match(num_eps=2, max_steps=5):
+    pop = NeatPopulation(size=10, num_inputs=3, num_outputs=2,
+                         processing_scheduler=SerialProcessingScheduler())
+    for genome in pop.genomes:
+        for _ in range(5):
+            genome.add_random_hidden_node(pop._id_handler)
+            genome.add_random_connection(pop._id_handler)
+
+    kwargs = dict(make_env=CounterEnv,
+                  default_num_episodes=num_eps,
+                  default_max_steps=max_steps)
+    serial = pop.compute_fitness(ne.utils.GymFitnessFunction(**kwargs))
+    vectorized = pop.compute_fitness(
+        ne.utils.VectorizedGymFitnessFunction(**kwargs)
+    )
+    assert np.allclose(serial, vectorized)
+
+
+def test_env_pool():
+    built = []
+
+    def make_env():
+        built.append(CounterEnv())
+        return built[-1]
+
+    pool = ne.utils.EnvPool(make_env, max_size=2)
+    envs = [pool.acquire() for _ in range(3)]
+    for env in envs:
+        pool.release(env)
+    assert len(built) == 3 and len(pool) == 2
+
+    pool.health_check = lambda env: False
+    pool.acquire()
+    assert len(built) == 4 and len(pool) == 0
+
+    # copies of a pool in the same process share its idle environments
+    pool = ne.utils.EnvPool(CounterEnv)
+    env = pool.acquire()
+    pool.release(env)
+    copied = pickle.loads(pickle.dumps(pool))
+    assert copied.acquire() is env and len(pool) == 0
+    pool.close()
+
+
+def test_vectorized_env_reuse(num_eps=2):
+    built = []
+
+    def make_env():
+        built.append(CounterEnv())
+        return built[-1]
+
+    pop = NeatPopulation(size=5, num_inputs=3, num_outputs=2,
+                         processing_scheduler=SerialProcessingScheduler())
+    fitness_function = ne.utils.VectorizedGymFitnessFunction(
+        make_env=make_env,
+        default_num_episodes=num_eps,
+        default_max_steps=10,
+        env_pool_size=pop.size * num_eps,
+    )
+    fitness = pop.compute_fitness(fitness_function)
+    assert pop.compute_fitness(fitness_function) == fitness
+    # the environment built by the constructor isn't pooled
+    assert len(built) == 1 + pop.size * num_eps
+
+
+def test_early_termination(num_eps=3, max_steps=20):
+    pop = NeatPopulation(size=10, num_inputs=3, num_outputs=2,
+                         processing_scheduler=SerialProcessingScheduler())
+    policy = ne.utils.RewardBoundTermination(max_step_reward=1)
+    fitness_function = ne.utils.GymFitnessFunction(
+        make_env=CounterEnv,
+        default_num_episodes=num_eps,
+        default_max_steps=max_steps,
+        early_termination=[policy],
+    )
+    # without a threshold, the genomes are fully evaluated
+    assert pop.fitness_threshold is None
+    fitness = pop.compute_fitness(fitness_function)
+    assert np.allclose(fitness, [reference_fitness(g, num_eps, max_steps)
+                                 for g in pop.genomes])
+
+    # the population passes its threshold to the fitness function
+    threshold = pop.fitness_threshold
+    assert threshold == np.quantile(fitness,
+                                    pop.config.weak_genomes_removal_pc)
+    new_fitness = pop.compute_fitness(fitness_function)
+    for f, new_f in zip(fitness, new_fitness):
+        assert new_f == f if f >= threshold else new_f <= threshold
+
+
+def test_episode_termination_policies():
+    stagnation = ne.utils.StagnationTermination(patience=2)
+    stagnation.on_episode_start(obs=None)
+    assert not any(stagnation.should_stop(None, r, 0, i, 0)
+                   for i, r in enumerate([1, 0, 1, 0]))
+    assert stagnation.should_stop(None, 0, 0, 4, 0)
+
+    # losing reward is also a change
+    stagnation.on_episode_start(obs=None)
+    assert not any(stagnation.should_stop(None, r, 0, i, 0)
+                   for i, r in enumerate([1, -1, -1, -1]))
+    stagnation = ne.utils.StagnationTermination(patience=2, min_delta=0.5)
+    stagnation.on_episode_start(obs=None)
+    assert not any(stagnation.should_stop(None, r, 0, i, 0)
+                   for i, r in enumerate([0.3, 0.3, 0.3]))
+    assert stagnation.should_stop(None, 0.1, 0, 3, 0)
+
+    invariance = ne.utils.ObservationInvarianceTermination(patience=2)
+    invariance.on_episode_start(obs=np.zeros(2))
+    assert not invariance.should_stop(np.zeros(2), 0, 0, 0, 0)
+    assert not invariance.should_stop(np.ones(2), 0, 0, 1, 0)
+    assert not invariance.should_stop(np.ones(2), 0, 0, 2, 0)
+    assert invariance.should_stop(np.ones(2), 0, 0, 3, 0)
@@ -0,0 +1,90 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Tests for the import time of :mod:`nevopy` (see
+:mod:`nevopy.utils.lazy_import`).
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+#: Heavy dependencies that mustn't be imported by ``import nevopy``.
+HEAVY_MODULES = ("tensorflow", "ray", "gym", "matplotlib", "networkx", "PIL")
+
+#: Maximum time, in seconds, to import each module in a fresh interpreter.
+IMPORT_TIME_BUDGET = 1.0
+
+_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"time": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _measure_import(statement):
+    out = subprocess.run([sys.executable, "-c",
+                          _SCRIPT.format(statement=statement)],
+                         check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.splitlines()[-1])
+    return result["time"], set(result["modules"])
+
+
+@pytest.mark.parametrize("module", ["nevopy", "nevopy.neat"])
+def test_import_time(module):
+    elapsed, modules = _measure_import(f"import {module}")
+    assert elapsed < IMPORT_TIME_BUDGET
+    assert not modules.intersection(HEAVY_MODULES)
+
+
+def test_neat_without_heavy_dependencies():
+    _, modules = _measure_import(
+        "import nevopy as ne; "
+        "ne.neat.NeatPopulation(size=5, num_inputs=2, num_outputs=1, "
+        "processing_scheduler=ne.processing.SerialProcessingScheduler())")
+    assert not modules.intersection(HEAVY_MODULES)
+
+
+def test_genetic_algorithm_without_heavy_dependencies():
+    _, modules = _measure_import(
+        "import nevopy as ne; "
+        "from nevopy.fixed_topology.layers import NPDenseLayer; "
+        "ne.genetic_algorithm.GeneticPopulation("
+        "size=5, "
+        "base_genome=ne.fixed_topology.FixedTopologyGenome("
+        "layers=[NPDenseLayer(2)], input_shape=(1, 3)), "
+        "processing_scheduler=ne.processing.SerialProcessingScheduler())")
+    assert not modules.intersection(HEAVY_MODULES)
+
+
+def test_lazy_names():
+    import nevopy as ne  # pylint: disable=import-outside-toplevel
+    assert "NeatPopulation" in dir(ne.neat)
+    assert ne.neat.NeatGenome is ne.neat.genomes.NeatGenome
+    assert ne.utils.chance is ne.utils.utils.chance
+    with pytest.raises(AttributeError):
+        _ = ne.neat.NotANevopyName
@@ -0,0 +1,443 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Tests the implementation of :class:`.NeatGenome`.
+"""
+
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from nevopy.neat.config import NeatConfig
+from nevopy.neat.genes import align_connections
+from nevopy.neat.genes import NodeGene
+from nevopy.neat.genomes import NeatGenome
+from nevopy.neat.id_handler import IdHandler
+from nevopy.neat.id_handler import ProvisionalIdHandler
+
+
+def make_random_genome(num_inputs=4,
+                       num_outputs=3,
+                       num_mutations=30,
+                       config=None,
+                       id_handler=None):
+    config = config if config is not None else NeatConfig()
+    if id_handler is None:
+        id_handler = IdHandler(num_inputs=num_inputs,
+                               num_outputs=num_outputs,
+                               has_bias=config.bias_value is not None)
+
+    genome = NeatGenome(num_inputs=num_inputs,
+                        num_outputs=num_outputs,
+                        config=config)
+    for _ in range(num_mutations):
+        r = np.random.uniform()
+        if r < 0.4:
+            genome.add_random_hidden_node(id_handler)
+        elif r < 0.9:
+            genome.add_random_connection(id_handler)
+        else:
+            genome.enable_random_connection()
+    genome.mutate_weights()
+    return genome
+
+
+def reference_process(genome, x):
+    """ Recursive processing algorithm (the original implementation).
+
+    Starting from the output nodes, each node is activated after the nodes it
+    receives input from. A node is marked as activated before its sources are
+    processed, so recurrences use the node's previous activation.
+    """
+    for in_node, value in zip(genome.input_nodes, x):
+        in_node.activate(value)
+
+    activated = set()
+
+    def process_node(n):
+        if (n.type != NodeGene.Type.INPUT
+                and n.type != NodeGene.Type.BIAS
+                and n.id not in activated):
+            activated.add(n.id)
+            zsum = 0.0
+            for connection in n.in_connections:
+                if connection.enabled:
+                    zsum += connection.weight * process_node(
+                        connection.from_node)
+            n.activate(zsum)
+        return n.activation
+
+    return np.array([process_node(n) for n in genome.output_nodes])
+
+
+def test_compiled_process(num_genomes=30, num_steps=5):
+    for _ in range(num_genomes):
+        genome = make_random_genome()
+        clone = genome.deep_copy()
+        for _ in range(num_steps):
+            x = np.random.uniform(-1, 1, size=genome.input_shape)
+            h_ref = reference_process(clone, x)
+            h = genome.process(x)
+            assert np.allclose(h, h_ref)
+            for n1, n2 in zip(genome.nodes(), clone.nodes()):
+                assert np.isclose(n1.activation, n2.activation)
+
+
+def test_phenotype_invalidation():
+    genome = make_random_genome()
+    x = np.random.uniform(-1, 1, size=genome.input_shape)
+    phenotype = genome.compile()
+    genome.process(x)
+    assert genome.compile() is phenotype
+
+    genome.mutate_weights()
+    assert genome.compile() is not phenotype
+
+    genome.reset()
+    h = genome.process(x)
+    clone = genome.deep_copy()
+    assert np.allclose(h, reference_process(clone, x))
+
+
+def test_process_batch_stateless(num_genomes=30, batch_size=16):
+    for _ in range(num_genomes):
+        genome = make_random_genome()
+        clone = genome.deep_copy()
+        x = np.random.uniform(-1, 1, size=(batch_size, genome.input_shape))
+        h = genome.process_batch(x)
+        assert h.shape == (batch_size, len(genome.output_nodes))
+        for i in range(batch_size):
+            clone.reset()
+            assert np.allclose(h[i], clone.process(x[i]))
+
+
+def test_process_batch_stateful(num_genomes=20, batch_size=4, num_steps=5):
+    for _ in range(num_genomes):
+        genome = make_random_genome()
+        clones = [genome.deep_copy() for _ in range(batch_size)]
+        for _ in range(num_steps):
+            x = np.random.uniform(-1, 1,
+                                  size=(batch_size, genome.input_shape))
+            h = genome.process_batch(x, stateful=True)
+            for i, c in enumerate(clones):
+                assert np.allclose(h[i], c.process(x[i]))
+
+        genome.reset()
+        x = np.random.uniform(-1, 1, size=(batch_size, genome.input_shape))
+        assert np.allclose(genome.process_batch(x, stateful=True),
+                           genome.process_batch(x))
+
+
+def test_gene_views():
+    genome = make_random_genome()
+    con = genome.connections[0]
+    con.weight = 123.0
+    assert genome._con_weights[0] == 123.0
+    assert genome.connections[0] is con
+
+    for c in genome.connections:
+        assert c in c.to_node.in_connections
+        assert c in c.from_node.out_connections
+        assert genome.connection_exists(c.from_node.id, c.to_node.id)
+
+    clone = genome.deep_copy()
+    clone.connections[0].weight = 0.0
+    assert genome.connections[0].weight == 123.0
+    assert [n.id for n in clone.nodes()] == [n.id for n in genome.nodes()]
+    assert [(c.id, c.from_node.id, c.to_node.id, c.enabled)
+            for c in clone.connections] == [
+        (c.id, c.from_node.id, c.to_node.id, c.enabled)
+        for c in genome.connections]
+
+
+def test_adjacency_index(num_genomes=10):
+    def check(genome):
+        cons = genome.connections
+        for n in genome.nodes():
+            assert n.in_connections == [c for c in cons if c.to_node is n]
+            assert n.out_connections == [c for c in cons if c.from_node is n]
+
+    id_handler = IdHandler(num_inputs=4, num_outputs=3, has_bias=True)
+    for _ in range(num_genomes):
+        genome = make_random_genome(id_handler=id_handler)
+        check(genome)
+        index = genome._adjacency()
+        assert genome._adjacency() is index
+
+        # the index must be rebuilt after a structural mutation
+        genome.add_random_hidden_node(id_handler)
+        genome.add_random_connection(id_handler)
+        check(genome)
+        check(pickle.loads(pickle.dumps(genome)))
+        check(genome.deep_copy())
+
+
+@pytest.mark.parametrize("allow_self_connections", [True, False])
+def test_add_random_connection(allow_self_connections):
+    config = NeatConfig(allow_self_connections=allow_self_connections)
+    id_handler = IdHandler(3, 2, has_bias=True)
+    genome = make_random_genome(num_inputs=3, num_outputs=2, config=config,
+                                id_handler=id_handler)
+
+    def missing_pairs():
+        nodes = genome.nodes()
+        return {(s.id, d.id) for s in nodes for d in genome.nodes()[4:]
+                if (s is not d or allow_self_connections)
+                and not genome.connection_exists(s.id, d.id)}
+
+    for _ in range(3):
+        genome.add_random_hidden_node(id_handler)
+        missing = missing_pairs()
+        assert genome._free_slots().sum() == len(missing)
+        while missing:
+            src, dest = genome.add_random_connection(id_handler)
+            assert (src.id, dest.id) in missing
+            missing.remove((src.id, dest.id))
+        assert genome.add_random_connection(id_handler) is None
+        assert genome.valid_out_nodes()
+
+
+def test_copy_on_write():
+    id_handler = IdHandler(4, 3, has_bias=True)
+    genome = make_random_genome(id_handler=id_handler)
+    genome.connections[0].enabled = False
+
+    def snapshot(g):
+        return ([(n.id, n.type, n.function, n.initial_activation)
+                 for n in g.nodes()],
+                [(c.id, c.from_node.id, c.to_node.id, c.weight, c.enabled)
+                 for c in g.connections])
+
+    original = snapshot(genome)
+    clone = genome.deep_copy()
+    assert clone._con_src is genome._con_src
+    assert clone._con_weights is not genome._con_weights
+    assert snapshot(clone) == original
+
+    # changing the weights doesn't copy the topology
+    clone.mutate_weights()
+    assert clone._con_src is genome._con_src
+    assert snapshot(genome) == original
+
+    # structural changes (in any of the genomes) don't affect the other one
+    clone.add_random_hidden_node(id_handler)
+    clone.add_random_connection(id_handler)
+    clone.enable_random_connection()
+    clone.connections[1].enabled = False
+    clone.hidden_nodes[0].initial_activation = 5.0
+    clone.output_nodes[0].function = np.sin
+    assert snapshot(genome) == original
+
+    other = genome.deep_copy()
+    genome.add_random_connection(id_handler)
+    genome.connections[0].enabled = True
+    assert snapshot(other) == original
+    unpickled = pickle.loads(pickle.dumps(other))
+    assert np.allclose(other.process(np.ones(4)),
+                       unpickled.process(np.ones(4)))
+
+
+def test_mutate_weights(num_genomes=20):
+    def make_config(reset_chance):
+        return NeatConfig(weight_reset_chance=(reset_chance, reset_chance),
+                          weight_perturbation_pc=(0.1, 0.1),
+                          new_weight_interval=(5, 6))
+
+    for mutate in (lambda gs: [g.mutate_weights() for g in gs],
+                   NeatGenome.mutate_population_weights):
+        id_handler = IdHandler(4, 3, has_bias=True)
+        perturbed = [make_random_genome(config=make_config(0),
+                                        id_handler=id_handler)
+                     for _ in range(num_genomes)]
+        reset = [make_random_genome(config=make_config(1),
+                                    id_handler=id_handler)
+                 for _ in range(num_genomes)]
+        old = [g._con_weights.copy() for g in perturbed]
+        x = np.ones(4)
+        for g in perturbed + reset:
+            g.process(x)
+
+        mutate(perturbed + reset)
+        for g, w in zip(perturbed, old):
+            assert len(g._con_weights) == len(w)
+            assert np.all(np.abs(g._con_weights - w) <= 0.1 * np.abs(w))
+            assert g._phenotype is None
+        for g in reset:
+            assert np.all((g._con_weights >= 5) & (g._con_weights <= 6))
+            assert g._phenotype is None
+
+
+def test_pruned(num_genomes=20, num_steps=5):
+    id_handler = IdHandler(4, 3, has_bias=True)
+    num_pruned = 0
+    for _ in range(num_genomes):
+        genome = make_random_genome(num_mutations=40, id_handler=id_handler)
+        genome.connections[-1].enabled = False
+        pruned = genome.pruned()
+        assert genome._owns_topology and pruned._owns_topology
+        node_rows, con_rows = genome.live_rows()
+        assert genome.live_rows() is genome.live_rows()
+        num_pruned += len(pruned.nodes()) < len(genome.nodes())
+
+        assert all(c.enabled for c in pruned.connections)
+        assert [n.id for n in pruned.nodes()] == [
+            genome.nodes()[r].id for r in node_rows]
+        assert [(c.id, c.from_node.id, c.to_node.id, c.weight)
+                for c in pruned.connections] == [
+            (c.id, c.from_node.id, c.to_node.id, c.weight)
+            for c in (genome.connections[r] for r in con_rows)]
+        assert genome.compile()._num_nodes == len(node_rows)
+
+        clone = genome.deep_copy()
+        for _ in range(num_steps):
+            x = np.random.uniform(-1, 1, size=genome.input_shape)
+            h = pruned.process(x)
+            assert np.allclose(h, genome.process(x))
+            assert np.allclose(h, reference_process(clone, x))
+            for n1, n2 in zip(genome.nodes(), clone.nodes()):
+                assert np.isclose(n1.activation, n2.activation)
+
+        # the cache is discarded when the topology changes
+        genome.connections[con_rows[0]].enabled = False
+        assert len(genome.live_rows()[1]) < len(con_rows)
+    assert num_pruned > 0
+
+
+def test_pickling():
+    genome = make_random_genome()
+    x = np.random.uniform(-1, 1, size=genome.input_shape)
+    genome.process(x)
+
+    data = pickle.dumps(genome)
+    loaded = pickle.loads(data)
+    assert loaded._phenotype is None and loaded._node_views_cache is None
+    for n1, n2 in zip(genome.nodes(), loaded.nodes()):
+        assert n1.id == n2.id and n1.type == n2.type
+        assert np.isclose(n1.activation, n2.activation)
+    assert np.allclose(genome.process(x), loaded.process(x))
+
+
+def reference_distance(g1, g2):
+    genes = align_connections(g1.connections, g2.connections)
+    excess = disjoint = num_matches = 0
+    weight_diff = 0.0
+    g1_max_innov = max(c.id for c in g1.connections)
+    g2_max_innov = max(c.id for c in g2.connections)
+    for cn1, cn2 in zip(*genes):
+        if cn1 is None or cn2 is None:
+            if ((cn1 is None and cn2.id > g1_max_innov)
+                    or (cn2 is None and cn1.id > g2_max_innov)):
+                excess += 1
+            else:
+                disjoint += 1
+        else:
+            num_matches += 1
+            weight_diff += abs(cn1.weight - cn2.weight)
+
+    config = g1.config
+    n = max(len(g1.connections), len(g2.connections))
+    return ((config.excess_genes_coefficient * excess
+             + config.disjoint_genes_coefficient * disjoint) / n
+            + config.weight_difference_coefficient * weight_diff / num_matches)
+
+
+def test_distance(num_pairs=50):
+    config, id_handler = NeatConfig(), IdHandler(4, 3, has_bias=True)
+    genomes = [make_random_genome(config=config, id_handler=id_handler)
+               for _ in range(10)]
+    for _ in range(num_pairs):
+        g1, g2 = np.random.choice(genomes, size=2)
+        assert np.isclose(g1.distance(g2), reference_distance(g1, g2))
+
+        aligned1, aligned2 = align_connections(g1.connections, g2.connections)
+        ids1 = {c.id for c in g1.connections}
+        ids2 = {c.id for c in g2.connections}
+        union = sorted(ids1 | ids2)
+        assert [c.id if c is not None else None for c in aligned1] == [
+            i if i in ids1 else None for i in union]
+        assert [c.id if c is not None else None for c in aligned2] == [
+            i if i in ids2 else None for i in union]
+
+
+def test_distance_matrix():
+    config, id_handler = NeatConfig(), IdHandler(4, 3, has_bias=True)
+    genomes = [make_random_genome(config=config, id_handler=id_handler)
+               for _ in range(12)]
+    others = genomes[:5] + [genomes[0].deep_copy()]
+    dist = NeatGenome.distance_matrix(genomes, others)
+    assert dist.shape == (len(genomes), len(others))
+    for i, g1 in enumerate(genomes):
+        for j, g2 in enumerate(others):
+            assert np.isclose(dist[i, j], g1.distance(g2))
+    assert NeatGenome.distance_matrix(genomes, []).shape == (len(genomes), 0)
+
+
+def test_content_hash():
+    genome = make_random_genome()
+    copied = genome.deep_copy()
+    copied.process(np.random.uniform(size=4))
+    assert genome.content_hash() == copied.content_hash()
+    assert genome.content_hash() == pickle.loads(
+        pickle.dumps(genome)).content_hash()
+
+    copied.mutate_weights()
+    assert genome.content_hash() != copied.content_hash()
+
+    # activation functions are identified by their module and qualified name
+    def make_genome(out_activation):
+        config = NeatConfig(out_nodes_activation=out_activation)
+        return NeatGenome(num_inputs=2, num_outputs=1, config=config)
+
+    g1, g2 = make_genome(np.tanh), make_genome(np.sin)
+    g2._con_weights = g1._con_weights.copy()
+    assert g1.content_hash() != g2.content_hash()
+    assert make_genome(lambda x: x).content_hash() is None
+
+
+def test_provisional_innovations(num_genomes=10):
+    config = NeatConfig()
+    id_handler1 = IdHandler(4, 3, has_bias=True)
+    base = make_random_genome(config=config, id_handler=id_handler1)
+    id_handler2 = copy.deepcopy(id_handler1)
+
+    for seed in range(num_genomes):
+        g1, g2 = base.deep_copy(), base.deep_copy()
+        np.random.seed(seed)
+        for _ in range(5):
+            g1.add_random_hidden_node(id_handler1)
+            g1.add_random_connection(id_handler1)
+
+        np.random.seed(seed)
+        provisional_handler = ProvisionalIdHandler(id_handler2)
+        for _ in range(5):
+            g2.add_random_hidden_node(provisional_handler)
+            g2.add_random_connection(provisional_handler)
+        g2.relabel_innovations(
+            *id_handler2.register(provisional_handler.proposals))
+
+        assert np.array_equal(g1._node_ids, g2._node_ids)
+        assert np.array_equal(g1._con_ids, g2._con_ids)
+        for c in g2.connections:
+            assert g2.connection_exists(c.from_node.id, c.to_node.id)
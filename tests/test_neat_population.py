@@ -0,0 +1,282 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Tests for :class:`nevopy.neat.population.NeatPopulation`.
+"""
+
+import numpy as np
+
+import nevopy as ne
+from nevopy.neat.population import NeatPopulation
+from nevopy.processing.serial_processing import SerialProcessingScheduler
+
+
+def make_population(size=30, num_inputs=3, num_outputs=2, num_mutations=20):
+    pop = NeatPopulation(size=size,
+                         num_inputs=num_inputs,
+                         num_outputs=num_outputs,
+                         processing_scheduler=SerialProcessingScheduler())
+    for genome in pop.genomes:
+        for _ in range(num_mutations):
+            r = np.random.uniform()
+            if r < 0.3:
+                genome.add_random_hidden_node(pop._id_handler)
+            elif r < 0.8:
+                genome.add_random_connection(pop._id_handler)
+            else:
+                genome.mutate_weights()
+    return pop
+
+
+def test_population_process_batch(batch_size=10):
+    pop = make_population()
+    x = np.random.uniform(-1, 1, size=(batch_size, 3))
+    h = pop.process_batch(x)
+    assert h.shape == (pop.size, batch_size, 2)
+    for g, genome in enumerate(pop.genomes):
+        assert np.allclose(h[g], genome.process_batch(x))
+
+
+def test_batch_fitness_function():
+    xor_inputs, xor_outputs = ne.utils.make_xor_data(2)
+
+    def outputs_to_fitness(h):
+        error = np.sum((xor_outputs - h[:, :, 0]) ** 2, axis=1)
+        return 1 / (error + 1e-8)
+
+    pop = make_population(size=20, num_inputs=2, num_outputs=1,
+                          num_mutations=0)
+    fitness_function = ne.BatchFitnessFunction(xor_inputs, outputs_to_fitness)
+    fitness = pop.compute_fitness(fitness_function)
+    expected = outputs_to_fitness(np.array(
+        [g.process_batch(xor_inputs) for g in pop.genomes]
+    ))
+    assert np.allclose(fitness, expected)
+
+    pop.evolve(generations=3, fitness_function=fitness_function, verbose=0)
+    assert len(pop.genomes) == pop.size
+
+
+def test_distance_matrix_speciation():
+    pop = make_population()
+    others = pop.genomes[:7]
+    expected = np.array([[g1.distance(g2) for g2 in others]
+                         for g1 in pop.genomes])
+    assert np.allclose(pop.distance_matrix(pop.genomes, others), expected)
+
+    pop.config.parallel_speciation = True
+    assert np.allclose(pop.distance_matrix(pop.genomes, others), expected)
+
+    for genome in pop.genomes:
+        genome.fitness = 0
+    pop.speciation(generation=1)
+    assert sum(len(sp.members) for sp in pop.species.values()) == pop.size
+    for sp in pop.species.values():
+        assert all(g.species_id == sp.id for g in sp.members)
+
+
+def reproduce(scheduler, seed=7):
+    np.random.seed(seed)
+    pop = make_population(size=40, num_mutations=10)
+    pop.scheduler = scheduler
+    for genome in pop.genomes:
+        genome.fitness = np.random.uniform()
+    pop._NeatPopulation__max_hidden_nodes = 0
+    pop._NeatPopulation__max_hidden_connections = 0
+    pop.speciation(generation=1)
+    pop.reproduction()
+    return pop
+
+
+def test_parallel_reproduction():
+    pool = ne.processing.PoolProcessingScheduler(num_processes=2)
+    try:
+        pop1 = reproduce(SerialProcessingScheduler())
+        pop2 = reproduce(pool)
+    finally:
+        pool.close()
+        pool.join()
+
+    assert len(pop1.genomes) == len(pop2.genomes) == pop1.size
+    for g1, g2 in zip(pop1.genomes, pop2.genomes):
+        assert np.all(g1._node_ids >= 0) and np.all(g1._con_ids >= 0)
+        assert len(np.unique(g1._node_ids)) == len(g1._node_ids)
+        assert np.array_equal(g1._node_ids, g2._node_ids)
+        assert np.array_equal(g1._con_ids, g2._con_ids)
+        assert np.allclose(g1._con_weights, g2._con_weights)
+    for pop in (pop1, pop2):
+        assert all(g.config is pop.config for g in pop.genomes)
+
+
+def _square(x):
+    return x ** 2
+
+
+def test_scheduler_submit():
+    pool = ne.processing.PoolProcessingScheduler(num_processes=2)
+    try:
+        for scheduler in (SerialProcessingScheduler(), pool):
+            tickets = {scheduler.submit(i, _square): i for i in range(20)}
+            results = {}
+            while len(results) < len(tickets):
+                results.update(scheduler.wait_completed())
+            assert scheduler.wait_completed() == []
+            assert {tickets[t]: r for t, r in results.items()} == {
+                i: i ** 2 for i in range(20)}
+    finally:
+        pool.close()
+        pool.join()
+
+
+def test_steady_state_evolution(generations=4):
+    xor_inputs, xor_outputs = ne.utils.make_xor_data(2)
+
+    def fitness_function(genome):
+        h = genome.process_batch(xor_inputs)[:, 0]
+        return 1 / (np.sum((h - xor_outputs) ** 2) + 1e-8)
+
+    pop = make_population(size=30, num_inputs=2, num_outputs=1,
+                          num_mutations=0)
+    history = pop.evolve_steady_state(generations=generations,
+                                      fitness_function=fitness_function,
+                                      verbose=0,
+                                      max_pending=8)
+    assert len(history.best_fitness) == generations
+    assert len(pop.genomes) == pop.size
+    members = [g for sp in pop.species.values() for g in sp.members]
+    assert sorted(map(id, members)) == sorted(map(id, pop.genomes))
+    for genome in pop.genomes:
+        assert genome.fitness == fitness_function(genome)
+        assert pop.species[genome.species_id].members.count(genome) == 1
+
+
+def test_fitness_cache():
+    xor_inputs, xor_outputs = ne.utils.make_xor_data(2)
+    evaluated = []
+
+    def fitness_function(genome):
+        evaluated.append(genome)
+        h = genome.process_batch(xor_inputs)[:, 0]
+        return 1 / (np.sum((h - xor_outputs) ** 2) + 1e-8)
+
+    pop = make_population(size=20, num_inputs=2, num_outputs=1,
+                          num_mutations=5)
+    clone = pop.genomes[0].deep_copy()
+    clone.species_id = pop.genomes[1].species_id
+    members = pop.species[clone.species_id].members
+    members[members.index(pop.genomes[1])] = pop.genomes[1] = clone
+    pop.fitness_cache = ne.FitnessCache(max_size=100)
+
+    fitness = pop.compute_fitness(fitness_function)
+    assert len(evaluated) == pop.size - 1
+    assert fitness == [fitness_function(g) for g in pop.genomes]
+    evaluated.clear()
+    assert pop.compute_fitness(fitness_function) == fitness
+    assert len(evaluated) == 0
+    assert pop.fitness_cache.stats() == {"hits": pop.size - 1,
+                                         "misses": pop.size - 1,
+                                         "evictions": 0}
+
+    history = pop.evolve(generations=3, fitness_function=fitness_function,
+                         verbose=0)
+    assert len(history.cache_hits) == 3
+    assert history.cache_hits[0] == pop.size - 1
+
+    # genomes without a digest are never cached
+    pop.compute_fitness(fitness_function)
+    pop.genomes[0].content_hash = lambda: None
+    evaluated.clear()
+    fitness = pop.compute_fitness(fitness_function)
+    assert evaluated == [pop.genomes[0]]
+    assert fitness == [fitness_function(g) for g in pop.genomes]
+
+
+
+def test_prune_evaluated_genomes():
+    evaluated = []
+
+    def fitness_function(genome):
+        evaluated.append(genome)
+        return float(np.sum(genome.process(np.ones(3))))
+
+    pop = make_population(size=10)
+    expected = [fitness_function(g.deep_copy()) for g in pop.genomes]
+    evaluated.clear()
+    pop.config.prune_evaluated_genomes = True
+    assert np.allclose(pop.compute_fitness(fitness_function), expected)
+    assert not any(g is e for g, e in zip(pop.genomes, evaluated))
+    assert all(c.enabled for g in evaluated for c in g.connections)
+
+def test_fitness_cache_policies():
+    cache = ne.FitnessCache(max_size=2, policy="average", max_samples=2)
+    assert cache.lookup(b"a") is None
+    assert cache.store(b"a", 1.0) == 1.0
+    assert cache.lookup(b"a") is None
+    assert cache.store(b"a", 3.0) == 2.0
+    assert cache.lookup(b"a") == 2.0
+
+    cache.store(b"b", 0.0)
+    cache.lookup(b"a")
+    cache.store(b"c", 0.0)
+    assert b"a" in cache and b"b" not in cache and cache.evictions == 1
+
+    cache = ne.FitnessCache(policy="max_age", max_age=1)
+    cache.store(b"a", 1.0)
+    assert cache.lookup(b"a") == 1.0
+    assert cache.lookup(b"a") is None
+    cache.store(b"a", 5.0)
+    assert cache.lookup(b"a") == 5.0
+
+
+def test_packed_phenotype(batch_size=4, num_steps=5):
+    pop = make_population()
+    phenotype = pop.packed_phenotype()
+    for _ in range(num_steps):
+        x = np.random.uniform(-1, 1, size=(pop.size, batch_size, 3))
+        h = phenotype.process(x)
+        assert h.shape == (pop.size, batch_size, 2)
+        for g, genome in enumerate(pop.genomes):
+            assert np.allclose(h[g], genome.process_batch(x[g], stateful=True))
+
+
+def test_racing_fitness_function(max_episodes=8):
+    pop = make_population(size=20, num_mutations=0)
+    quality = {id(g): i for i, g in enumerate(pop.genomes)}
+    episodes = {}
+
+    def fitness_function(genome, num_eps):
+        episodes[id(genome)] = episodes.get(id(genome), 0) + num_eps
+        return quality[id(genome)] + np.random.uniform(-1, 1)
+
+    racing = ne.RacingFitnessFunction(fitness_function,
+                                      max_episodes=max_episodes)
+    fitness = pop.compute_fitness(racing)
+    assert len(fitness) == pop.size
+    assert racing.episodes_used == sum(episodes.values()) < (pop.size
+                                                             * max_episodes)
+
+    # the genomes that ran more episodes outrank the ones eliminated before
+    eps = np.array([episodes[id(g)] for g in pop.genomes])
+    assert eps.max() == max_episodes
+    for i in range(pop.size):
+        assert np.all(fitness[i] >= np.array(fitness)[eps < eps[i]])
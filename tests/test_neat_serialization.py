@@ -0,0 +1,123 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+# ==============================================================================
+
+""" Tests the binary format implemented in :mod:`.neat.serialization`.
+"""
+
+import pickle
+import struct
+
+import numpy as np
+import pytest
+
+from nevopy.neat import serialization
+from nevopy.neat.config import NeatConfig
+from nevopy.neat.id_handler import IdHandler
+from nevopy.neat.population import NeatPopulation
+from nevopy.processing.serial_processing import SerialProcessingScheduler
+
+from test_neat_genome import make_random_genome
+
+
+def make_genomes(num_genomes=20):
+    config = NeatConfig()
+    id_handler = IdHandler(num_inputs=4, num_outputs=3,
+                           has_bias=config.bias_value is not None)
+    return [make_random_genome(config=config, id_handler=id_handler)
+            for _ in range(num_genomes)]
+
+
+def check_genomes(genomes, loaded):
+    assert len(genomes) == len(loaded)
+    x = np.random.uniform(-1, 1, size=genomes[0].input_shape)
+    for genome, other in zip(genomes, loaded):
+        assert type(genome) is type(other)
+        for name in serialization.PACKED_ATTRS:
+            a1, a2 = getattr(genome, name), getattr(other, name)
+            assert a1.dtype == a2.dtype and (a1 == a2).all()
+            assert a2.flags.writeable
+        assert genome.content_hash() == other.content_hash()
+        assert np.allclose(genome.process(x), other.process(x))
+    assert all(g.config is loaded[0].config for g in loaded)
+
+
+def test_dumps_loads():
+    genomes = make_genomes()
+    # the activations are also stored
+    x = np.random.uniform(-1, 1, size=genomes[0].input_shape)
+    for genome in genomes:
+        genome.process(x)
+
+    data = serialization.dumps(genomes)
+    assert len(data) < len(pickle.dumps(genomes))
+    loaded = serialization.loads(data)
+    check_genomes(genomes, loaded)
+
+    # the loaded arrays don't overlap
+    loaded[0]._con_weights[:] += 1
+    assert not np.allclose(loaded[0]._con_weights, genomes[0]._con_weights)
+    assert np.allclose(loaded[1]._con_weights, genomes[1]._con_weights)
+
+    assert serialization.loads(serialization.dumps([])) == []
+
+
+def test_pickling():
+    genomes = make_genomes()
+    # copies share their topology with the original genome
+    genomes.append(genomes[0].deep_copy())
+    loaded = pickle.loads(pickle.dumps(genomes))
+    check_genomes(genomes, loaded)
+
+    loaded[-1].add_random_hidden_node(IdHandler(num_inputs=4, num_outputs=3,
+                                                has_bias=True))
+    assert len(loaded[0]._node_ids) < len(loaded[-1]._node_ids)
+
+
+def test_save_load(tmp_path):
+    genomes = make_genomes()
+    file_name = str(tmp_path / "genomes.bin")
+    serialization.save(genomes, file_name)
+    check_genomes(genomes, serialization.load(file_name))
+
+    pop = NeatPopulation(size=10, num_inputs=3, num_outputs=2,
+                         processing_scheduler=SerialProcessingScheduler())
+    pop.save(str(tmp_path / "pop"))
+    loaded_pop = NeatPopulation.load(str(tmp_path / "pop.pkl"))
+    assert len(loaded_pop.genomes) == len(pop.genomes)
+    assert all(g.config is loaded_pop.config for g in loaded_pop.genomes)
+
+
+def test_unsupported_format():
+    data = serialization.dumps(make_genomes(num_genomes=2))
+    with pytest.raises(serialization.UnsupportedFormatError):
+        serialization.loads(b"XXXX" + data[4:])
+    with pytest.raises(serialization.UnsupportedFormatError):
+        serialization.loads(data[:4]
+                            + struct.pack("<H", serialization.FORMAT_VERSION
+                                          + 1)
+                            + data[6:])
+    with pytest.raises(serialization.UnsupportedFormatError):
+        serialization.loads(data[:8])
+    with pytest.raises(serialization.UnsupportedFormatError):
+        serialization.unpack_arrays(data)
@@ -0,0 +1,159 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Tests for :class:`nevopy.neat.population.NeatPopulation`.
+"""
+
+import functools
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from nevopy.processing.networked_scheduler import NetworkedProcessingScheduler
+from nevopy.processing.networked_scheduler import run_worker
+from test_neat_population import make_population
+
+AUTHKEY = b"test-networked-scheduler"
+
+
+def _fitness(genome):
+    return float(np.sum(genome.process_batch(np.ones((4, 3)))))
+
+
+def _square(x):
+    return x ** 2
+
+
+def _raise_error(item):
+    raise ValueError(item)
+
+
+def _exit_if_pid(item, pid):
+    if os.getpid() == pid:
+        os._exit(1)  # pylint: disable=protected-access
+    return item ** 2
+
+
+def _stop_if_pid(item, pid):
+    if os.getpid() == pid:
+        os.kill(pid, signal.SIGSTOP)
+    return item ** 2
+
+
+def start_workers(scheduler, num_workers, heartbeat_interval=0.2):
+    workers = [multiprocessing.Process(
+        target=run_worker,
+        args=(scheduler.address, AUTHKEY),
+        kwargs=dict(heartbeat_interval=heartbeat_interval),
+        daemon=True,
+    ) for _ in range(num_workers)]
+    for w in workers:
+        w.start()
+    return workers
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = NetworkedProcessingScheduler(authkey=AUTHKEY,
+                                             batch_size=5,
+                                             heartbeat_timeout=2,
+                                             wait_timeout=30)
+    yield scheduler
+    scheduler.close()
+
+
+def test_networked_results(scheduler):
+    workers = start_workers(scheduler, 2)
+    pop = make_population(size=30)
+    expected = [_fitness(g) for g in pop.genomes]
+    assert np.allclose(scheduler.run(pop.genomes, _fitness), expected)
+    assert scheduler.run(list(range(23)), _square) == [
+        i ** 2 for i in range(23)]
+    assert scheduler.run([], _square) == []
+    with pytest.raises(RuntimeError):
+        scheduler.run(list(range(10)), _raise_error)
+    assert scheduler.run(list(range(7)), _square) == [
+        i ** 2 for i in range(7)]
+
+    scheduler.close()
+    for w in workers:
+        w.join(timeout=10)
+        assert not w.is_alive()
+
+
+def test_networked_redispatch(scheduler):
+    workers = start_workers(scheduler, 2)
+    while scheduler.num_workers < 2:
+        pass
+
+    func = functools.partial(_exit_if_pid, pid=workers[0].pid)
+    assert scheduler.run(list(range(40)), func) == [
+        i ** 2 for i in range(40)]
+    assert scheduler.num_workers == 1
+
+
+def test_networked_heartbeat_timeout(scheduler):
+    workers = start_workers(scheduler, 2)
+    while scheduler.num_workers < 2:
+        pass
+
+    func = functools.partial(_stop_if_pid, pid=workers[0].pid)
+    try:
+        assert scheduler.run(list(range(40)), func) == [
+            i ** 2 for i in range(40)]
+        assert scheduler.num_workers == 1
+    finally:
+        workers[0].kill()
+
+
+def test_networked_authkey_required(monkeypatch):
+    monkeypatch.delenv("NEVOPY_AUTHKEY", raising=False)
+    with pytest.raises(ValueError):
+        NetworkedProcessingScheduler()
+    with pytest.raises(ValueError):
+        run_worker(("127.0.0.1", 1))
+
+    monkeypatch.setenv("NEVOPY_AUTHKEY", AUTHKEY.decode())
+    scheduler = NetworkedProcessingScheduler()
+    scheduler.close()
+
+
+def test_networked_silent_client(scheduler):
+    # a client that connects and never sends anything must not prevent other
+    # workers from registering
+    silent = socket.create_connection(scheduler.address)
+    try:
+        start_workers(scheduler, 1)
+        deadline = time.monotonic() + 20
+        while scheduler.num_workers < 1:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        assert scheduler.run(list(range(5)), _square) == [
+            i ** 2 for i in range(5)]
+    finally:
+        silent.close()
@@ -0,0 +1,277 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Tests the implementation in :mod:`.fixed_topology.layers.numpy_layers`.
+"""
+
+# pylint: disable=wrong-import-position
+import os
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "1"
+# pylint: enable=wrong-import-position
+
+import numpy as np
+import pytest
+
+from nevopy.base_genome import InvalidInputError
+from nevopy.fixed_topology import FixedTopologyPopulationPhenotype
+from nevopy.fixed_topology.genomes import FixedTopologyGenome
+from nevopy.fixed_topology.layers import NPConv2DLayer
+from nevopy.fixed_topology.layers import NPDenseLayer
+from nevopy.fixed_topology.layers import NPFlattenLayer
+from nevopy.fixed_topology.layers import NPMaxPool2DLayer
+from nevopy.fixed_topology.layers import TFConv2DLayer
+from nevopy.fixed_topology.layers import TFDenseLayer
+from nevopy.fixed_topology.layers import TFMaxPool2DLayer
+from nevopy.fixed_topology.layers import mating
+from nevopy.fixed_topology.layers import mutation
+from nevopy.genetic_algorithm import GeneticPopulation
+from nevopy.genetic_algorithm.config import GeneticAlgorithmConfig
+from nevopy.processing import SerialProcessingScheduler
+
+
+config = GeneticAlgorithmConfig(weight_mutation_chance=(0.5, 0.9),
+                                weight_perturbation_pc=(0.2, 0.4),
+                                weight_reset_chance=(0.2, 0.3),
+                                new_weight_interval=(-2, 2))
+
+
+@pytest.mark.parametrize("padding", ["valid", "same"])
+def test_numpy_layers_match_tf(padding):
+    x = np.random.uniform(-1, 1, size=(3, 9, 8, 2)).astype(np.float32)
+
+    np_conv = NPConv2DLayer(4, (3, 2), strides=(2, 1), padding=padding,
+                            input_shape=x.shape)
+    tf_conv = TFConv2DLayer(4, (3, 2), strides=(2, 1), padding=padding,
+                            input_shape=x.shape)
+    tf_conv.weights = np_conv.weights
+    np_out = np_conv(x)
+    assert np.allclose(np_out, tf_conv(x).numpy(), atol=1e-5)
+
+    np_pool = NPMaxPool2DLayer(padding=padding)
+    tf_pool = TFMaxPool2DLayer(padding=padding)
+    assert np.allclose(np_pool(np_out), tf_pool(np_out).numpy())
+
+    flat = NPFlattenLayer()(np_out)
+    assert flat.shape == (3, int(np.prod(np_out.shape[1:])))
+
+    np_dense = NPDenseLayer(5, activation="sigmoid", input_shape=flat.shape)
+    tf_dense = TFDenseLayer(5, activation="sigmoid", input_shape=flat.shape)
+    tf_dense.weights = np_dense.weights
+    assert np.allclose(np_dense(flat), tf_dense(flat).numpy(), atol=1e-5)
+
+    with pytest.raises(InvalidInputError):
+        np_dense(np.zeros((1, flat.shape[1] + 1)))
+
+
+def test_numpy_layers_evolution():
+    layer = NPDenseLayer(8, config=config, input_shape=(1, 4))
+
+    copy = layer.deep_copy()
+    assert all(np.array_equal(w1, w2) and w1 is not w2
+               for w1, w2 in zip(layer.weights, copy.weights))
+
+    copy.mutate_weights()
+    assert any(not np.array_equal(w1, w2)
+               for w1, w2 in zip(layer.weights, copy.weights))
+
+    random_copy = layer.random_copy()
+    assert [w.shape for w in random_copy.weights] == [(4, 8), (8,)]
+    assert not np.array_equal(random_copy.weights[0], layer.weights[0])
+
+    child = layer.mate(copy)
+    for w, w1, w2 in zip(child.weights, layer.weights, copy.weights):
+        assert np.all((w == w1) | (w == w2))
+
+    with pytest.raises(ValueError):
+        layer.weights = [np.zeros((3, 8)), np.zeros(8)]
+
+    # the weights are returned as copies
+    layer.weights[0][:] = 0
+    assert np.any(layer.weights[0] != 0)
+
+    pool = NPMaxPool2DLayer(config=config)
+    pool.mutate_weights()
+    assert pool.weights == []
+
+
+def test_numpy_layers_genome():
+    genome = FixedTopologyGenome(
+        layers=[NPConv2DLayer(2, (3, 3), input_shape=(1, 8, 8, 1)),
+                NPMaxPool2DLayer(),
+                NPFlattenLayer(),
+                NPDenseLayer(3, activation="softmax")],
+        config=config,
+    )
+    x = np.random.uniform(size=(1, 8, 8, 1))
+    out = genome.process(x)
+    assert out.shape == (1, 3)
+    assert np.isclose(out.sum(), 1)
+
+    child = genome.mate(genome.random_copy())
+    child.mutate_weights()
+    assert child.process(x).shape == (1, 3)
+
+
+def test_packed_phenotype(pop_size=6, batch_size=5):
+    base_genome = FixedTopologyGenome(
+        layers=[NPConv2DLayer(3, (3, 3), padding="same"),
+                NPMaxPool2DLayer(),
+                NPFlattenLayer(),
+                NPDenseLayer(8, activation="relu"),
+                NPDenseLayer(2, activation="tanh")],
+        input_shape=(1, 6, 6, 2),
+    )
+    pop = GeneticPopulation(size=pop_size,
+                            base_genome=base_genome,
+                            config=config,
+                            processing_scheduler=SerialProcessingScheduler())
+
+    x = np.random.uniform(size=(batch_size, 6, 6, 2))
+    h = pop.process_batch(x)
+    assert h.shape == (pop_size, batch_size, 2)
+    for g, genome in enumerate(pop.genomes):
+        assert np.allclose(h[g], genome.process(x), atol=1e-5)
+
+    xg = np.random.uniform(size=(pop_size, batch_size, 6, 6, 2))
+    phenotype = pop.packed_phenotype()
+    assert isinstance(phenotype, FixedTopologyPopulationPhenotype)
+    h = phenotype.process(xg)
+    for g, genome in enumerate(pop.genomes):
+        assert np.allclose(h[g], genome.process(xg[g]), atol=1e-5)
+
+    with pytest.raises(InvalidInputError):
+        phenotype.process(xg[1:])
+
+    # genomes with different architectures can't be packed
+    other = FixedTopologyGenome(layers=[NPDenseLayer(2)],
+                                input_shape=(1, 6, 6, 2))
+    assert not FixedTopologyPopulationPhenotype.is_packable(
+        [pop.genomes[0], other])
+    assert FixedTopologyGenome.packed_phenotype([other, base_genome]) is None
+
+
+def test_distance_matrix(num_genomes=8):
+    base_genome = FixedTopologyGenome(
+        layers=[NPConv2DLayer(2, (3, 3)),
+                NPFlattenLayer(),
+                NPDenseLayer(4, activation="relu"),
+                NPDenseLayer(2)],
+        input_shape=(1, 5, 5, 1),
+        config=config,
+    )
+    genomes = [base_genome.random_copy() for _ in range(num_genomes)]
+    others = genomes[::3]
+
+    dist = FixedTopologyGenome.distance_matrix(genomes, others)
+    expected = np.array([[g1.distance(g2) for g2 in others]
+                         for g1 in genomes])
+    assert dist.shape == (num_genomes, len(others))
+    assert np.allclose(dist, expected)
+    assert np.allclose(np.diag(dist[::3]), 0)
+
+    # genomes with different architectures take the pairwise fallback
+    other = FixedTopologyGenome(layers=[NPConv2DLayer(2, (3, 3)),
+                                        NPFlattenLayer()],
+                                input_shape=(1, 5, 5, 1),
+                                config=config)
+    dist = FixedTopologyGenome.distance_matrix(genomes, [other] + others)
+    expected = np.array([[g1.distance(g2) for g2 in [other] + others]
+                         for g1 in genomes])
+    assert np.allclose(dist, expected)
+
+
+def test_mutate_population_weights(pop_size=50):
+    base_genome = FixedTopologyGenome(
+        layers=[NPDenseLayer(16, activation="relu"),
+                NPDenseLayer(4)],
+        config=config,
+        input_shape=(1, 8),
+    )
+    genomes = [base_genome.random_copy() for _ in range(pop_size)]
+    old_weights = [[w.copy() for layer in g.layers for w in layer.weights]
+                   for g in genomes]
+    buffers = [[w for layer in g.layers for w in layer._weights]
+               for g in genomes]
+
+    FixedTopologyGenome.mutate_population_weights(genomes)
+
+    changed = 0
+    for g, genome in enumerate(genomes):
+        new_weights = [w for layer in genome.layers for w in layer._weights]
+        # the weights are changed in place
+        assert all(w1 is w2 for w1, w2 in zip(new_weights, buffers[g]))
+        for w_old, w_new in zip(old_weights[g], new_weights):
+            changed += np.sum(w_old != w_new)
+
+    total = sum(w.size for w in old_weights[0]) * pop_size
+    assert 0.5 * total <= changed <= total
+
+
+def test_sample_weights_mutations():
+    sparse_config = GeneticAlgorithmConfig(weight_mutation_chance=(0.001,
+                                                                   0.001),
+                                           weight_perturbation_pc=(0.1, 0.1),
+                                           weight_reset_chance=(0.5, 0.5),
+                                           new_weight_interval=(-1, 1))
+    sizes = [10 ** 6, 3, 5000]
+    mutations = mutation.sample_weights_mutations(sizes, sparse_config)
+    assert len(mutations) == len(sizes)
+    for size, m in zip(sizes, mutations):
+        for idx in (m.mutate_idx, m.reset_idx):
+            assert np.all((idx >= 0) & (idx < size))
+            assert np.all(np.diff(idx) > 0)
+        assert np.all(np.abs(m.perturbation - 1) <= 0.1)
+        assert np.all(np.abs(m.new_values) <= 1)
+    assert 500 < len(mutations[0].mutate_idx) < 1500
+    assert 4.5e5 < len(mutations[0].reset_idx) < 5.5e5
+
+
+@pytest.mark.parametrize("mating_func", [mating.exchange_units_mating,
+                                         mating.exchange_weights_mating,
+                                         mating.weights_avg_mating])
+def test_mate_batch(mating_func, num_pairs=20):
+    parents = [NPConv2DLayer(4, (3, 3), mating_func=mating_func,
+                             input_shape=(1, 6, 6, 2))
+               for _ in range(2 * num_pairs)]
+    pairs = list(zip(parents[::2], parents[1::2]))
+    children = mating.mate_batch(pairs) + [l1.mate(l2) for l1, l2 in pairs]
+
+    for child, (l1, l2) in zip(children, pairs + pairs):
+        assert type(child) is NPConv2DLayer
+        for w, w1, w2 in zip(child.weights, l1.weights, l2.weights):
+            if mating_func is mating.weights_avg_mating:
+                assert np.allclose(w, (w1 + w2) / 2)
+            elif mating_func is mating.exchange_units_mating:
+                from_w1 = np.all(w == w1, axis=tuple(range(w.ndim - 1)))
+                from_w2 = np.all(w == w2, axis=tuple(range(w.ndim - 1)))
+                assert np.all(from_w1 | from_w2)
+            else:
+                assert np.all((w == w1) | (w == w2))
+
+    genomes = [FixedTopologyGenome(layers=[NPDenseLayer(4)], config=config,
+                                   input_shape=(1, 3))
+               for _ in range(4)]
+    babies = FixedTopologyGenome.mate_batch([(genomes[0], genomes[1]),
+                                             (genomes[2], genomes[3])])
+    assert len(babies) == 2
+    assert babies[1].process(np.ones((1, 3))).shape == (1, 4)
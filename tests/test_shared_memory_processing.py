@@ -0,0 +1,83 @@
+# MIT License
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Tests for :class:`nevopy.neat.population.NeatPopulation`.
+"""
+
+import numpy as np
+import pytest
+
+from nevopy.processing.shared_memory_processing import \
+    SharedMemoryProcessingScheduler
+from test_neat_population import make_population
+
+
+class _CallCounter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, item):
+        self.calls += 1
+        return float(self.calls)
+
+
+def _fitness(genome):
+    return float(np.sum(genome.process_batch(np.ones((4, 3)))))
+
+
+def _raise_error(item):
+    raise ValueError(item)
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = SharedMemoryProcessingScheduler(num_processes=2)
+    yield scheduler
+    scheduler.close()
+    scheduler.join()
+
+
+def test_shared_memory_results(scheduler):
+    pop = make_population(size=50)
+    expected = [_fitness(g) for g in pop.genomes]
+    assert np.allclose(scheduler.run(pop.genomes, _fitness), expected)
+    assert np.allclose(scheduler.run(pop.genomes[::-1], _fitness),
+                       expected[::-1])
+    assert scheduler.run([], _fitness) == []
+    assert scheduler.run(["a", "bc"], len) == [1, 2]
+
+    with pytest.raises(RuntimeError):
+        scheduler.run([1, 2, 3], _raise_error)
+    assert scheduler.run([(1, 2), (3,)], len) == [2, 1]
+
+
+def test_shared_memory_keeps_callable():
+    scheduler = SharedMemoryProcessingScheduler(num_processes=1, chunksize=10)
+    try:
+        counter = _CallCounter()
+        assert scheduler.run([None] * 3, counter) == [1, 2, 3]
+        assert scheduler.run([None] * 3, counter) == [4, 5, 6]
+        assert scheduler.run([None] * 2, _CallCounter()) == [1, 2]
+    finally:
+        scheduler.close()
+        scheduler.join()
@@ -431,11 +431,11 @@ def test_immutable_layer_mating(layer1, layer2, num_tests=100, verbose=False):
           f"{1000 * mating_time / num_tests:.4f}ms")
 
 
-def test_save_and_load(layer, num_tests=10, pkl=True):
+def test_save_and_load(layer, num_tests=10, pkl=True,
+                       save_dir=test_utils.TEMP_SAVE_DIR):
     saving_time = loading_time = file_size = 0
     for _ in range(num_tests):
-        file_name = (f"{test_utils.TEMP_SAVE_DIR}/"
-                     f"saved_layer_{int(1e6 * timer())}")
+        file_name = f"{save_dir}/saved_layer_{int(1e6 * timer())}"
 
         start_time = timer()
         layer.save(file_name)
@@ -464,7 +464,7 @@ def test_save_and_load(layer, num_tests=10, pkl=True):
     print(f"> Weights size: {w_kb:.2f}KB")
 
 
-def run_all_tests(test_layer1, test_layer2):
+def run_all_tests(test_layer1, test_layer2, save_dir):
     if test_layer1.mutable:
         test_mutate_weights(test_layer1, num_tests=10, verbose=False)
         test_exchange_units_mating(test_layer1, test_layer2,
@@ -479,10 +479,10 @@ def run_all_tests(test_layer1, test_layer2):
     test_immutable_layer_mating(test_layer1, test_layer2,
                                 num_tests=10, verbose=False)
     test_immutable_layer_mutation(test_layer1, num_tests=10, verbose=False)
-    test_save_and_load(test_layer1, num_tests=10)
+    test_save_and_load(test_layer1, num_tests=10, save_dir=save_dir)
 
 
-def test_conv2d():
+def test_conv2d(tmp_path):
     input_shape = (4, 256, 256, 3)
     test_layer1 = TensorFlowLayer(filters=128,
                                   kernel_size=(3, 3),
@@ -494,10 +494,10 @@ def test_conv2d():
                                 kernel_size=(3, 3),
                                 config=config,
                                 input_shape=input_shape)
-    run_all_tests(test_layer1, test_layer2)
+    run_all_tests(test_layer1, test_layer2, save_dir=tmp_path)
 
 
-def test_dense():
+def test_dense(tmp_path):
     input_shape = (32, 1024)
     test_layer1 = TensorFlowLayer(units=128,
                                   activation="relu",
@@ -511,10 +511,35 @@ def test_dense():
                                   mating_func=mating.exchange_units_mating,
                                   config=config,
                                   input_shape=input_shape)
-    run_all_tests(test_layer1, test_layer2)
+    run_all_tests(test_layer1, test_layer2, save_dir=tmp_path)
+
+
+def test_sparse_mutation():
+    sparse_config = GeneticAlgorithmConfig(weight_mutation_chance=(0.01, 0.01),
+                                           weight_perturbation_pc=(0.1, 0.4),
+                                           weight_reset_chance=(0.005, 0.005),
+                                           new_weight_interval=(-2, 2))
+    layer = TFConv2DLayer(filters=32,
+                          kernel_size=(3, 3),
+                          config=sparse_config,
+                          input_shape=(1, 16, 16, 8))
+    for _ in range(10):
+        test_info = {}
+        old_weights = layer.weights
+        layer.mutate_weights(_test_info=test_info)
+        for i, (w_old, w_new) in enumerate(zip(old_weights, layer.weights)):
+            mutate_idx = test_info[f"w{i}_mutate_idx"]
+            reset_idx = test_info[f"w{i}_reset_idx"]
+            expected = w_old.reshape(-1).copy()
+            expected[mutate_idx] *= test_info[f"w{i}_perturbation"]
+
+            w_new = w_new.reshape(-1)
+            kept = np.setdiff1d(np.arange(w_new.size), reset_idx)
+            assert np.allclose(w_new[kept], expected[kept])
+            assert np.all(np.abs(w_new[reset_idx]) <= 2)
 
 
-def test_flatten():
+def test_flatten(tmp_path):
     flatten_layer = TensorFlowLayer(layer_type=tf.keras.layers.Flatten,
                                     config=config,
                                     mutable=False)
@@ -536,7 +561,7 @@ def test_flatten():
                 and (child_out == orig_out).all())
         assert len(orig_out.shape) == 2 and orig_out.shape[1] == (32*64*100)
 
-    test_save_and_load(flatten_layer)
+    test_save_and_load(flatten_layer, save_dir=tmp_path)
 
 
 def test_sequential(verbose=False):
@@ -580,17 +605,17 @@ if __name__ == "__main__":
 
     # Conv2D:
     print("\n[CONV2D]")
-    test_conv2d()
+    test_conv2d(test_utils.TEMP_SAVE_DIR)
     print("[CONV2D] Passed all assertions!")
 
     # Dense:
     print("\n[DENSE]")
-    test_dense()
+    test_dense(test_utils.TEMP_SAVE_DIR)
     print("[DENSE] Passed all assertions!")
 
     # Flatten:
     print("\n[FLATTEN]")
-    test_flatten()
+    test_flatten(test_utils.TEMP_SAVE_DIR)
     print("[FLATTEN] Passed all assertions!")
 
     # Sequential layers processing: